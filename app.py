@@ -25,9 +25,13 @@ import sys
 import time
 import threading
 import queue
+import contextlib
+import functools
+import itertools
 import datetime as _dt
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from functools import wraps
 
 from dotenv import load_dotenv
@@ -39,25 +43,29 @@ from flask import (
 )
 import stripe
 import openpyxl
-import psycopg2
 
 # ─── Import bot config & prompts ─────────────────────────────────────────────
 
 from bot import (
-    MAX_NONPROFITS, POE_BOT_NAME, PAUSE_BETWEEN_DOMAINS,
+    MAX_NONPROFITS, POE_BOT_NAME, JOB_WORKERS, pacing as poe_pacing,
     ALLOWLISTED_PLATFORMS, CSV_COLUMNS, parse_input,
     _error_result, extract_json, extract_json_from_response,
-    classify_lead_tier, _has_valid_url,
+    _has_valid_url,
     _missing_billable_fields, call_poe_bot_sync, _poe_result_to_full,
-    validate_email_emailable, validate_emails_bulk, EMAILABLE_API_KEY,
-    POE_API_KEY, POE_API_KEY_2, POE_BOT_NAME_2,
-    POE_BOT_NAME_3, POE_BOT_NAME_4,
-    POE_BOT_NAME_5, POE_BOT_NAME_6,
+    EMAILABLE_API_KEY,
+    credential_pool,
+)
+from leads import lead_tier, materialize_tier
+from verification import EmailVerificationStage, batch_tracker
+from irs import (
+    enrich_from_irs, ensure_irs_schema,
+    SEARCH_COLUMNS as IRS_SEARCH_COLUMNS, decode_search_cursor,
+    search_page as irs_search_page, iter_search as iter_irs_search,
 )
 
 from db import (
     init_db, create_user, authenticate, get_user, get_user_full,
-    get_balance, add_funds, charge_research_fee, charge_lead_fee,
+    get_balance, add_funds, get_wallet, get_wallet_holds, release_orphaned_holds,
     has_sufficient_balance, get_transactions, get_research_fee_cents,
     update_password, get_spending_summary, get_job_breakdowns,
     create_search_job, complete_search_job, fail_search_job, save_job_checkpoint,
@@ -71,11 +79,13 @@ from db import (
     get_unread_ticket_count,
     purchase_exclusive_lead, is_lead_exclusive, get_user_exclusive_leads,
     EXCLUSIVE_LEAD_PRICE_CENTS,
-    cache_get, cache_put, flush_uncertain_cache,
-    save_result_file, get_result_file,
+    cache_get, cache_get_many, cache_put, flush_uncertain_cache,
+    get_result_file, append_result_chunk, get_result_chunks_counted, artifact_stats,
     get_trial_users_for_drip, get_drips_sent, record_drip_sent,
     get_inactive_users, get_expiring_trial_users,
-    save_single_result, get_completed_domains, get_completed_results,
+    get_completed_domains, get_completed_results, iter_job_results, iter_cache_results,
+    cache_tier_counts, job_tier_counts, backfill_result_columns, retier_expired_results,
+    cleanup_email_verifications,
     save_job_input_domains, get_job_input_domains, get_search_job,
     create_api_key, validate_api_key, revoke_api_key, get_user_api_keys,
     update_last_login, admin_ban_user, admin_unban_user, admin_adjust_wallet,
@@ -85,7 +95,18 @@ from db import (
     admin_get_cache_stats, admin_get_drip_stats,
     get_user_paid_domains, admin_get_all_cache_results,
     cleanup_expired_cache, cleanup_old_job_results,
+    _cache_key, advisory_lock, try_advisory_lock, research_lru_stats,
+    iter_not_found_cache_keys, count_not_found_cache_keys, prescreen_not_found,
 )
+from poe_transport import POE_ASYNC_TRANSPORT, transport as poe_transport
+from billing import ledger_for, ESTIMATED_HIT_RATE, ESTIMATED_AVG_LEAD_CENTS
+from scheduler import scheduler as research_scheduler, lane_for
+from singleflight import SingleFlight, SINGLEFLIGHT_PG_LOCKS
+from checkpoints import checkpoint_writer
+from artifacts import artifact_store
+from exports import csv_stream, json_stream, ndjson_stream, xlsx_stream, zip_stream, streaming_response
+from domains import canonical_domain
+from negative_cache import negative_cache
 import emails
 from html import escape as html_escape
 
@@ -127,16 +148,6 @@ def _get_client_ip() -> str:
     return request.headers.get("X-Forwarded-For", request.remote_addr or "unknown").split(",")[0].strip()
 
 RESULTS_DIR = os.environ.get("RESULTS_DIR", "results")
-DB_CONN_STRING = (
-    os.environ.get("IRS_DB_CONNECTION")
-    or os.environ.get("DATABASE_URL")
-    or os.environ.get("DATABASE_PRIVATE_URL")
-    or "postgresql://localhost/irs"
-)
-_src = "IRS_DB_CONNECTION" if os.environ.get("IRS_DB_CONNECTION") else \
-       "DATABASE_URL" if os.environ.get("DATABASE_URL") else \
-       "DATABASE_PRIVATE_URL" if os.environ.get("DATABASE_PRIVATE_URL") else "FALLBACK"
-print(f"[IRS DB] Using: {_src} -> {DB_CONN_STRING[:30]}...")
 
 # Stripe config
 stripe.api_key = os.environ.get("STRIPE_SECRET_KEY", "")
@@ -148,6 +159,9 @@ os.makedirs(RESULTS_DIR, exist_ok=True)
 # Store active jobs: job_id -> { status, results, progress_queue, ... }
 jobs: Dict[str, Dict[str, Any]] = {}
 
+# Outstanding Poe research calls by cache key, shared by concurrent jobs
+research_flights = SingleFlight("research")
+
 
 class EventQueue:
     """Queue that stores all events for SSE replay on reconnect."""
@@ -164,57 +178,6 @@ class EventQueue:
         return self._q.get(timeout=timeout)
 
 
-def get_irs_db():
-    """Get an IRS PostgreSQL database connection."""
-    return psycopg2.connect(DB_CONN_STRING)
-
-
-def _enrich_from_irs(results: List[Dict[str, Any]]) -> None:
-    """Fill missing address/phone on lead results from the IRS nonprofit database."""
-    # Collect names that need enrichment
-    needs = [r for r in results if r.get("nonprofit_name") and (
-        not r.get("organization_address") or not r.get("organization_phone_maps")
-    )]
-    if not needs:
-        return
-    try:
-        conn = get_irs_db()
-        cur = conn.cursor()
-        for r in needs:
-            name = r["nonprofit_name"].strip()
-            # Try exact match first, then wildcard (handles "Inc", "Foundation", etc.)
-            cur.execute(
-                'SELECT "PhysicalAddress", "PhysicalCity", "PhysicalState", '
-                '"PhysicalZIP", "BusinessOfficerPhone" '
-                'FROM tax_year_2019_search WHERE "OrganizationName" ILIKE %s LIMIT 1',
-                (name,)
-            )
-            row = cur.fetchone()
-            if not row:
-                # Try with wildcard suffix (e.g., "New Moms" -> "New Moms%")
-                cur.execute(
-                    'SELECT "PhysicalAddress", "PhysicalCity", "PhysicalState", '
-                    '"PhysicalZIP", "BusinessOfficerPhone" '
-                    'FROM tax_year_2019_search WHERE "OrganizationName" ILIKE %s LIMIT 1',
-                    (name + '%',)
-                )
-                row = cur.fetchone()
-            if not row:
-                print(f"[IRS ENRICH] No match for: {name}")
-                continue
-            print(f"[IRS ENRICH] Matched: {name}")
-            addr, city, state, zipcode, phone = row
-            if not r.get("organization_address") and addr:
-                parts = [p for p in [addr, city, f"{state} {zipcode}" if state else zipcode] if p]
-                r["organization_address"] = ", ".join(parts)
-            if not r.get("organization_phone_maps") and phone:
-                r["organization_phone_maps"] = phone
-        cur.close()
-        conn.close()
-    except Exception as e:
-        print(f"[IRS ENRICH] Warning: {e}")
-
-
 # ─── Auth ─────────────────────────────────────────────────────────────────────
 
 def login_required(f):
@@ -483,6 +446,36 @@ def _inject_sidebar(html, active):
 
 # ─── Research Worker (runs in background thread with its own event loop) ─────
 
+def _research_flight(nonprofit: str, poe_bot_name: str = None, poe_api_key: str = None) -> Tuple[Dict[str, Any], bool]:
+    """Poe research for one domain, deduplicated across concurrent jobs by cache key.
+    Returns ({"text", "events"} or {"cached"}, shared). The leader writes research_cache
+    before releasing the key, so with SINGLEFLIGHT_PG_LOCKS a leader in another worker
+    that was waiting on the advisory lock finds the result there ({"cached": ...})."""
+    key = _cache_key(nonprofit)
+
+    def _fetch() -> Dict[str, Any]:
+        with advisory_lock(key) if SINGLEFLIGHT_PG_LOCKS else contextlib.nullcontext():
+            if SINGLEFLIGHT_PG_LOCKS:
+                cached = cache_get(nonprofit)
+                if cached:
+                    return {"cached": cached}
+            text = call_poe_bot_sync(nonprofit, bot_name=poe_bot_name, api_key=poe_api_key)
+            if not text:
+                return {"text": "", "events": []}
+            # Parse response — bot may return array of events
+            events = extract_json_from_response(text)
+            if events:
+                cache_entry = _poe_result_to_full(events[0], nonprofit)
+                cache_entry["_api_calls"] = 1
+                cache_entry["email_status"] = ""
+            else:
+                cache_entry = _error_result(nonprofit, "No JSON events in Poe response", text[:300])
+            cache_put(nonprofit, cache_entry)
+            return {"text": text, "events": events}
+
+    return research_flights.do(key, _fetch)
+
+
 def _research_one(
     nonprofit: str, index: int, total: int, progress_q,
     user_id: Optional[int] = None, job_id: str = "", is_admin: bool = False,
@@ -490,9 +483,15 @@ def _research_one(
     selected_tiers: list = None,
     paid_domains: set = None,
     poe_bot_name: str = None, poe_api_key: str = None,
+    ledger=None,
+    cached: Optional[Dict[str, Any]] = None, cache_checked: bool = False,
 ) -> Dict[str, Any]:
     """Research a single nonprofit via Poe bot — simple synchronous call.
     Matches the proven AUCTIONINTEL.APP_BOT.PY pattern exactly.
+    ledger is the job's billing.JobLedger (None when the job isn't billed); it
+    checks and debits the balance atomically across the job's parallel workers.
+    cached/cache_checked carry the job's bulk cache pre-pass: a prefetched hit
+    is used as-is, and cache_checked=True skips the per-domain lookup for a miss.
     """
     # Skip if balance already exhausted
     if balance_exhausted and balance_exhausted[0]:
@@ -509,7 +508,15 @@ def _research_one(
     progress_q.put({"type": "processing", "index": index, "total": total, "nonprofit": nonprofit})
 
     # ── Cache check ──
-    cached = cache_get(nonprofit)
+    if cached is None and not cache_checked:
+        cached = cache_get(nonprofit)
+
+    # ── Call Poe bot (same as AUCTIONINTEL.APP_BOT.PY) ──
+    # Concurrent requests for the same domain share one call; each job still bills
+    # and checkpoints its own copy below.
+    flight, shared_call = ({}, False) if cached else _research_flight(nonprofit, poe_bot_name, poe_api_key)
+    if flight.get("cached"):
+        cached = flight["cached"]  # another worker researched it while we waited on its lock
     if cached:
         cached["_source"] = "auctionintel.app db"
         cached["_api_calls"] = 0
@@ -527,10 +534,8 @@ def _research_one(
             status = "found"
             cached["status"] = "found"
 
-        if status in ("not_found", "uncertain", "error"):
-            tier, price = "not_billable", 0
-        else:
-            tier, price = classify_lead_tier(cached)
+        # Classified once here; later steps read the materialized tier
+        tier, price = materialize_tier(cached)
 
         # Email validation deferred to bulk step after research loop
         cached["email_status"] = ""
@@ -543,31 +548,24 @@ def _research_one(
             price = 0
 
         # Skip lead fee if user already paid for this domain
-        if price > 0 and nonprofit.strip().lower() in (paid_domains or set()):
+        if price > 0 and canonical_domain(nonprofit) in (paid_domains or set()):
             print(f"[LEAD-DEDUP] {nonprofit}: already purchased, waiving lead fee", flush=True)
             price = 0
             progress_q.put({"type": "lead_waived", "index": index, "total": total, "nonprofit": nonprofit})
 
-        if user_id and not is_admin and status in ("found", "3rdpty_found") and price > 0:
-            fee = get_research_fee_cents(total)
-            total_charge = fee + price
-            if is_trial and price <= 0:
-                pass
-            elif get_balance(user_id) >= total_charge:
-                charge_research_fee(user_id, 1, job_id, fee)
-                charge_lead_fee(user_id, tier, price, job_id, nonprofit)
-                progress_q.put({"type": "balance", "balance": get_balance(user_id)})
-            else:
-                if balance_exhausted:
-                    balance_exhausted[0] = True
-                cached["_balance_exhausted"] = True
-                progress_q.put({"type": "balance_warning", "message": "Insufficient balance — stopping job."})
-                tier, price = "not_billable", 0
-        elif user_id and not is_admin and not is_trial:
-            fee = get_research_fee_cents(total)
-            if get_balance(user_id) >= fee:
-                charge_research_fee(user_id, 1, job_id, fee)
-                progress_q.put({"type": "balance", "balance": get_balance(user_id)})
+        if ledger is not None:
+            if status in ("found", "3rdpty_found") and price > 0:
+                if ledger.charge(ledger.research_fee, tier, price, nonprofit):
+                    progress_q.put({"type": "balance", "balance": ledger.balance})
+                else:
+                    if balance_exhausted:
+                        balance_exhausted[0] = True
+                    cached["_balance_exhausted"] = True
+                    progress_q.put({"type": "balance_warning", "message": "Insufficient balance — stopping job."})
+                    tier, price = "not_billable", 0
+            elif not is_trial:
+                if ledger.charge(ledger.research_fee):
+                    progress_q.put({"type": "balance", "balance": ledger.balance})
 
         progress_q.put({
             "type": "result", "index": index, "total": total,
@@ -577,12 +575,10 @@ def _research_one(
             "email_status": cached.get("email_status", ""),
         })
         if job_id:
-            save_single_result(job_id, nonprofit, cached)
+            checkpoint_writer.put(job_id, nonprofit, cached)
         return cached
 
-    # ── Call Poe bot (same as AUCTIONINTEL.APP_BOT.PY) ──
-    text = call_poe_bot_sync(nonprofit, bot_name=poe_bot_name, api_key=poe_api_key)
-
+    text = flight["text"]
     if not text:
         # Empty response = bot call failed
         progress_q.put({
@@ -594,8 +590,7 @@ def _research_one(
         err = _error_result(nonprofit, "Poe bot returned empty response")
         return err
 
-    # Parse response — bot may return array of events
-    events = extract_json_from_response(text)
+    events = flight["events"]
     if not events:
         progress_q.put({
             "type": "result", "index": index, "total": total,
@@ -604,18 +599,15 @@ def _research_one(
             "tier": "not_billable", "tier_price": 0,
         })
         err = _error_result(nonprofit, "No JSON events in Poe response", text[:300])
-        cache_put(nonprofit, err)
         return err
 
     # Use first event as the primary result
     result = _poe_result_to_full(events[0], nonprofit)
-    result["_api_calls"] = 1
+    result["_api_calls"] = 0 if shared_call else 1
 
     status = result.get("status", "uncertain")
-    if status in ("not_found", "uncertain", "error"):
-        tier, price = "not_billable", 0
-    else:
-        tier, price = classify_lead_tier(result)
+    # Classified once here; later steps read the materialized tier
+    tier, price = materialize_tier(result)
 
     # Email validation deferred to bulk step after research loop
     result["email_status"] = ""
@@ -626,41 +618,22 @@ def _research_one(
         price = 0
 
     # Skip lead fee if user already paid for this domain
-    if price > 0 and nonprofit.strip().lower() in (paid_domains or set()):
+    if price > 0 and canonical_domain(nonprofit) in (paid_domains or set()):
         print(f"[LEAD-DEDUP] {nonprofit}: already purchased, waiving lead fee", flush=True)
         price = 0
         progress_q.put({"type": "lead_waived", "index": index, "total": total, "nonprofit": nonprofit})
 
     # Charge fees
-    if user_id and not is_admin:
-        fee = get_research_fee_cents(total)
-        bal = get_balance(user_id)
-        if is_trial:
-            if price > 0:
-                total_charge = fee + price
-                if bal >= total_charge:
-                    charge_research_fee(user_id, 1, job_id, fee)
-                    charge_lead_fee(user_id, tier, price, job_id, nonprofit)
-                    progress_q.put({"type": "balance", "balance": get_balance(user_id)})
-                else:
-                    if balance_exhausted:
-                        balance_exhausted[0] = True
-                    result["_balance_exhausted"] = True
-                    progress_q.put({"type": "balance_warning", "message": "Insufficient balance — stopping job."})
-                    tier, price = "not_billable", 0
+    if ledger is not None and (price > 0 or not is_trial):
+        # Trial users only pay when a lead is billable
+        if ledger.charge(ledger.research_fee, tier, price, nonprofit):
+            progress_q.put({"type": "balance", "balance": ledger.balance})
         else:
-            total_charge = fee + (price if price > 0 else 0)
-            if bal >= total_charge:
-                charge_research_fee(user_id, 1, job_id, fee)
-                if price > 0:
-                    charge_lead_fee(user_id, tier, price, job_id, nonprofit)
-                progress_q.put({"type": "balance", "balance": get_balance(user_id)})
-            else:
-                if balance_exhausted:
-                    balance_exhausted[0] = True
-                result["_balance_exhausted"] = True
-                progress_q.put({"type": "balance_warning", "message": "Insufficient balance — stopping job."})
-                tier, price = "not_billable", 0
+            if balance_exhausted:
+                balance_exhausted[0] = True
+            result["_balance_exhausted"] = True
+            progress_q.put({"type": "balance_warning", "message": "Insufficient balance — stopping job."})
+            tier, price = "not_billable", 0
 
     progress_q.put({
         "type": "result", "index": index, "total": total,
@@ -671,41 +644,69 @@ def _research_one(
         "tier": tier, "tier_price": price,
         "email_status": result.get("email_status", ""),
     })
-    cache_put(nonprofit, result)
     if job_id:
-        save_single_result(job_id, nonprofit, result)
+        checkpoint_writer.put(job_id, nonprofit, result)
     return result
 
 
+class _OrderedEvents:
+    """Buffers one domain's progress events so parallel workers still publish
+    eta/result events in index order. 'processing' events pass straight through."""
+    def __init__(self, progress_q):
+        self._q = progress_q
+        self._buffered = []
+
+    def put(self, event):
+        if event and event.get("type") == "processing":
+            self._q.put(event)
+        else:
+            self._buffered.append(event)
+
+    def flush(self):
+        for event in self._buffered:
+            self._q.put(event)
+        self._buffered = []
+
+
 def _run_job(
     nonprofits: List[str], job_id: str, progress_q,
     user_id: Optional[int] = None, is_admin: bool = False, is_trial: bool = False,
-    selected_tiers: list = None, user_email: str = "",
+    selected_tiers: list = None, user_email: str = "", workers: int = None,
 ):
-    """Run research — one domain at a time, no batching, no async.
-    Matches AUCTIONINTEL.APP_BOT.PY sequential pattern."""
+    """Run research — one domain per worker call, no batching, no async.
+    With workers=1 (default JOB_WORKERS) this is the AUCTIONINTEL.APP_BOT.PY
+    sequential pattern; with more, a small thread pool researches domains of the
+    same job concurrently and results are published back in input order."""
     if selected_tiers is None:
         selected_tiers = ["decision_maker", "outreach_ready", "event_verified"]
     if len(nonprofits) > MAX_NONPROFITS:
         nonprofits = nonprofits[:MAX_NONPROFITS]
 
-    # Route Poe credentials based on user — each admin uses a separate Poe account
-    poe_bot_name = None  # defaults to POE_BOT_NAME in call_poe_bot_sync
-    poe_api_key = None
+    # Poe credentials are routed per call by bot.credential_pool (least-loaded
+    # healthy key under a per-key token bucket) — no per-user key pinning.
     # All accounts use auctionintel.app bot (dup bots were fabricating events)
-    if user_email in ("blake1@auctionintel.us", "blake4@auctionintel.us") and POE_API_KEY:
-        poe_bot_name = POE_BOT_NAME
-        poe_api_key = POE_API_KEY
-    elif user_email in ("blake2@auctionintel.us", "blake3@auctionintel.us", "blake5@auctionintel.us") and POE_API_KEY_2:
-        poe_bot_name = POE_BOT_NAME
-        poe_api_key = POE_API_KEY_2
-    else:
-        pass  # defaults to POE_BOT_NAME + POE_API_KEY
-    print(f"[POE-ROUTING] {user_email or 'default'} -> bot={poe_bot_name or POE_BOT_NAME}", flush=True)
+    poe_bot_name = None
+    poe_api_key = None
+    print(f"[POE-ROUTING] {user_email or 'default'} -> credential pool ({credential_pool.size} key(s))", flush=True)
 
     # Randomize processing order so identical queries yield different result ordering
     random.shuffle(nonprofits)
 
+    # ── Bulk cache pre-pass: one query for the whole job ──
+    # Cached domains go first so they are emitted, billed and checkpointed right
+    # away; only misses wait for scheduler slots and Poe.
+    try:
+        prefetched = cache_get_many(nonprofits)
+    except Exception as e:
+        print(f"[CACHE WARN] {job_id}: bulk lookup failed, falling back to per-domain: {e}", flush=True)
+        prefetched = None
+    if prefetched is not None:
+        nonprofits = ([n for n in nonprofits if n in prefetched] +
+                      [n for n in nonprofits if n not in prefetched])
+        print(f"[CACHE] {job_id}: {len(prefetched)}/{len(nonprofits)} domains cached, "
+              f"{len(nonprofits) - len(prefetched)} to research", flush=True)
+    cached_count = len(prefetched or {})
+
     total = len(nonprofits)
     progress_q.put({"type": "started", "total": total, "batches": 1})
 
@@ -713,130 +714,168 @@ def _run_job(
     save_job_input_domains(job_id, nonprofits)
 
     all_results: List[Dict[str, Any]] = []
+    if job_id in jobs:
+        jobs[job_id]["results_so_far"] = all_results  # published rows, for partial downloads
     billing_summary = {"research_fees": 0, "lead_fees": {}, "total_charged": 0}
     balance_exhausted = [False]
     paid_domains = get_user_paid_domains(user_id) if user_id and not is_admin else set()
     start = time.time()
 
-    for idx, np_name in enumerate(nonprofits, start=1):
-        # Stop if user requested stop
-        if jobs.get(job_id, {}).get("stop_requested"):
-            skipped = total - idx + 1
-            progress_q.put({
-                "type": "balance_warning",
-                "message": f"Search stopped by user. {skipped} nonprofit(s) skipped.",
-            })
-            break
-
-        # Stop if balance exhausted
-        if balance_exhausted[0] and not is_admin:
-            skipped = total - idx + 1
-            progress_q.put({
-                "type": "balance_warning",
-                "message": f"Job stopped early — insufficient balance. {skipped} nonprofit(s) skipped.",
-            })
-            break
-
-        # Send ETA with each domain
-        elapsed_so_far = time.time() - start
-        avg_per = elapsed_so_far / (idx - 1) if idx > 1 else 45  # estimate ~45s first call
-        remaining_secs = int(avg_per * (total - idx + 1))
-        progress_q.put({
-            "type": "eta",
-            "elapsed": int(elapsed_so_far),
-            "remaining": remaining_secs,
-            "index": idx,
-            "total": total,
-        })
-
-        result = _research_one(
-            np_name, idx, total, progress_q,
+    workers = max(1, min(workers or JOB_WORKERS, total))
+    # Reserves the estimated cost as a wallet hold; closed (flushed + released) even if the loop raises
+    ledger = ledger_for(user_id, job_id, total, is_admin, is_trial)
+    # Billable emails are verified in rolling batches while research continues
+    verifier = EmailVerificationStage(job_id, progress_q)
+    if workers > 1:
+        print(f"[WORKERS] {job_id}: {workers} parallel domain workers", flush=True)
+
+    def _should_stop() -> bool:
+        return bool(jobs.get(job_id, {}).get("stop_requested")) or (balance_exhausted[0] and not is_admin)
+
+    def _work(idx: int, np_name: str, events: "_OrderedEvents") -> Optional[Dict[str, Any]]:
+        research = functools.partial(
+            _research_one,
+            np_name, idx, total, events,
             user_id=user_id, job_id=job_id, is_admin=is_admin,
             is_trial=is_trial, balance_exhausted=balance_exhausted,
             selected_tiers=selected_tiers,
             paid_domains=paid_domains,
             poe_bot_name=poe_bot_name, poe_api_key=poe_api_key,
+            ledger=ledger,
         )
-        all_results.append(result)
+        # Cache hits from the pre-pass need no pause and no Poe slot
+        if idx <= cached_count:
+            return research(cached=prefetched[np_name])
+
+        # Pause between domains (like the working script) — per worker, after its first domain.
+        # The pause is adaptive: it shrinks while Poe is healthy and grows when it throttles.
+        if idx - cached_count > workers:
+            time.sleep(poe_pacing.pause)
+        # Research capacity is shared by every job in the process — wait for a fair-share slot
+        with research_scheduler.slot(job_id, cancelled=_should_stop) as granted:
+            if not granted:
+                return None  # stopped while queued for a slot
+            return research(cache_checked=prefetched is not None)
+
+    window_sum, window_samples = 0.0, 0  # effective AIMD window, sampled per researched domain
+    research_started = start
+    pending: Dict[int, tuple] = {}  # idx -> (future, _OrderedEvents)
+    next_submit = 1
+    next_emit = 1
+    stop_message = None
+    skipped_queued = 0
+    partial_seq, partial_exported = 0, 0  # partial CSV chunks written / rows they cover
 
-        # Per-result saves happen in _research_one() via save_single_result()
-        # Log progress every 100 results
-        if idx % 100 == 0:
-            print(f"[PROGRESS] {job_id}: {idx}/{total} results saved", flush=True)
-            # Generate partial CSV chunk in result_files for large batches
-            try:
-                partial_buf = io.StringIO()
-                writer = csv.DictWriter(partial_buf, fieldnames=CSV_COLUMNS, extrasaction="ignore", quoting=csv.QUOTE_ALL)
-                writer.writeheader()
-                for r in all_results:
-                    writer.writerow({col: r.get(col, "") for col in CSV_COLUMNS})
-                save_result_file(job_id, "csv", partial_buf.getvalue().encode("utf-8"))
-            except Exception as e:
-                print(f"[PARTIAL CSV WARN] {job_id}: {e}", flush=True)
-
-        # Pause between domains (like the working script)
-        if idx < total:
-            time.sleep(PAUSE_BETWEEN_DOMAINS)
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{job_id}-w") as pool:
+            while True:
+                # Keep up to `workers` domains in flight
+                while stop_message is None and next_submit <= total and len(pending) < workers:
+                    # Stop if user requested stop
+                    if jobs.get(job_id, {}).get("stop_requested"):
+                        stop_message = "Search stopped by user. {} nonprofit(s) skipped."
+                        break
+                    # Stop if balance exhausted
+                    if balance_exhausted[0] and not is_admin:
+                        stop_message = "Job stopped early — insufficient balance. {} nonprofit(s) skipped."
+                        break
+                    events = _OrderedEvents(progress_q)
+                    future = pool.submit(_work, next_submit, nonprofits[next_submit - 1], events)
+                    pending[next_submit] = (future, events)
+                    next_submit += 1
+
+                if not pending:
+                    break
+                wait([f for f, _ in pending.values()], return_when=FIRST_COMPLETED)
+                if ledger is not None:
+                    ledger.maybe_flush()
+                verifier.poll()
+
+                # Publish finished domains strictly in index order
+                while next_emit in pending and pending[next_emit][0].done():
+                    future, events = pending.pop(next_emit)
+                    result = future.result()
+                    if result is None:
+                        skipped_queued += 1
+                        next_emit += 1
+                        continue
+
+                    # Send ETA with each domain
+                    elapsed_so_far = time.time() - start
+                    done = next_emit - 1
+                    if next_emit == cached_count:
+                        research_started = time.time()  # last cache hit; Poe pace is measured from here
+                    # Observed Poe pace, rescaled to the current AIMD window; model estimate before the first result
+                    researched = done - cached_count
+                    if researched > 0:
+                        window_now = max(1.0, min(workers, poe_pacing.window))
+                        window_sum += window_now
+                        window_samples += 1
+                        avg_per = (time.time() - research_started) / researched
+                        avg_per *= (window_sum / window_samples) / window_now
+                    else:
+                        avg_per = poe_pacing.seconds_per_domain(workers)
+                    progress_q.put({
+                        "type": "eta",
+                        "elapsed": int(elapsed_so_far),
+                        "remaining": int(avg_per * (total - max(done, cached_count))),
+                        "index": next_emit,
+                        "total": total,
+                    })
+                    events.flush()
+                    all_results.append(result)
+                    verifier.add(result)
+
+                    # Per-result saves happen in _research_one() via checkpoint_writer (batched)
+                    # Log progress every 100 results
+                    if next_emit % 100 == 0:
+                        print(f"[PROGRESS] {job_id}: {next_emit}/{total} results saved", flush=True)
+                        # Append only the rows since the last checkpoint as a new partial CSV chunk;
+                        # downloads of a running job assemble the chunks (header lives in chunk 0)
+                        try:
+                            partial_buf = io.StringIO()
+                            writer = csv.DictWriter(partial_buf, fieldnames=CSV_COLUMNS, extrasaction="ignore", quoting=csv.QUOTE_ALL)
+                            if partial_seq == 0:
+                                writer.writeheader()
+                            for r in all_results[partial_exported:]:
+                                writer.writerow({col: r.get(col, "") for col in CSV_COLUMNS})
+                            append_result_chunk(job_id, "csv", partial_seq, partial_buf.getvalue().encode("utf-8"),
+                                                len(all_results) - partial_exported)
+                            partial_seq += 1
+                            partial_exported = len(all_results)
+                        except Exception as e:
+                            print(f"[PARTIAL CSV WARN] {job_id}: {e}", flush=True)
+                    next_emit += 1
+    finally:
+        if ledger is not None:
+            ledger.close()
+
+    if skipped_queued and not stop_message:
+        # Stop landed after the last submit — only queued domains were skipped
+        stop_message = ("Search stopped by user. {} nonprofit(s) skipped."
+                        if jobs.get(job_id, {}).get("stop_requested")
+                        else "Job stopped early — insufficient balance. {} nonprofit(s) skipped.")
+    if stop_message:
+        skipped = total - next_submit + 1 + skipped_queued
+        progress_q.put({"type": "balance_warning", "message": stop_message.format(skipped)})
 
     elapsed = time.time() - start
 
-    # ── Bulk email verification (billable leads only) ──
-    billable_emails = {}  # email -> list of result dicts that use it
-    for r in all_results:
-        tier, _ = classify_lead_tier(r)
-        if tier == "not_billable":
-            continue
-        email = r.get("contact_email", "").strip()
-        if email and "@" in email:
-            billable_emails.setdefault(email.lower(), []).append(r)
-
-    if billable_emails:
-        progress_q.put({
-            "type": "processing",
-            "index": 0, "total": 0,
-            "nonprofit": f"Verifying {len(billable_emails)} emails via Emailable bulk API...",
-        })
-        print(f"[BULK-VERIFY] Submitting {len(billable_emails)} billable emails", flush=True)
-
-        bulk_results = validate_emails_bulk(list(billable_emails.keys()))
-
-        verified_count = 0
-        purged_count = 0
-        for email_lower, results_using_it in billable_emails.items():
-            state = bulk_results.get(email_lower, "unknown")
-            for r in results_using_it:
-                r["email_status"] = state
-                if state != "deliverable":
-                    original_email = r.get("contact_email", "")
-                    r["contact_email"] = ""
-                    r["contact_name"] = ""
-                    r["email_status"] = ""
-                    purged_count += 1
-                    print(f"[BULK-VERIFY] Purged {original_email} ({state}) from {r.get('query_domain', '')}", flush=True)
-                else:
-                    verified_count += 1
-                # Re-save updated result to DB
-                if job_id:
-                    save_single_result(job_id, r.get("query_domain", ""), r)
-
-        print(f"[BULK-VERIFY] Done: {verified_count} deliverable, {purged_count} purged", flush=True)
-        progress_q.put({
-            "type": "processing",
-            "index": 0, "total": 0,
-            "nonprofit": f"Email verification complete: {verified_count} verified, {purged_count} purged",
-        })
-    else:
-        print(f"[BULK-VERIFY] No billable emails to verify", flush=True)
+    # ── Email verification (billable leads only) — most batches finished during research ──
+    verifier.finish()
 
     # Enrich missing address/phone from IRS database
-    _enrich_from_irs(all_results)
+    enrich_from_irs(all_results)
+
+    # Every checkpoint is durable before the job is marked complete
+    checkpoint_writer.flush(job_id)
 
     # Compute billing summary (only selected tiers)
     fee_cents = get_research_fee_cents(len(nonprofits))
     billing_summary["research_fees"] = len(nonprofits) * fee_cents
     tier_counts = {}
     for r in all_results:
-        tier, price = classify_lead_tier(r)
+        tier, price = lead_tier(r)
         if price > 0 and tier in selected_tiers:
             if tier not in tier_counts:
                 tier_counts[tier] = {"count": 0, "price_each": price, "total": 0}
@@ -899,16 +938,12 @@ def _run_job(
         ws.column_dimensions[col_cells[0].column_letter].width = min(max_len + 2, 50)
     wb.save(xlsx_file)
 
-    # Store result files in database (survives Railway redeploys)
+    # Store result files in the artifact store (compressed, deduplicated; the default pg backend survives redeploys)
     try:
-        with open(csv_file, "rb") as f:
-            save_result_file(job_id, "csv", f.read())
-        with open(json_file, "rb") as f:
-            save_result_file(job_id, "json", f.read())
-        with open(xlsx_file, "rb") as f:
-            save_result_file(job_id, "xlsx", f.read())
+        for fmt, path in (("csv", csv_file), ("json", json_file), ("xlsx", xlsx_file)):
+            artifact_store.save_result(job_id, fmt, path)
     except Exception as e:
-        print(f"[WARN] Failed to save result files to DB: {e}", file=sys.stderr)
+        print(f"[WARN] Failed to save result files to artifact store: {e}", file=sys.stderr)
 
     # Final event
     complete_event = {
@@ -970,13 +1005,14 @@ def _run_job(
 def _job_worker(
     nonprofits: List[str], job_id: str, progress_q,
     user_id: Optional[int] = None, is_admin: bool = False, is_trial: bool = False,
-    selected_tiers: list = None, user_email: str = "",
+    selected_tiers: list = None, user_email: str = "", workers: int = None,
 ):
     """Thread target that runs the job (synchronous — no async needed)."""
     try:
-        _run_job(nonprofits, job_id, progress_q, user_id=user_id, is_admin=is_admin, is_trial=is_trial, selected_tiers=selected_tiers or ["decision_maker", "outreach_ready", "event_verified"], user_email=user_email)
+        _run_job(nonprofits, job_id, progress_q, user_id=user_id, is_admin=is_admin, is_trial=is_trial, selected_tiers=selected_tiers or ["decision_maker", "outreach_ready", "event_verified"], user_email=user_email, workers=workers)
     except Exception as e:
         print(f"[JOB ERROR] {job_id}: {type(e).__name__}: {e}", flush=True)
+        checkpoint_writer.flush(job_id)  # keep what was researched, for resume
         progress_q.put({"type": "error", "message": str(e)})
         progress_q.put(None)
         jobs[job_id]["status"] = "error"
@@ -1222,10 +1258,20 @@ def reset_password_submit():
 @login_required
 def wallet_page():
     user_id = session["user_id"]
-    balance = get_balance(user_id)
+    wallet = get_wallet(user_id)
+    balance = wallet["balance_cents"]
     txns = get_transactions(user_id, limit=50)
     user = _current_user()
 
+    # Funds reserved by running jobs — settled as results come in, remainder released at the end
+    hold_html = ""
+    if wallet["held_cents"] > 0:
+        holds = get_wallet_holds(user_id)
+        hold_html = (f'<div class="hold">${wallet["held_cents"]/100:.2f} on hold for '
+                     f'{len(holds)} running job(s) &middot; ${(balance - wallet["held_cents"])/100:.2f} available</div>')
+        for h in holds:
+            hold_html += f'<div class="hold-job">{h["job_id"]}: ${h["amount_cents"]/100:.2f} since {h["created_at"]}</div>'
+
     txn_rows = ""
     for t in txns:
         amt = t["amount_cents"]
@@ -1234,6 +1280,7 @@ def wallet_page():
         txn_rows += f'<tr><td>{t["created_at"]}</td><td>{t["type"]}</td><td style="color:{color}">{amt_str}</td><td>{t["description"] or ""}</td></tr>'
 
     html = WALLET_HTML.replace("{{BALANCE}}", f"${balance/100:.2f}")
+    html = html.replace("{{HOLDS}}", hold_html)
     html = html.replace("{{STRIPE_PK}}", STRIPE_PUBLISHABLE_KEY)
     html = html.replace("{{TXN_ROWS}}", txn_rows)
     html = _inject_sidebar(html, "wallet")
@@ -1534,8 +1581,6 @@ def start_search():
     # Pre-search balance check for non-admin
     # Estimates TOTAL cost including research fees + estimated lead fees
     # Conservative hit rate: 55%, avg lead price: $1.25 (weighted across 3 tiers)
-    ESTIMATED_HIT_RATE = 0.55
-    ESTIMATED_AVG_LEAD_CENTS = 125  # weighted average across 3 tiers
 
     if not is_admin:
         balance = get_balance(user_id)
@@ -1590,13 +1635,12 @@ def start_search():
     create_search_job(user_id, job_id, len(nonprofits))
 
     _user_email = session.get("email", "")
-    thread = threading.Thread(
+    research_scheduler.start_job(
+        job_id, user_id, lane_for(len(nonprofits), interactive=True),
         target=_job_worker,
         args=(nonprofits, job_id, progress_q),
-        kwargs={"user_id": user_id, "is_admin": is_admin, "is_trial": is_trial, "selected_tiers": selected_tiers, "user_email": _user_email},
-        daemon=True,
+        kwargs={"user_id": user_id, "is_admin": is_admin, "is_trial": is_trial, "selected_tiers": selected_tiers, "user_email": _user_email, "workers": min(JOB_WORKERS, research_scheduler.job_workers)},
     )
-    thread.start()
 
     # Build estimated cost for frontend display
     _count = len(nonprofits)
@@ -1748,6 +1792,57 @@ def job_status(job_id):
     return jsonify(resp)
 
 
+def _partial_csv(job_id: str) -> Optional[bytes]:
+    """A running or interrupted job's CSV so far: its append-only chunks (written
+    every 100 rows) plus the rows this process published since the last chunk.
+    None if there is neither."""
+    assembled = get_result_chunks_counted(job_id, "csv")
+    chunks, chunk_rows = assembled if assembled else (b"", 0)
+    job = jobs.get(job_id)
+    tail = job.get("results_so_far", [])[chunk_rows:] if job else []
+    if not chunks and not tail:
+        return None
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=CSV_COLUMNS, extrasaction="ignore", quoting=csv.QUOTE_ALL)
+    if not chunks:
+        writer.writeheader()
+    for r in tail:
+        writer.writerow({col: r.get(col, "") for col in CSV_COLUMNS})
+    return chunks + buf.getvalue().encode("utf-8")
+
+
+def _artifact_response(job_id: str, fmt: str) -> Optional[Response]:
+    """Serve a job's result file from the artifact store, or None if it isn't stored.
+    Sent still compressed when the client accepts the artifact's encoding."""
+    row = artifact_store.open_result(job_id, fmt)
+    if row is None:
+        return None
+    filename = f"auction_results_{job_id}.{fmt}"
+    if row["encoding"] in request.accept_encodings:
+        resp = streaming_response(artifact_store.iter_stored(row), fmt, filename)
+        resp.headers["Content-Encoding"] = row["encoding"]
+        resp.headers["Content-Length"] = str(row["stored_bytes"])
+        # A different byte representation of the same content needs its own strong tag
+        resp.headers["ETag"] = f'"{row["sha256"]}-{row["encoding"]}"'
+    else:
+        resp = streaming_response(artifact_store.iter_raw(row), fmt, filename)
+        resp.headers["Content-Length"] = str(row["size_bytes"])
+        resp.headers["ETag"] = f'"{row["sha256"]}"'
+    resp.headers["Vary"] = "Accept-Encoding"
+    return resp
+
+
+def _job_export_rows(job_id: str):
+    """A job's found/3rdpty_found results for export — or all of them if none were found."""
+    found = (r for r in iter_job_results(job_id) if r.get("status") in ("found", "3rdpty_found"))
+    first = next(found, None)
+    if first is None:
+        yield from iter_job_results(job_id)
+        return
+    yield first
+    yield from found
+
+
 @app.route("/api/download/<job_id>/<fmt>")
 @login_required
 def download_result(job_id, fmt):
@@ -1763,43 +1858,29 @@ def download_result(job_id, fmt):
             download_name=f"auction_results_{job_id}.{fmt}",
         )
 
-    # File not on disk — try database
+    # File not on disk — try the artifact store, the legacy result_files copy,
+    # then a running/interrupted job's partial chunks
+    stored = _artifact_response(job_id, fmt)
+    if stored is not None:
+        return stored
     content = get_result_file(job_id, fmt)
+    if content is None and fmt == "csv":
+        content = _partial_csv(job_id)
     if content is None:
-        # No pre-built file — generate on-the-fly from job_results
-        results = get_completed_results(job_id)
-        if not results:
+        # No pre-built file — stream it from job_results through a server-side cursor
+        checkpoint_writer.flush(job_id)
+        rows = _job_export_rows(job_id)
+        first = next(rows, None)
+        if first is None:
             return Response("No results found for this job", status=404)
-        # Filter to found/3rdpty_found for export
-        save_results = [r for r in results if r.get("status") in ("found", "3rdpty_found")]
-        if not save_results:
-            save_results = results  # Fall back to all results if no found ones
+        rows = itertools.chain([first], rows)
         if fmt == "csv":
-            import io as _io
-            buf = _io.StringIO()
-            writer = csv.DictWriter(buf, fieldnames=CSV_COLUMNS, extrasaction="ignore", quoting=csv.QUOTE_ALL)
-            writer.writeheader()
-            for r in save_results:
-                writer.writerow({col: r.get(col, "") for col in CSV_COLUMNS})
-            content = buf.getvalue().encode("utf-8")
+            body = csv_stream(rows, CSV_COLUMNS)
         elif fmt == "json":
-            content = json.dumps({"results": save_results}, indent=2, ensure_ascii=False).encode("utf-8")
-        elif fmt == "xlsx":
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Auction Results"
-            ws.append(CSV_COLUMNS)
-            for r in save_results:
-                ws.append([r.get(col, "") for col in CSV_COLUMNS])
-            import io as _io
-            buf = _io.BytesIO()
-            wb.save(buf)
-            content = buf.getvalue()
-        # Cache the generated file for next time
-        try:
-            save_result_file(job_id, fmt, content)
-        except Exception as e:
-            print(f"[DOWNLOAD] Failed to cache generated {fmt} for {job_id}: {e}", flush=True)
+            body = json_stream(rows, wrap_key="results")
+        else:
+            body = xlsx_stream(rows, CSV_COLUMNS)
+        return streaming_response(body, fmt, f"auction_results_{job_id}.{fmt}")
 
     mime_types = {
         "csv": "text/csv",
@@ -1828,6 +1909,7 @@ def view_results(job_id):
         return jsonify({"error": "Job not found or not complete"}), 404
 
     # Reconstruct results from job_results table
+    checkpoint_writer.flush(job_id)
     results = get_completed_results(job_id)
     summary = {}
     try:
@@ -2024,40 +2106,24 @@ def irs_search():
         _add_amount_filter(conditions, params, col, data.get(key, ""))
 
     where = " AND ".join(conditions) if conditions else "1=1"
-    table = "confirmed_auction_nonprofits"
-    query = f"""
-        SELECT
-            ein AS "EIN", organizationname AS "OrganizationName", website AS "Website",
-            physicaladdress AS "PhysicalAddress", physicalcity AS "PhysicalCity",
-            physicalstate AS "PhysicalState", physicalzip AS "PhysicalZIP",
-            businessofficerphone AS "BusinessOfficerPhone", principalofficername AS "PrincipalOfficerName",
-            totalrevenue AS "TotalRevenue", grossreceipts AS "GrossReceipts",
-            netincome AS "NetIncome", totalassets AS "TotalAssets",
-            contributionsreceived AS "ContributionsReceived",
-            programservicerevenue AS "ProgramServiceRevenue",
-            fundraisinggrossincome AS "FundraisingGrossIncome",
-            fundraisingdirectexpenses AS "FundraisingDirectExpenses",
-            event1name AS "Event1Name", event1grossreceipts AS "Event1GrossReceipts",
-            event1grossrevenue AS "Event1GrossRevenue", event1netincome AS "Event1NetIncome",
-            event2name AS "Event2Name", event2grossreceipts AS "Event2GrossReceipts",
-            event2grossrevenue AS "Event2GrossRevenue",
-            event1keyword AS "Event1Keyword", event2keyword AS "Event2Keyword",
-            primaryeventtype AS "PrimaryEventType", prospecttier AS "ProspectTier",
-            region5 AS "Region5", missiondescriptionshort AS "MissionDescriptionShort"
-        FROM {table}
-        WHERE {where}
-        ORDER BY totalrevenue DESC
-        LIMIT {limit}
-    """
+
+    # Full exports stream every match; the page itself is keyset-paginated
+    fmt = data.get("format", "")
+    if fmt in ("csv", "ndjson"):
+        rows = iter_irs_search(where, tuple(params))
+        body = csv_stream(rows, IRS_SEARCH_COLUMNS) if fmt == "csv" else ndjson_stream(rows)
+        return streaming_response(body, fmt, f"irs_search.{fmt}")
+
+    after = None
+    if data.get("cursor"):
+        try:
+            after = decode_search_cursor(data["cursor"])
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
 
     try:
-        conn = get_irs_db()
-        cursor = conn.cursor()
-        cursor.execute(query, tuple(params))
-        columns = [desc[0] for desc in cursor.description]
-        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
-        conn.close()
-        return jsonify({"count": len(rows), "results": rows})
+        rows, next_cursor = irs_search_page(where, tuple(params), limit, after)
+        return jsonify({"count": len(rows), "results": rows, "next_cursor": next_cursor})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -2934,13 +3000,17 @@ def admin_system_page():
 
     # Running jobs
     running = [(jid, j) for jid, j in jobs.items() if j.get("status") == "running"]
+    sched = research_scheduler.stats()
     run_rows = ""
     for jid, j in running:
+        sj = sched["jobs"].get(jid)
+        lane = sj["lane"] if sj else "—"
+        slots = f'{sj["in_use"]} ({sj["waiting"]} queued)' if sj else "—"
         run_rows += (
             f'<tr><td>{jid[:12]}...</td><td>{j.get("processed",0)}/{j.get("total",0)}</td>'
-            f'<td>{j.get("found",0)}</td></tr>\n'
+            f'<td>{j.get("found",0)}</td><td>{lane}</td><td>{slots}</td></tr>\n'
         )
-    html = html.replace("{{RUNNING_ROWS}}", run_rows or '<tr><td colspan="3" style="text-align:center;color:#525252;">No jobs running</td></tr>')
+    html = html.replace("{{RUNNING_ROWS}}", run_rows or '<tr><td colspan="5" style="text-align:center;color:#525252;">No jobs running</td></tr>')
     html = html.replace("{{RUNNING_COUNT}}", str(len(running)))
 
     # Cache stats
@@ -2971,6 +3041,72 @@ def admin_system_page():
     uptime_mins = (uptime_secs % 3600) // 60
     html = html.replace("{{PYTHON_VERSION}}", sys.version.split()[0])
     html = html.replace("{{UPTIME}}", f"{uptime_hours}h {uptime_mins}m")
+    if POE_ASYNC_TRANSPORT:
+        ts = poe_transport.stats()
+        poe_info = f'{ts["in_flight"]} in flight / {ts["max_streams"]} max · {ts["completed"]} completed (shared event loop)'
+    else:
+        poe_info = "sync (one thread per call)"
+    html = html.replace("{{POE_TRANSPORT}}", poe_info)
+    ps = poe_pacing.stats()
+    latency = f'{ps["latency_s"]}s' if ps["latency_s"] is not None else "—"
+    html = html.replace("{{POE_PACING}}", (
+        f'window {ps["window"]} ({ps["in_flight"]} in flight) · pause {ps["pause_s"]}s · '
+        f'retry {ps["retry_delay_s"]}s · latency {latency} · {ps["decreases"]} backoff(s)'
+    ))
+    fs = research_flights.stats()
+    html = html.replace("{{SINGLE_FLIGHT}}", (
+        f'{fs["in_flight"]} in flight · {fs["shared"]} shared of {fs["leaders"] + fs["shared"]} calls'
+        + (' · advisory locks on' if SINGLEFLIGHT_PG_LOCKS else '')
+    ))
+    ls = research_lru_stats()
+    lookups = ls["hits"] + ls["misses"]
+    hit_rate = f' ({ls["hits"] / lookups:.0%})' if lookups else ""
+    html = html.replace("{{RESEARCH_LRU}}", (
+        f'{ls["size"]:,}/{ls["capacity"]:,} entries · {ls["hits"]:,} hits / {ls["misses"]:,} misses'
+        f'{hit_rate} · {ls["evictions"]:,} evictions'
+    ))
+    ns = negative_cache.stats()
+    html = html.replace("{{NEGATIVE_CACHE}}", (
+        f'{ns["keys"]:,} not_found keys · {ns["size_kb"]} KB · built {ns["age_s"] // 60}m ago · '
+        f'{ns["positives"]:,}/{ns["checks"]:,} positives' if ns["ready"] else "building…"
+    ))
+    try:
+        ast = artifact_stats()
+        ratio = f' ({ast["stored_bytes"] / ast["size_bytes"]:.0%} of raw)' if ast["size_bytes"] else ""
+        html = html.replace("{{ARTIFACTS}}", (
+            f'{ast["artifacts"]:,} blobs for {ast["links"]:,} result files · '
+            f'{ast["stored_bytes"] / 1048576:.1f} MB stored{ratio} · '
+            f'{artifact_store.backend.name}/{artifact_store.encoding} · {artifact_store.deduped} deduped'
+        ))
+    except Exception as e:
+        html = html.replace("{{ARTIFACTS}}", f"unavailable ({type(e).__name__})")
+    cs = checkpoint_writer.stats()
+    html = html.replace("{{CHECKPOINTS}}", (
+        f'{cs["buffered"]:,} buffered · {cs["rows_written"]:,} rows in {cs["batches"]:,} batches'
+        + (f' · {cs["errors"]} failed' if cs["errors"] else '')
+    ))
+    bt = batch_tracker.stats()
+    html = html.replace("{{EMAIL_BATCHES}}", (
+        f'{bt["outstanding"]} outstanding · {bt["completed"]:,} completed'
+        + (f' · {bt["adopted"]} taken over after a restart' if bt["adopted"] else '')
+        + (f' · {bt["expired"]} timed out' if bt["expired"] else '')
+    ))
+    html = html.replace("{{SCHEDULER}}", f'{sched["in_use"]}/{sched["capacity"]} slots in use · {sched["per_user_slots"]} max per user')
+
+    # Poe credential pool
+    pool_rows = ""
+    for c in credential_pool.stats():
+        health = '<span style="color:#4ade80">healthy</span>' if c["healthy"] else '<span style="color:#f87171">unhealthy</span>'
+        if c["breaker"] != "closed":
+            health += f' <span style="color:#fbbf24">· breaker {c["breaker"].replace("_", "-")}</span>'
+        latency = f'{c["latency_s"]}s' if c["latency_s"] is not None else "—"
+        pool_rows += (
+            f'<tr><td>{html_escape(c["name"])} ({c["key_prefix"]})</td><td>{html_escape(c["bot"])}</td>'
+            f'<td>{c["in_flight"]}/{c["max_in_flight"]}</td><td>{latency}</td>'
+            f'<td>{c["error_rate"]:.0%}</td><td>{c["rate_limit_rate"]:.0%}</td>'
+            f'<td>{c["calls"]}</td><td>{health}</td></tr>\n'
+        )
+    html = html.replace("{{POE_POOL_ROWS}}", pool_rows or '<tr><td colspan="8" style="text-align:center;color:#525252;">No Poe keys configured</td></tr>')
 
     return html
 
@@ -2981,7 +3117,6 @@ def admin_batch_runner():
     """Admin page showing all jobs from batch runner with real-time status and download links."""
     try:
         from db import _get_conn
-        import json as _jmod
         conn = _get_conn()
         cur = conn.cursor()
 
@@ -3021,36 +3156,11 @@ def admin_batch_runner():
 
                 # If cached counts are 0 but we have processed results, recount
                 if found_count == 0 and processed > 0:
-                    cur.execute("""
-                        SELECT result_json FROM job_results
-                        WHERE job_id = %s AND result_json IS NOT NULL
-                        LIMIT 200
-                    """, (job_id,))
-                    result_rows = cur.fetchall()
-                    dm_count = 0
-                    or_count = 0
-                    ev_count = 0
-                    found_count = 0
-                    for r in result_rows:
-                        try:
-                            result = _jmod.loads(r[0]) if isinstance(r[0], str) else r[0]
-                            if result.get("status") in ("found", "3rdpty_found"):
-                                found_count += 1
-                                tier, price = classify_lead_tier(result)
-                                if tier == "decision_maker":
-                                    dm_count += 1
-                                elif tier == "outreach_ready":
-                                    or_count += 1
-                                elif tier == "event_verified":
-                                    ev_count += 1
-                        except Exception:
-                            pass
-                    if result_rows and len(result_rows) < processed:
-                        scale = processed / len(result_rows)
-                        found_count = int(found_count * scale)
-                        dm_count = int(dm_count * scale)
-                        or_count = int(or_count * scale)
-                        ev_count = int(ev_count * scale)
+                    counts = job_tier_counts(job_id)
+                    found_count = counts["found"]
+                    dm_count = counts.get("decision_maker", 0)
+                    or_count = counts.get("outreach_ready", 0)
+                    ev_count = counts.get("event_verified", 0)
                 else:
                     dm_count = billable_count
                     or_count = 0
@@ -3194,22 +3304,9 @@ def admin_results_page():
         "gt_30d": exp_row[3] or 0,
     }
 
-    # Tier counts — need JSON but only for found results
-    cur.execute("""
-        SELECT result_json FROM research_cache
-        WHERE status IN ('found', '3rdpty_found')
-        AND expires_at > NOW()
-    """)
-    import json as _jmod
-    tier_counts = {}
-    for row in cur.fetchall():
-        try:
-            result = _jmod.loads(row[0]) if isinstance(row[0], str) else row[0]
-            tier, price = classify_lead_tier(result)
-            tier_counts[tier] = tier_counts.get(tier, 0) + 1
-        except Exception:
-            pass
     cur.close()
+    # Tier counts — aggregated in SQL on the extracted tier column
+    tier_counts = cache_tier_counts()
 
     found_count = status_counts.get("found", 0) + status_counts.get("3rdpty_found", 0)
     not_found_count = status_counts.get("not_found", 0)
@@ -3252,54 +3349,23 @@ def admin_results_page():
 @_admin_required
 def admin_results_export():
   try:
-    import json as _jmod
-    from db import _get_conn
     tier_filter = request.args.get("tier", "all")
     fmt = request.args.get("format", "csv")
 
-    conn = _get_conn()
-    cur = conn.cursor()
-    if tier_filter in ("all",):
-        cur.execute("SELECT result_json FROM research_cache WHERE expires_at > NOW()")
-    else:
-        cur.execute("SELECT result_json FROM research_cache WHERE status IN ('found', '3rdpty_found') AND expires_at > NOW()")
-    raw_rows = cur.fetchall()
-    cur.close()
-
-    filtered = []
-    for row in raw_rows:
-        try:
-            result = _jmod.loads(row[0]) if isinstance(row[0], str) else row[0]
-        except Exception:
-            continue
-        if tier_filter == "all":
-            filtered.append(result)
-        elif tier_filter == "all_found":
-            filtered.append(result)
-        else:
-            tier, price = classify_lead_tier(result)
-            if tier == tier_filter:
-                filtered.append(result)
-
-    if fmt == "json":
-        content = _jmod.dumps(filtered, indent=2, ensure_ascii=False)
-        return Response(
-            content,
-            mimetype="application/json",
-            headers={"Content-Disposition": f"attachment; filename=cache_export_{tier_filter}.json"},
+    def _rows():
+        return iter_cache_results(
+            found_only=tier_filter != "all",
+            tier=None if tier_filter in ("all", "all_found") else tier_filter,
         )
 
-    # CSV
-    buf = io.StringIO()
-    writer = csv.DictWriter(buf, fieldnames=CSV_COLUMNS, extrasaction="ignore", quoting=csv.QUOTE_ALL)
-    writer.writeheader()
-    for r in filtered:
-        writer.writerow({col: r.get(col, "") for col in CSV_COLUMNS})
-    return Response(
-        buf.getvalue(),
-        mimetype="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=cache_export_{tier_filter}.csv"},
-    )
+    filename = f"cache_export_{tier_filter}.{fmt}"
+    if fmt == "json":
+        return streaming_response(json_stream(_rows()), fmt, filename)
+    if fmt == "ndjson":
+        return streaming_response(ndjson_stream(_rows()), fmt, filename)
+    if fmt == "xlsx":
+        return streaming_response(xlsx_stream(_rows(), CSV_COLUMNS), fmt, filename)
+    return streaming_response(csv_stream(_rows(), CSV_COLUMNS), "csv", f"cache_export_{tier_filter}.csv")
   except Exception as e:
     print(f"[RESULTS EXPORT] CRASH: {type(e).__name__}: {e}", flush=True)
     return f"<h1>Export Error</h1><pre>{type(e).__name__}: {e}</pre>", 500
@@ -3317,90 +3383,36 @@ def admin_cleanup():
 @app.route("/admin/results/leads-export")
 @_admin_required
 def admin_leads_export():
-    """Export filtered leads from research cache — lightweight direct SQL query."""
+    """Export filtered leads from research cache — streamed as a ZIP of two CSVs."""
     try:
-        import zipfile
-        import json as _jmod
-        from db import _get_conn
-
         placeholder_names = {"no contact found", "not found", "n/a", "unknown", "none", "no name found", "no contact", "no name", ""}
         placeholder_emails = {"no email found", "not found", "n/a", "unknown", "none", "no email", ""}
-        min_date = datetime(2026, 4, 17)
-
-        conn = _get_conn()
-        cur = conn.cursor()
-        # Only pull found results — much lighter than loading everything
-        cur.execute("""
-            SELECT result_json FROM research_cache
-            WHERE status IN ('found', '3rdpty_found')
-            AND expires_at > NOW()
-        """)
-        rows = cur.fetchall()
-        cols = [desc[0] for desc in cur.description]
-        rows = [dict(zip(cols, r)) for r in rows]
-        cur.close()
-
-        leads_no_email = []
-        leads_with_email = []
-
-        for row in rows:
-            try:
-                result = _jmod.loads(row["result_json"]) if isinstance(row["result_json"], str) else row["result_json"]
-            except Exception:
-                continue
-
-            name = (result.get("contact_name") or "").strip()
-            if name.lower() in placeholder_names:
-                continue
-
-            date_str = (result.get("event_date") or "").strip()
-            if not date_str:
-                continue
-            try:
-                evt_date = datetime.strptime(date_str, "%m/%d/%Y")
-            except ValueError:
-                try:
-                    evt_date = datetime.strptime(date_str[:10], "%Y-%m-%d")
-                except ValueError:
+        min_date = datetime(2026, 4, 17).date()
+
+        def _leads(with_email: bool):
+            # Found results with a dated event on/after min_date (and an email, for the
+            # with-email file) are selected in SQL on the extracted columns.
+            # Each CSV makes its own pass over a server-side cursor, so nothing is held in memory.
+            count = 0
+            for result in iter_cache_results(found_only=True, min_event_date=min_date,
+                                             with_email=True if with_email else None):
+                name = (result.get("contact_name") or "").strip()
+                if name.lower() in placeholder_names:
                     continue
-            if evt_date < min_date:
-                continue
 
-            row_base = {col: result.get(col, "") for col in CSV_COLUMNS}
-            leads_no_email.append(row_base)
-
-            email = (result.get("contact_email") or "").strip()
-            if email.lower() not in placeholder_emails and "@" in email:
-                leads_with_email.append(row_base)
-
-        # Build CSVs
-        cols1 = CSV_COLUMNS
-        buf1 = io.StringIO()
-        w1 = csv.DictWriter(buf1, fieldnames=cols1, extrasaction="ignore", quoting=csv.QUOTE_ALL)
-        w1.writeheader()
-        for r in leads_no_email:
-            w1.writerow(r)
-
-        cols2 = CSV_COLUMNS
-        buf2 = io.StringIO()
-        w2 = csv.DictWriter(buf2, fieldnames=cols2, extrasaction="ignore", quoting=csv.QUOTE_ALL)
-        w2.writeheader()
-        for r in leads_with_email:
-            w2.writerow(r)
-
-        # Zip both files
-        zip_buf = io.BytesIO()
-        with zipfile.ZipFile(zip_buf, "w", zipfile.ZIP_DEFLATED) as zf:
-            zf.writestr("leads_no_email.csv", buf1.getvalue())
-            zf.writestr("leads_with_email.csv", buf2.getvalue())
-        zip_buf.seek(0)
-
-        print(f"[LEADS EXPORT] {len(leads_no_email)} contacts (no email), {len(leads_with_email)} with email", flush=True)
-        return Response(
-            zip_buf.getvalue(),
-            mimetype="application/zip",
-            headers={"Content-Disposition": "attachment; filename=leads_export.zip"},
-        )
+                if with_email:
+                    email = (result.get("contact_email") or "").strip()
+                    if email.lower() in placeholder_emails or "@" not in email:
+                        continue
+                count += 1
+                yield result
+            print(f"[LEADS EXPORT] {count} contacts ({'with' if with_email else 'no'} email)", flush=True)
+
+        body = zip_stream([
+            ("leads_no_email.csv", lambda: csv_stream(_leads(False), CSV_COLUMNS)),
+            ("leads_with_email.csv", lambda: csv_stream(_leads(True), CSV_COLUMNS)),
+        ])
+        return streaming_response(body, "zip", "leads_export.zip")
     except Exception as e:
         print(f"[LEADS EXPORT] CRASH: {type(e).__name__}: {e}", flush=True)
         import traceback; traceback.print_exc()
@@ -3552,6 +3564,7 @@ def admin_db_check():
 @_admin_required
 def admin_rebuild_job(job_id):
     """Rebuild a crashed job from saved individual results in job_results table."""
+    checkpoint_writer.flush(job_id)
     results = get_completed_results(job_id)
     if not results:
         return jsonify({"error": f"No saved results found for {job_id}"}), 404
@@ -3562,14 +3575,14 @@ def admin_rebuild_job(job_id):
     found_count = sum(1 for r in results if r.get("status") in ("found", "3rdpty_found"))
     billable_count = 0
     for r in results:
-        tier, price = classify_lead_tier(r)
+        tier, price = lead_tier(r)
         if tier != "not_billable":
             billable_count += 1
 
     # Generate export files (only billable leads)
     save_results = []
     for r in results:
-        tier, price = classify_lead_tier(r)
+        tier, price = lead_tier(r)
         if tier != "not_billable":
             save_results.append(r)
 
@@ -3604,16 +3617,12 @@ def admin_rebuild_job(job_id):
         ws.append([r.get(col, "") for col in CSV_COLUMNS])
     wb.save(xlsx_file)
 
-    # Save to DB
+    # Save to the artifact store (an unchanged rebuild dedupes to the existing blobs)
     try:
-        with open(csv_file, "rb") as f:
-            save_result_file(job_id, "csv", f.read())
-        with open(json_file, "rb") as f:
-            save_result_file(job_id, "json", f.read())
-        with open(xlsx_file, "rb") as f:
-            save_result_file(job_id, "xlsx", f.read())
+        for fmt, path in (("csv", csv_file), ("json", json_file), ("xlsx", xlsx_file)):
+            artifact_store.save_result(job_id, fmt, path)
     except Exception as e:
-        print(f"[REBUILD] Failed to save files to DB: {e}", flush=True)
+        print(f"[REBUILD] Failed to save files to artifact store: {e}", flush=True)
 
     # Update job status
     complete_search_job(job_id, found_count=found_count, billable_count=billable_count, total_cost_cents=0)
@@ -4066,17 +4075,34 @@ ADMIN_SYSTEM_HTML = """<!DOCTYPE html>
     <table style="font-size:13px;">
       <tr><td style="color:#737373;width:140px;">Python Version</td><td>{{PYTHON_VERSION}}</td></tr>
       <tr><td style="color:#737373;">Uptime</td><td>{{UPTIME}}</td></tr>
+      <tr><td style="color:#737373;">Poe Streams</td><td>{{POE_TRANSPORT}}</td></tr>
+      <tr><td style="color:#737373;">Research Slots</td><td>{{SCHEDULER}}</td></tr>
+      <tr><td style="color:#737373;">Poe Pacing</td><td>{{POE_PACING}}</td></tr>
+      <tr><td style="color:#737373;">Research Dedupe</td><td>{{SINGLE_FLIGHT}}</td></tr>
+      <tr><td style="color:#737373;">Cache LRU</td><td>{{RESEARCH_LRU}}</td></tr>
+      <tr><td style="color:#737373;">Negative Cache</td><td>{{NEGATIVE_CACHE}}</td></tr>
+      <tr><td style="color:#737373;">Result Checkpoints</td><td>{{CHECKPOINTS}}</td></tr>
+      <tr><td style="color:#737373;">Artifact Store</td><td>{{ARTIFACTS}}</td></tr>
+      <tr><td style="color:#737373;">Email Batches</td><td>{{EMAIL_BATCHES}}</td></tr>
     </table>
   </div>
 
   <div class="section-title">Running Jobs ({{RUNNING_COUNT}})</div>
   <div class="panel" style="overflow-x:auto;margin-bottom:20px;">
     <table>
-      <thead><tr><th>Job ID</th><th>Progress</th><th>Found</th></tr></thead>
+      <thead><tr><th>Job ID</th><th>Progress</th><th>Found</th><th>Lane</th><th>Slots</th></tr></thead>
       <tbody>{{RUNNING_ROWS}}</tbody>
     </table>
   </div>
 
+  <div class="section-title">Poe Credential Pool</div>
+  <div class="panel" style="overflow-x:auto;margin-bottom:20px;">
+    <table>
+      <thead><tr><th>Key</th><th>Bot</th><th>In Flight</th><th>Latency</th><th>Error Rate</th><th>429 Rate</th><th>Calls</th><th>Health</th></tr></thead>
+      <tbody>{{POE_POOL_ROWS}}</tbody>
+    </table>
+  </div>
+
   <div class="section-title">Research Cache ({{CACHE_TOTAL}} entries)</div>
   <div class="panel" style="overflow-x:auto;margin-bottom:20px;">
     <table>
@@ -4176,6 +4202,8 @@ ADMIN_RESULTS_HTML = """<!DOCTYPE html>
   <div class="export-bar">
     <a href="/admin/results/export?tier=all_found&format=json" class="btn-outline">All Found JSON</a>
     <a href="/admin/results/export?tier=all&format=json" class="btn-outline">Everything JSON</a>
+    <a href="/admin/results/export?tier=all&format=ndjson" class="btn-outline">Everything NDJSON</a>
+    <a href="/admin/results/export?tier=all_found&format=xlsx" class="btn-outline">All Found XLSX</a>
   </div>
 
   <div class="section-title">Status Breakdown</div>
@@ -4533,6 +4561,8 @@ WALLET_HTML = """<!DOCTYPE html>
   .balance-card { background: #111111; border: 1px solid #262626; border-radius: 12px; padding: 32px; text-align: center; margin-bottom: 24px; }
   .balance-card .amount { font-size: 48px; font-weight: 700; color: #4ade80; margin: 16px 0; }
   .balance-card .label { color: #a3a3a3; font-size: 14px; text-transform: uppercase; }
+  .balance-card .hold { color: #eab308; font-size: 13px; }
+  .balance-card .hold-job { color: #737373; font-size: 11px; margin-top: 4px; }
   .topup-section { background: #111111; border: 1px solid #262626; border-radius: 12px; padding: 24px; margin-bottom: 24px; }
   .topup-section h3 { font-size: 16px; margin-bottom: 12px; color: #d4d4d4; }
   .amount-row { display: flex; gap: 12px; align-items: center; margin-bottom: 16px; }
@@ -4561,6 +4591,7 @@ WALLET_HTML = """<!DOCTYPE html>
   <div class="balance-card">
     <div class="label">Wallet Balance</div>
     <div class="amount" id="balanceDisplay">{{BALANCE}}</div>
+    {{HOLDS}}
   </div>
 
   <div class="topup-section">
@@ -5905,7 +5936,7 @@ DATABASE_HTML = """<!DOCTYPE html>
 
     <div class="section-title">Settings</div>
     <div class="filter-grid">
-      <div class="fg"><label>Max Results</label>
+      <div class="fg"><label>Results Per Page</label>
         <select id="fLimit">
           <option value="50">50</option><option value="100" selected>100</option>
           <option value="200">200</option><option value="500">500</option>
@@ -5951,6 +5982,8 @@ DATABASE_HTML = """<!DOCTYPE html>
 
     <div class="controls">
       <button class="btn-primary" onclick="searchIRS()">Search Database</button>
+      <button class="btn-primary" id="moreBtn" style="display:none;" onclick="searchIRS(true)">Load More</button>
+      <button class="btn-primary" onclick="exportIRS()">Export CSV</button>
       <button class="btn-send" id="sendBtn" disabled onclick="sendToFinder()">Add Selected to Queue</button>
       <button class="btn-send" id="goBtn" style="display:none;" onclick="window.location.href='/'">Go to Auction Finder</button>
       <span class="result-count" id="resultCount"></span>
@@ -6026,8 +6059,10 @@ function tierHtml(t) {
   return '<span class="tier '+cls+'">'+t+'</span>';
 }
 
-function searchIRS() {
-  const body = {
+let irsCursor = null;
+
+function irsFilters() {
+  return {
     name: document.getElementById('fName').value,
     state: document.getElementById('fState').value,
     region: document.getElementById('fRegion').value,
@@ -6054,15 +6089,24 @@ function searchIRS() {
     event2_contributions: document.getElementById('fE2Contrib').value,
     event2_revenue: document.getElementById('fE2Revenue').value,
   };
+}
+
+function searchIRS(more) {
+  const body = irsFilters();
+  if(more){
+    if(!irsCursor) return;
+    body.cursor = irsCursor;
+  }
 
   document.getElementById('resultCount').textContent='Searching...';
 
   fetch('/api/irs/search',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify(body)})
     .then(r=>r.json()).then(data => {
       if(data.error){alert(data.error);return;}
-      document.getElementById('resultCount').textContent=data.count+' results';
+      irsCursor=data.next_cursor||null;
+      document.getElementById('moreBtn').style.display=irsCursor?'':'none';
       const tbody=document.getElementById('tbody');
-      tbody.innerHTML='';
+      if(!more) tbody.innerHTML='';
       data.results.forEach(r => {
         const tr=document.createElement('tr');
         const kw1=r.Event1Keyword||'';
@@ -6088,9 +6132,29 @@ function searchIRS() {
           '<td title="'+(r.Event2Name||'')+'">'+(r.Event2Name||'-')+'</td>';
         tbody.appendChild(tr);
       });
+      document.getElementById('resultCount').textContent=tbody.children.length+' results'+(irsCursor?' (more available)':'');
     });
 }
 
+function exportIRS() {
+  const body = irsFilters();
+  body.format = 'csv';
+  const count=document.getElementById('resultCount');
+  const prev=count.textContent;
+  count.textContent='Exporting...';
+  fetch('/api/irs/search',{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify(body)})
+    .then(r=>{ if(!r.ok) throw new Error('Export failed ('+r.status+')'); return r.blob(); })
+    .then(blob => {
+      const a=document.createElement('a');
+      a.href=URL.createObjectURL(blob);
+      a.download='irs_search.csv';
+      a.click();
+      URL.revokeObjectURL(a.href);
+      count.textContent=prev;
+    })
+    .catch(e => { count.textContent=prev; alert(e.message); });
+}
+
 function toggleAll(){
   const c=document.getElementById('selectAll').checked;
   document.querySelectorAll('#tbody input[type=checkbox]').forEach(cb=>{cb.checked=c;});
@@ -7289,6 +7353,7 @@ API_DOCS_HTML = """<!DOCTYPE html>
       <tbody>
         <tr><td>domains</td><td class="type">list[str]</td><td>List of nonprofit domains (e.g. ["habitat.org", "redcross.org"])</td></tr>
         <tr><td>selected_tiers</td><td class="type">list[str]</td><td>Optional. Tiers to bill: "decision_maker", "outreach_ready", "event_verified". Default: all.</td></tr>
+        <tr><td>skip_known_not_found</td><td class="type">bool</td><td>Optional. Drop domains that already came back not_found (not researched, not billed). Default: false.</td></tr>
       </tbody>
     </table>
     <p style="margin-top:12px;color:#737373;font-size:11px;">Example:</p>
@@ -7412,6 +7477,21 @@ new_job = resp.json()
 print(f"Resumed as {new_job['job_id']} — {new_job['remaining_domains']} domains left")</pre>
   </div>
 
+  <!-- PRESCREEN -->
+  <div class="endpoint">
+    <span class="method method-post">POST</span>
+    <span class="path">/api/v1/prescreen</span>
+    <p class="desc">Check a domain list for domains already known to be not_found, without starting a job or charging anything.</p>
+    <pre># Remove known dead domains before submitting
+resp = requests.post(
+    f"{BASE}/api/v1/prescreen",
+    headers={"Authorization": f"Bearer {API_KEY}"},
+    json={"domains": domains}
+)
+dead = set(resp.json()["known_not_found"])
+domains = [d for d in domains if d not in dead]</pre>
+  </div>
+
   <!-- FULL EXAMPLE -->
   <h3>Complete Example</h3>
   <pre>import requests
@@ -8624,10 +8704,35 @@ init_db()
 print("Database initialized.", file=sys.stderr)
 
 cleanup_stale_running_jobs()
+release_orphaned_holds()
 cleanup_expired_jobs()
+artifact_store.collect_garbage()
 flush_uncertain_cache()
 cleanup_expired_cache()
+cleanup_email_verifications()
 cleanup_old_job_results()
+batch_tracker.resume()
+threading.Thread(target=ensure_irs_schema, name="irs-schema", daemon=True).start()
+negative_cache.start(iter_not_found_cache_keys, count_source=count_not_found_cache_keys)
+
+
+def _result_tier_loop():
+    """Background loop — backfill result columns once, then downgrade expired lead tiers hourly.
+    Runs in one worker (advisory lock); the others retry hourly in case it exits."""
+    while True:
+        try:
+            with try_advisory_lock("result-tier-sweep") as held:
+                if held:
+                    backfill_result_columns()
+                    while True:
+                        retier_expired_results()
+                        time.sleep(3600)  # 1 hour
+        except Exception as e:
+            print(f"[DB] Result tier sweep error: {e}", flush=True)
+        time.sleep(3600)
+
+
+threading.Thread(target=_result_tier_loop, name="result-tier-sweep", daemon=True).start()
 
 
 # ─── REST API v1 ─────────────────────────────────────────────────────────────
@@ -8652,6 +8757,16 @@ def api_v1_search():
     if not nonprofits:
         return jsonify({"error": "No valid domains provided"}), 400
 
+    # Optional: drop domains already known to be not_found (never researched or billed)
+    skipped_dead = 0
+    if data.get("skip_known_not_found"):
+        dead = prescreen_not_found(nonprofits)
+        if dead:
+            skipped_dead = len(dead)
+            nonprofits = [n for n in nonprofits if n not in dead]
+            if not nonprofits:
+                return jsonify({"error": "Every domain is a known not_found result", "skipped_known_not_found": skipped_dead}), 400
+
     valid_tiers = {"decision_maker", "outreach_ready", "event_verified"}
     selected_tiers = [t for t in data.get("selected_tiers", list(valid_tiers)) if t in valid_tiers]
     if not selected_tiers:
@@ -8662,8 +8777,6 @@ def api_v1_search():
         balance = get_balance(user_id)
         count = len(nonprofits)
         fee_per = get_research_fee_cents(count)
-        ESTIMATED_HIT_RATE = 0.55
-        ESTIMATED_AVG_LEAD_CENTS = 125
         research_cost = count * fee_per
         estimated_lead_cost = int(count * ESTIMATED_HIT_RATE * ESTIMATED_AVG_LEAD_CENTS)
         estimated_total = research_cost + estimated_lead_cost
@@ -8693,21 +8806,44 @@ def api_v1_search():
     create_search_job(user_id, job_id, len(nonprofits))
 
     _user_email = getattr(request, "_api_email", "")
-    thread = threading.Thread(
+    research_scheduler.start_job(
+        job_id, user_id, lane_for(len(nonprofits), interactive=False),
         target=_job_worker,
         args=(nonprofits, job_id, progress_q),
-        kwargs={"user_id": user_id, "is_admin": is_admin, "is_trial": is_trial, "selected_tiers": selected_tiers, "user_email": _user_email},
-        daemon=True,
+        kwargs={"user_id": user_id, "is_admin": is_admin, "is_trial": is_trial, "selected_tiers": selected_tiers, "user_email": _user_email, "workers": min(JOB_WORKERS, research_scheduler.job_workers)},
     )
-    thread.start()
 
     return jsonify({
         "job_id": job_id,
         "total_domains": len(nonprofits),
+        "skipped_known_not_found": skipped_dead,
         "status": "running",
     })
 
 
+@app.route("/api/v1/prescreen", methods=["POST"])
+@api_auth
+def api_v1_prescreen():
+    """Screen a domain list for known not_found results without starting a job.
+    Screened in memory by the negative cache; positives confirmed in one DB query."""
+    data = request.get_json()
+    if not data:
+        return jsonify({"error": "JSON body required"}), 400
+    raw_domains = data.get("domains", [])
+    if isinstance(raw_domains, str):
+        raw_domains = [d.strip() for d in raw_domains.replace(",", "\n").split("\n") if d.strip()]
+    # Answer in the caller's own spelling so client-side exclude sets match
+    canonical = {raw: canonical_domain(raw) for raw in raw_domains if isinstance(raw, str) and raw.strip()}
+    dead = prescreen_not_found(sorted(set(canonical.values())))
+    known = [raw for raw, key in canonical.items() if key in dead]
+    return jsonify({
+        "total_domains": len(canonical),
+        "known_not_found": known,
+        "remaining": len(canonical) - len(known),
+        "filter_ready": negative_cache.ready,
+    })
+
+
 @app.route("/api/v1/status/<job_id>")
 @api_auth
 def api_v1_status(job_id):
@@ -8723,21 +8859,7 @@ def api_v1_status(job_id):
             # Calculate decision_makers from job_results
             decision_makers = 0
             try:
-                from db import _get_conn
-                import json as _jmod
-                conn = _get_conn()
-                cur = conn.cursor()
-                cur.execute("SELECT result_json FROM job_results WHERE job_id = %s", (job_id,))
-                for row in cur.fetchall():
-                    try:
-                        result = _jmod.loads(row[0]) if isinstance(row[0], str) else row[0]
-                        if result:
-                            tier, _ = classify_lead_tier(result)
-                            if tier == "decision_maker":
-                                decision_makers += 1
-                    except Exception:
-                        pass
-                cur.close()
+                decision_makers = job_tier_counts(job_id).get("decision_maker", 0)
             except Exception:
                 pass
 
@@ -8797,7 +8919,19 @@ def api_v1_results(job_id):
     # Try in-memory job first
     job = jobs.get(job_id)
     if job and job["status"] != "complete":
-        # Job still running — return partial results from job_results table
+        # Job still running — serve the partial CSV assembled from its append-only chunks,
+        # plus the rows published since the last chunk (chunks are written every 100)
+        partial = _partial_csv(job_id) if fmt == "csv" else None
+        if partial is not None:
+            return Response(
+                partial,
+                mimetype="text/csv",
+                headers={
+                    "Content-Disposition": f'attachment; filename="auction_results_{job_id}_partial.csv"',
+                    "X-Job-Status": "running",
+                },
+            )
+        checkpoint_writer.flush(job_id)
         results = get_completed_results(job_id)
         if not results:
             return jsonify({"error": "Job still running, no results yet"}), 202
@@ -8811,6 +8945,9 @@ def api_v1_results(job_id):
             download_name=f"auction_results_{job_id}.{fmt}",
         )
 
+    stored = _artifact_response(job_id, fmt)
+    if stored is not None:
+        return stored
     content = get_result_file(job_id, fmt)
     if content is None:
         return jsonify({"error": "Results not found"}), 404
@@ -8856,6 +8993,7 @@ def api_v1_resume(job_id):
         return jsonify({"error": "Cannot resume: original domain list not found for this job."}), 404
 
     # Load completed domains
+    checkpoint_writer.flush(job_id)
     completed = get_completed_domains(job_id)
     remaining = [d for d in original_domains if d not in completed]
 
@@ -8874,8 +9012,6 @@ def api_v1_resume(job_id):
         balance = get_balance(user_id)
         count = len(remaining)
         fee_per = get_research_fee_cents(count)
-        ESTIMATED_HIT_RATE = 0.55
-        ESTIMATED_AVG_LEAD_CENTS = 125
         estimated_total = count * fee_per + int(count * ESTIMATED_HIT_RATE * ESTIMATED_AVG_LEAD_CENTS)
         if balance < estimated_total:
             return jsonify({
@@ -8911,13 +9047,12 @@ def api_v1_resume(job_id):
         print(f"[RESUME] Failed to set resumed_from: {e}", flush=True)
 
     _user_email = getattr(request, "_api_email", "")
-    thread = threading.Thread(
+    research_scheduler.start_job(
+        new_job_id, user_id, lane_for(len(remaining), interactive=False),
         target=_job_worker,
         args=(remaining, new_job_id, progress_q),
-        kwargs={"user_id": user_id, "is_admin": is_admin, "is_trial": is_trial, "selected_tiers": selected_tiers, "user_email": _user_email},
-        daemon=True,
+        kwargs={"user_id": user_id, "is_admin": is_admin, "is_trial": is_trial, "selected_tiers": selected_tiers, "user_email": _user_email, "workers": min(JOB_WORKERS, research_scheduler.job_workers)},
     )
-    thread.start()
 
     return jsonify({
         "job_id": new_job_id,
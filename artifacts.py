@@ -0,0 +1,226 @@
+"""
+AUCTIONFINDER — Content-addressed, compressed artifact store for result files
+
+Result files (csv/json/xlsx) used to be copied whole and uncompressed into the
+result_files BYTEA table for every job. They are now stored once per distinct
+content:
+
+  - the key is the SHA-256 of the raw bytes, so identical files (rebuilds,
+    re-exports, duplicate jobs) are stored once;
+  - blobs are compressed with zstd when `zstandard` is installed, else gzip;
+  - blobs live in a backend — Postgres large objects (default; survive redeploys
+    without bloating tables) or the local filesystem (ARTIFACT_BACKEND=local,
+    lost on redeploy, so a job's legacy result_files copy is kept alongside);
+  - the artifacts / result_artifacts tables index hash -> blob and job -> file;
+  - collect_garbage() drops artifacts no remaining job links to (large objects
+    unlinked, local blobs removed) once their jobs expire.
+
+Downloads are served still compressed (Content-Encoding) when the client accepts
+the artifact's encoding, and decompressed on the fly otherwise.
+
+Configuration (env):
+    ARTIFACT_BACKEND       "pg" (default) or "local"
+    ARTIFACT_DIR           local backend root (default <RESULTS_DIR>/artifacts)
+    ARTIFACT_COMPRESSION   "zstd" or "gzip" (default zstd if available)
+"""
+
+import gzip
+import hashlib
+import os
+import shutil
+import tempfile
+import zlib
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from dotenv import load_dotenv
+load_dotenv()
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from db import (
+    get_artifact, insert_artifact, insert_lo_artifact, link_result_artifact,
+    get_result_artifact, delete_unreferenced_artifacts, lo_iter,
+)
+
+# ─── Configuration ────────────────────────────────────────────────────────────
+
+ARTIFACT_BACKEND = os.environ.get("ARTIFACT_BACKEND", "pg").strip().lower()
+ARTIFACT_DIR = os.environ.get(
+    "ARTIFACT_DIR",
+    os.path.join(os.environ.get("RESULTS_DIR", "results"), "artifacts"),
+)
+ARTIFACT_COMPRESSION = os.environ.get(
+    "ARTIFACT_COMPRESSION", "zstd" if zstandard is not None else "gzip"
+).strip().lower()
+if ARTIFACT_COMPRESSION == "zstd" and zstandard is None:
+    ARTIFACT_COMPRESSION = "gzip"
+
+_BLOCK = 256 * 1024
+
+
+# ─── Compression ──────────────────────────────────────────────────────────────
+
+def _compress_file(src: str, dst, encoding: str) -> Tuple[str, int]:
+    """Compress `src` into the open binary file `dst`. Returns (sha256 of raw bytes, raw size)."""
+    digest = hashlib.sha256()
+    size = 0
+    if encoding == "zstd":
+        writer = zstandard.ZstdCompressor(level=10).stream_writer(dst, closefd=False)
+    else:
+        writer = gzip.GzipFile(fileobj=dst, mode="wb", compresslevel=6, mtime=0)
+    with open(src, "rb") as f, writer:
+        while True:
+            block = f.read(_BLOCK)
+            if not block:
+                break
+            digest.update(block)
+            size += len(block)
+            writer.write(block)
+    return digest.hexdigest(), size
+
+
+def _decompress(chunks: Iterator[bytes], encoding: str) -> Iterator[bytes]:
+    if encoding == "zstd":
+        d = zstandard.ZstdDecompressor().decompressobj()
+    else:
+        d = zlib.decompressobj(wbits=31)  # gzip container
+    for chunk in chunks:
+        out = d.decompress(chunk)
+        if out:
+            yield out
+    if encoding != "zstd":
+        tail = d.flush()
+        if tail:
+            yield tail
+
+
+# ─── Backends ─────────────────────────────────────────────────────────────────
+
+class LocalBackend:
+    name = "local"
+    durable = False  # the container filesystem doesn't survive a redeploy
+
+    def __init__(self, root: str = ARTIFACT_DIR):
+        self.root = root
+
+    def _path(self, sha256: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256)
+
+    def save(self, sha256: str, blob_path: str, encoding: str, size: int, stored: int,
+             replace: bool = False) -> bool:
+        path = self._path(sha256)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.move(blob_path, path)  # same content as any concurrent writer's, same path
+        return insert_artifact(sha256, encoding, size, stored, self.name, None, replace)
+
+    def exists(self, row: Dict[str, Any]) -> bool:
+        return os.path.exists(self._path(row["sha256"]))
+
+    def iter(self, row: Dict[str, Any]) -> Iterator[bytes]:
+        with open(self._path(row["sha256"]), "rb") as f:
+            while True:
+                block = f.read(_BLOCK)
+                if not block:
+                    break
+                yield block
+
+    def remove(self, row: Dict[str, Any]):
+        try:
+            os.unlink(self._path(row["sha256"]))
+        except FileNotFoundError:
+            pass
+
+
+class PgLargeObjectBackend:
+    name = "pg"
+    durable = True
+
+    def save(self, sha256: str, blob_path: str, encoding: str, size: int, stored: int,
+             replace: bool = False) -> bool:
+        return insert_lo_artifact(blob_path, sha256, encoding, size, stored, replace)
+
+    def exists(self, row: Dict[str, Any]) -> bool:
+        return row.get("loid") is not None
+
+    def iter(self, row: Dict[str, Any]) -> Iterator[bytes]:
+        return lo_iter(row["loid"])
+
+    def remove(self, row: Dict[str, Any]):
+        pass  # unlinked by db.delete_unreferenced_artifacts, in the same transaction
+
+
+_BACKENDS = {"local": LocalBackend, "pg": PgLargeObjectBackend}
+
+
+# ─── Store ────────────────────────────────────────────────────────────────────
+
+class ArtifactStore:
+    def __init__(self, backend: str = ARTIFACT_BACKEND, encoding: str = ARTIFACT_COMPRESSION):
+        self.backends = {name: cls() for name, cls in _BACKENDS.items()}
+        self.backend = self.backends.get(backend, self.backends["pg"])
+        self.encoding = encoding
+        self.deduped = 0
+
+    def put_file(self, path: str) -> str:
+        """Store a file's content (once per distinct content). Returns its sha256."""
+        fd, tmp = tempfile.mkstemp(suffix=".blob")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                sha256, size = _compress_file(path, out, self.encoding)
+            existing = get_artifact(sha256)
+            if existing and self.backends[existing["backend"]].exists(existing):
+                self.deduped += 1
+                return sha256
+            # Store the blob and record it together; a row whose blob is gone is taken over
+            stored = os.path.getsize(tmp)
+            if not self.backend.save(sha256, tmp, self.encoding, size, stored, replace=existing is not None):
+                self.deduped += 1  # a concurrent writer recorded the same content first
+            return sha256
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+
+    def save_result(self, job_id: str, fmt: str, path: str) -> str:
+        """Store a job's result file and link it as the job's `fmt` download."""
+        sha256 = self.put_file(path)
+        link_result_artifact(job_id, fmt, sha256, durable=self.backend.durable)
+        return sha256
+
+    def collect_garbage(self) -> int:
+        """Delete artifacts of expired jobs and their blobs. Returns the number deleted."""
+        try:
+            rows = delete_unreferenced_artifacts()
+        except Exception as e:
+            print(f"[ARTIFACTS] Garbage collection failed: {e}", flush=True)
+            return 0
+        for row in rows:
+            backend = self.backends.get(row["backend"])
+            if backend is not None:
+                backend.remove(row)
+        if rows:
+            print(f"[ARTIFACTS] Deleted {len(rows)} unreferenced artifact(s)", flush=True)
+        return len(rows)
+
+    def open_result(self, job_id: str, fmt: str) -> Optional[Dict[str, Any]]:
+        """The artifacts row for a job's result file, if it is stored and readable here."""
+        row = get_result_artifact(job_id, fmt)
+        if row is None or row["backend"] not in self.backends:
+            return None
+        if not self.backends[row["backend"]].exists(row):
+            return None  # e.g. local blob lost on redeploy
+        return row
+
+    def iter_stored(self, row: Dict[str, Any]) -> Iterator[bytes]:
+        """The blob exactly as stored (compressed with row["encoding"])."""
+        return self.backends[row["backend"]].iter(row)
+
+    def iter_raw(self, row: Dict[str, Any]) -> Iterator[bytes]:
+        """The original file content, decompressed on the fly."""
+        return _decompress(self.iter_stored(row), row["encoding"])
+
+
+# Process-wide singleton
+artifact_store = ArtifactStore()
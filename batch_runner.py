@@ -352,6 +352,7 @@ class BatchRunner(tk.Tk):
         self.exclude_var = tk.StringVar(value="")
         ttk.Label(excl_frame, textvariable=self.exclude_var).pack(side="left", padx=(5, 10))
         ttk.Button(excl_frame, text="Load Exclude", command=self.load_exclude).pack(side="left", padx=2)
+        ttk.Button(excl_frame, text="Exclude Known Not Found", command=self.exclude_known_not_found).pack(side="left", padx=2)
         self.exclude_count_var = tk.StringVar(value="")
         ttk.Label(excl_frame, textvariable=self.exclude_count_var, foreground="#ef4444").pack(side="left", padx=10)
 
@@ -425,6 +426,35 @@ class BatchRunner(tk.Tk):
         self.exclude_var.set(os.path.basename(path))
         self._update_counts()
 
+    def exclude_known_not_found(self):
+        """Ask the server which loaded domains are known not_found and add them to the exclude set."""
+        api_key = next((s.key_var.get().strip() for s in self.streams if s.key_var.get().strip()), "")
+        if not api_key or not self.domains:
+            messagebox.showwarning("Prescreen", "Load a domains file and enter at least one API key.")
+            return
+
+        def _run():
+            dead = set()
+            try:
+                for i in range(0, len(self.domains), 5000):
+                    self.summary_var.set(f"Prescreening {i:,}/{len(self.domains):,}...")
+                    resp = requests.post(
+                        f"{API_BASE}/api/v1/prescreen",
+                        json={"domains": self.domains[i:i + 5000]},
+                        headers={"X-API-Key": api_key},
+                        timeout=60,
+                    )
+                    resp.raise_for_status()
+                    dead.update(resp.json().get("known_not_found", []))
+            except Exception as e:
+                self.summary_var.set(f"Prescreen failed: {e}")
+                return
+            self.exclude_domains |= dead
+            self.summary_var.set(f"Prescreen: {len(dead):,} known not_found domains excluded")
+            self.after(0, self._update_counts)
+
+        threading.Thread(target=_run, daemon=True).start()
+
     def _update_counts(self):
         total = len(self.domains)
         excluded = sum(1 for d in self.domains if d in self.exclude_domains)
@@ -0,0 +1,160 @@
+"""
+AUCTIONFINDER — Per-job billing ledger and wallet holds
+
+Researching a domain used to cost 4-6 Postgres round trips just for billing
+(get_balance up to three times, then separate commits for the research and
+lead fee), and concurrent jobs of one user could overdraw the wallet.
+
+A JobLedger now reserves the job's estimated cost up front as a wallet hold
+(db.hold_funds: one conditional UPDATE, so concurrent jobs can't reserve the
+same money twice). Fees are checked and debited against the hold in memory;
+when the hold runs short it is topped up in BILLING_HOLD_TOPUP_CENTS chunks.
+Charges are flushed to transactions/wallets in one DB transaction every
+BILLING_FLUSH_EVERY line items or BILLING_FLUSH_SECONDS, and the remainder of
+the hold is released at job end, stop or crash (and at server startup for
+holds orphaned by a restart).
+
+Line items are written exactly as charge_research_fee/charge_lead_fee wrote
+them (one row per fee, same type and description), so get_job_breakdowns and
+get_user_paid_domains are unaffected.
+
+Configuration (env):
+    BILLING_FLUSH_EVERY         line items per flush (default 25)
+    BILLING_FLUSH_SECONDS       max age of an unflushed charge (default 10)
+    BILLING_HOLD_TOPUP_CENTS    minimum hold top-up when the hold runs short (default 500)
+"""
+
+import os
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from db import apply_charges, get_research_fee_cents, hold_funds, release_hold
+
+# ─── Configuration ────────────────────────────────────────────────────────────
+
+BILLING_FLUSH_EVERY = max(1, int(os.environ.get("BILLING_FLUSH_EVERY", "25")))
+BILLING_FLUSH_SECONDS = float(os.environ.get("BILLING_FLUSH_SECONDS", "10"))
+BILLING_HOLD_TOPUP_CENTS = max(1, int(os.environ.get("BILLING_HOLD_TOPUP_CENTS", "500")))
+
+# Pre-search estimate, shared with the search routes' balance checks
+ESTIMATED_HIT_RATE = 0.55
+ESTIMATED_AVG_LEAD_CENTS = 125  # weighted average across 3 tiers
+
+
+def estimate_job_cost(count: int, is_trial: bool = False) -> int:
+    """Estimated cost in cents of researching `count` nonprofits.
+    Trial users only pay for real results, so only lead fees are estimated."""
+    lead_cost = int(count * ESTIMATED_HIT_RATE * ESTIMATED_AVG_LEAD_CENTS)
+    if is_trial:
+        return lead_cost
+    return count * get_research_fee_cents(count) + lead_cost
+
+
+class JobLedger:
+    """In-memory billing for one job against its wallet hold. Thread-safe; shared by the job's workers."""
+
+    def __init__(self, user_id: int, job_id: str, total: int, is_trial: bool = False):
+        self.user_id = user_id
+        self.job_id = job_id
+        self.research_fee = get_research_fee_cents(total)
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[str, int, str]] = []  # (type, amount_cents (negative), description)
+        self._pending_cents = 0
+        self._last_flush = time.monotonic()
+        self.charged_cents = 0
+        self.flushes = 0
+        self.topups = 0
+        wallet = hold_funds(user_id, job_id, estimate_job_cost(total, is_trial))
+        self._hold = wallet["held"]  # unspent part of the hold, net of pending charges
+        self._db_balance = wallet["balance_cents"]
+        print(f"[BILLING] {job_id}: holding ${self._hold/100:.2f} for {total} nonprofit(s)", flush=True)
+
+    @property
+    def balance(self) -> int:
+        """Wallet balance as of the last DB write, minus charges not yet flushed."""
+        with self._lock:
+            return self._db_balance - self._pending_cents
+
+    def _top_up(self, shortfall: int) -> bool:
+        """Grow the hold by at least `shortfall` (a chunk if possible). Caller holds the lock."""
+        wallet = hold_funds(self.user_id, self.job_id,
+                            max(shortfall, BILLING_HOLD_TOPUP_CENTS), min_cents=shortfall)
+        if not wallet["held"]:
+            return False
+        self._hold += wallet["held"]
+        self.topups += 1
+        return True
+
+    def charge(self, research_fee: int = 0, lead_tier: str = "", lead_price: int = 0,
+               nonprofit: str = "") -> bool:
+        """Atomically debit a research fee and/or lead fee from the hold.
+        Returns False (nothing recorded) if the hold can't cover both and can't be topped up."""
+        cost = research_fee + max(0, lead_price)
+        with self._lock:
+            if self._hold < cost and not self._top_up(cost - self._hold):
+                return False
+            if research_fee:
+                self._pending.append(("research_fee", -research_fee,
+                                      f"Research fee: 1 nonprofit(s) @ ${research_fee/100:.2f}"))
+            if lead_price > 0:
+                self._pending.append(("lead_fee", -lead_price, f"Lead fee ({lead_tier}): {nonprofit}"))
+            self._hold -= cost
+            self._pending_cents += cost
+            self.charged_cents += cost
+            due = (len(self._pending) >= BILLING_FLUSH_EVERY
+                   or time.monotonic() - self._last_flush >= BILLING_FLUSH_SECONDS)
+        if due:
+            self.flush()
+        return True
+
+    def maybe_flush(self):
+        """Flush if the oldest pending charge is older than BILLING_FLUSH_SECONDS."""
+        with self._lock:
+            due = self._pending and time.monotonic() - self._last_flush >= BILLING_FLUSH_SECONDS
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write pending line items in one DB transaction, settling them against the hold."""
+        with self._lock:
+            items = self._pending
+            if not items:
+                self._last_flush = time.monotonic()
+                return
+            try:
+                wallet = apply_charges(self.user_id, self.job_id, items)
+            except Exception as e:
+                # Keep the items pending; the next flush (or close) retries them
+                print(f"[BILLING WARN] {self.job_id}: flush of {len(items)} item(s) failed: {e}", flush=True)
+                return
+            self._db_balance = wallet["balance_cents"]
+            self._pending, self._pending_cents = [], 0
+            self._last_flush = time.monotonic()
+            self.flushes += 1
+
+    def close(self):
+        """Final flush and release of the unspent hold, at job end, stop or crash."""
+        self.flush()
+        with self._lock:
+            if self._pending:
+                print(f"[BILLING ERROR] {self.job_id}: {len(self._pending)} charge(s) "
+                      f"({self._pending_cents}c) could not be written: {self._pending}", flush=True)
+        try:
+            released = release_hold(self.job_id)
+            print(f"[BILLING] {self.job_id}: charged ${self.charged_cents/100:.2f}, "
+                  f"released ${released/100:.2f} hold", flush=True)
+        except Exception as e:
+            # The startup sweep (db.release_orphaned_holds) frees it if this keeps failing
+            print(f"[BILLING WARN] {self.job_id}: hold release failed: {e}", flush=True)
+
+
+def ledger_for(user_id: Optional[int], job_id: str, total: int, is_admin: bool = False,
+               is_trial: bool = False) -> Optional[JobLedger]:
+    """The job's ledger, or None when the job isn't billed (admin / anonymous)."""
+    if not user_id or is_admin:
+        return None
+    return JobLedger(user_id, job_id, total, is_trial)
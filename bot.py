@@ -2,17 +2,19 @@
 """
 AUCTIONFINDER — Nonprofit Auction Event Finder Bot (Poe Edition)
 
-Calls the Poe bot one domain at a time. No batching, no workers.
-Matches the proven AUCTIONINTEL.APP_BOT.PY calling pattern exactly.
+Calls the Poe bot one domain per call. Matches the proven
+AUCTIONINTEL.APP_BOT.PY calling pattern; streams run on the shared
+poe_transport event loop unless POE_ASYNC_TRANSPORT=0.
 """
 
+import asyncio
 import csv
 import json
 import os
 import re
 import sys
 import time
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional
 
 import requests
@@ -21,6 +23,13 @@ load_dotenv()
 
 import fastapi_poe as fp
 
+from poe_transport import POE_ASYNC_TRANSPORT, transport as poe_transport
+from poe_pool import load_pool_from_env
+from poe_pacing import AIMDController
+from poe_resilience import POE_CALL_DEADLINE_SECONDS, POE_MAX_RETRIES, retry_sleep
+from domains import unique_domains
+from leads import classify_lead_tier, is_valid_email as _is_valid_email, has_valid_url as _has_valid_url
+
 # ─── Configuration ────────────────────────────────────────────────────────────
 
 POE_API_KEY = os.environ.get("POE_API_KEY", "").strip()
@@ -35,10 +44,18 @@ POE_BOT_NAME_4 = os.environ.get("POE_BOT_NAME_4", "auctionintel.app_dup").strip(
 POE_BOT_NAME_5 = os.environ.get("POE_BOT_NAME_5", "auctionintel.app").strip()
 POE_BOT_NAME_6 = os.environ.get("POE_BOT_NAME_6", "auctionintel.app_dup").strip()
 
+# Every configured POE_API_KEY[_N] — calls without an explicit key are routed here
+credential_pool = load_pool_from_env(POE_BOT_NAME)
+
 MAX_NONPROFITS = 5000
-MAX_RETRIES = 2
-RETRY_DELAY_SECONDS = 15
+MAX_RETRIES = POE_MAX_RETRIES
+RETRY_DELAY_SECONDS = 15    # starting values — poe_pacing adapts both at runtime
 PAUSE_BETWEEN_DOMAINS = 2
+# Concurrent domain workers per research job (1 = original sequential behavior)
+JOB_WORKERS = max(1, int(os.environ.get("JOB_WORKERS", "1")))
+
+# Process-wide AIMD controller: Poe call window, pause between domains, retry delay
+pacing = AIMDController(initial_pause=PAUSE_BETWEEN_DOMAINS, initial_retry_delay=RETRY_DELAY_SECONDS)
 
 ALLOWLISTED_PLATFORMS = [
     "givesmart.com", "eventbrite.com", "givebutter.com", "charitybuzz.com",
@@ -60,31 +77,74 @@ CSV_COLUMNS = [
 
 def call_poe_bot_sync(domain: str, bot_name: str = None, api_key: str = None) -> str:
     """Send a single domain to the Poe bot and return the full streamed response.
-    Accepts optional bot_name/api_key overrides for multi-account support."""
-    _bot = bot_name or POE_BOT_NAME
-    _key = api_key or POE_API_KEY
+    Accepts optional bot_name/api_key overrides; without an api_key the call is
+    routed to the least-loaded healthy key in credential_pool.
+    With POE_ASYNC_TRANSPORT on, the stream runs on the shared poe_transport event
+    loop and this thread only waits on its future.
+    Concurrency is capped by the AIMD `pacing` window, which is fed every outcome."""
+    with pacing.slot():
+        cred = None
+        if not api_key and credential_pool.size:
+            cred = credential_pool.acquire()
+        _bot = bot_name or (cred.bot_name if cred else POE_BOT_NAME)
+        _key = api_key or (cred.api_key if cred else POE_API_KEY)
+
+        errors: List[str] = []
+        started = time.time()
+        text = ""
+        try:
+            text = _call_poe_with_retries(domain, _bot, _key, errors)
+            return text
+        finally:
+            latency = time.time() - started
+            pacing.record(latency, ok=bool(text), errors=errors)
+            if cred:
+                credential_pool.release(cred, latency, ok=bool(text), errors=errors)
+
+
+def _call_poe_with_retries(domain: str, _bot: str, _key: str, errors: List[str]) -> str:
+    """Run one Poe call with up to MAX_RETRIES attempts, jittered exponential backoff
+    and an overall POE_CALL_DEADLINE_SECONDS deadline; attempt errors are appended to `errors`."""
+    if POE_ASYNC_TRANSPORT:
+        return poe_transport.call(domain, _bot, _key, MAX_RETRIES, pacing.retry_delay, errors,
+                                  deadline=POE_CALL_DEADLINE_SECONDS)
+
     message = fp.ProtocolMessage(role="user", content=domain)
+    deadline_at = time.monotonic() + POE_CALL_DEADLINE_SECONDS
 
     for attempt in range(1, MAX_RETRIES + 1):
         try:
-            full_response = ""
-            for partial in fp.get_bot_response_sync(
-                messages=[message],
-                bot_name=_bot,
-                api_key=_key,
-            ):
-                full_response += partial.text
-            return full_response
+            return _stream_until(message, _bot, _key, deadline_at)
 
         except Exception as e:
             error_msg = str(e)
+            errors.append(error_msg)
             print(f"    Attempt {attempt}/{MAX_RETRIES} failed ({_bot}): {error_msg[:120]}", file=sys.stderr)
-            if attempt < MAX_RETRIES:
-                print(f"    Retrying in {RETRY_DELAY_SECONDS}s...", file=sys.stderr)
-                time.sleep(RETRY_DELAY_SECONDS)
+            delay = retry_sleep(attempt, pacing.retry_delay, deadline_at) if attempt < MAX_RETRIES else -1
+            if delay >= 0:
+                print(f"    Retrying in {delay:.1f}s...", file=sys.stderr)
+                time.sleep(delay)
             else:
-                print(f"    All {MAX_RETRIES} attempts failed.", file=sys.stderr)
+                print(f"    Giving up after {attempt} attempt(s).", file=sys.stderr)
                 return ""
+    return ""
+
+
+def _stream_until(message, _bot: str, _key: str, deadline_at: float) -> str:
+    """Collect one streamed response on a private event loop (what
+    fp.get_bot_response_sync does), cancelled at deadline_at: wait_for cancels the
+    stream task, which closes the HTTP response — a stream that connects but never
+    sends a chunk can neither block the caller nor outlive the call."""
+    async def _collect() -> str:
+        text = ""
+        async for partial in fp.get_bot_response(messages=[message], bot_name=_bot, api_key=_key):
+            text += partial.text
+        return text
+
+    try:
+        return asyncio.run(asyncio.wait_for(_collect(), timeout=max(0.0, deadline_at - time.monotonic())))
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"Deadline exceeded after {POE_CALL_DEADLINE_SECONDS:.0f}s — stream cancelled")
 
 
 # ─── JSON Extraction (matches AUCTIONINTEL.APP_BOT.PY exactly) ──────────────
@@ -146,28 +206,37 @@ def extract_json(text: str) -> dict:
 
 # ─── Lead Classification ─────────────────────────────────────────────────────
 
-def _is_valid_email(email: str) -> bool:
-    if not email or not isinstance(email, str):
-        return False
-    return bool(re.match(r"^[^@\s]+@[^@\s]+\.[^@\s]+$", email.strip()))
+EMAILABLE_API_KEY = os.environ.get("EMAILABLE_API_KEY", "")
 
 
-EMAILABLE_API_KEY = os.environ.get("EMAILABLE_API_KEY", "")
+def _score(value) -> Optional[int]:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
 
 
 def validate_email_emailable(email: str) -> str:
     """Verify a single email via Emailable API.
+    Returns state: deliverable | undeliverable | risky | unknown"""
+    detail = verify_email_emailable(email)
+    return detail["state"] if detail else "unknown"
+
+
+def verify_email_emailable(email: str) -> Optional[Dict[str, Any]]:
+    """Verify a single email via Emailable API.
 
     GET https://api.emailable.com/v1/verify?email=...&api_key=...
-    Returns state: deliverable | undeliverable | risky | unknown
+    Returns {"state", "score"} as reported by Emailable, or None when no
+    verdict was obtained (no key, network/HTTP error) — callers must not cache that.
     Docs: https://emailable.com/docs/api/#verify-an-email
     """
     if not EMAILABLE_API_KEY:
         print(f"[EMAILABLE] NO API KEY — skipping {email}", flush=True)
-        return "unknown"
+        return None
     if not email or not isinstance(email, str) or "@" not in email:
         print(f"[EMAILABLE] INVALID EMAIL — skipping: {email!r}", flush=True)
-        return "unknown"
+        return None
 
     email = email.strip()
     url = "https://api.emailable.com/v1/verify"
@@ -191,47 +260,69 @@ def validate_email_emailable(email: str) -> str:
             print(f"[EMAILABLE] <<< RETRY HTTP {resp.status_code} for {email}", flush=True)
         except Exception as e:
             print(f"[EMAILABLE] RETRY NETWORK ERROR for {email}: {e}", flush=True)
-            return "unknown"
+            return None
 
     if resp.status_code != 200:
         print(f"[EMAILABLE] ERROR {resp.status_code} for {email}: {resp.text[:300]}", flush=True)
-        return "unknown"
+        return None
 
     try:
         data = resp.json()
     except Exception as e:
         print(f"[EMAILABLE] JSON PARSE ERROR for {email}: {e} — body: {resp.text[:300]}", flush=True)
-        return "unknown"
+        return None
 
     state = data.get("state", "unknown")
     score = data.get("score", "?")
     reason = data.get("reason", "?")
     print(f"[EMAILABLE] RESULT {email} => state={state}, score={score}, reason={reason}", flush=True)
-    return state
+    return {"state": state, "score": _score(data.get("score"))}
 
 
 def validate_emails_bulk(emails: list) -> dict:
     """Verify a list of emails via Emailable Bulk API.
+    Returns dict mapping email -> state (deliverable/undeliverable/risky/unknown)."""
+    return {email: detail["state"] for email, detail in verify_emails_bulk(emails).items()}
+
 
-    POST to /v1/batch to create batch, then poll GET /v1/batch?id=... until complete.
-    For ≤1,000 emails: parse 'emails' array from JSON response.
-    For >1,000 emails: download CSV from 'download_file' URL.
-    Returns dict mapping email -> state (deliverable/undeliverable/risky/unknown).
+def verify_emails_bulk(emails: list) -> Dict[str, Dict[str, Any]]:
+    """Verify a list of emails via Emailable Bulk API, blocking until done.
+
+    Creates a batch, then polls every 15s for up to 30 min. Jobs use
+    verification.batch_tracker instead, which polls every outstanding batch
+    from one background thread.
+    Returns dict mapping lowercased email -> {"state", "score"}; emails without a
+    verdict (errors, timeout) are absent.
     """
+    batch_id = emailable_create_batch(emails)
+    if not batch_id:
+        return {}
+    max_polls = 120  # 120 * 15s = 30 min
+    for poll_num in range(1, max_polls + 1):
+        time.sleep(15)
+        status, verdicts = emailable_batch_status(batch_id)
+        if status == "complete":
+            print(f"[EMAILABLE-BULK] Batch complete after {poll_num} polls", flush=True)
+            return verdicts
+    print(f"[EMAILABLE-BULK] Timed out after {max_polls} polls", flush=True)
+    return {}
+
+
+def emailable_create_batch(emails: list) -> Optional[str]:
+    """POST /v1/batch. Returns the Emailable batch id, or None if no batch was created."""
     if not EMAILABLE_API_KEY:
         print("[EMAILABLE-BULK] NO API KEY — skipping bulk verification", flush=True)
-        return {}
+        return None
     if not emails:
-        return {}
+        return None
 
     # Deduplicate and clean
     unique_emails = list(set(e.strip() for e in emails if e and "@" in e))
     if not unique_emails:
-        return {}
+        return None
 
     print(f"[EMAILABLE-BULK] Submitting {len(unique_emails)} emails for bulk verification...", flush=True)
 
-    # POST to create batch
     try:
         resp = requests.post(
             "https://api.emailable.com/v1/batch",
@@ -240,167 +331,99 @@ def validate_emails_bulk(emails: list) -> dict:
         )
     except Exception as e:
         print(f"[EMAILABLE-BULK] POST ERROR: {type(e).__name__}: {e}", flush=True)
-        return {}
+        return None
 
     if resp.status_code != 200:
         print(f"[EMAILABLE-BULK] POST HTTP {resp.status_code}: {resp.text[:300]}", flush=True)
-        return {}
+        return None
 
     try:
         batch_data = resp.json()
     except Exception as e:
         print(f"[EMAILABLE-BULK] POST JSON PARSE ERROR: {e}", flush=True)
-        return {}
+        return None
 
     batch_id = batch_data.get("id")
     if not batch_id:
         print(f"[EMAILABLE-BULK] No batch ID in response: {batch_data}", flush=True)
-        return {}
+        return None
 
     print(f"[EMAILABLE-BULK] Batch created: {batch_id}", flush=True)
+    return batch_id
 
-    # Poll for completion — check every 15s, timeout after 30 min
-    poll_url = "https://api.emailable.com/v1/batch"
-    max_polls = 120  # 120 * 15s = 30 min
-    for poll_num in range(1, max_polls + 1):
-        time.sleep(15)
 
-        try:
-            poll_resp = requests.get(
-                poll_url,
-                params={"id": batch_id, "api_key": EMAILABLE_API_KEY},
-                timeout=30,
-            )
-        except Exception as e:
-            print(f"[EMAILABLE-BULK] POLL ERROR (attempt {poll_num}): {type(e).__name__}: {e}", flush=True)
-            continue
+def emailable_batch_status(batch_id: str) -> tuple:
+    """One GET /v1/batch?id=... poll. Returns (status, verdicts):
+    ("pending", {}) while Emailable is still working or the poll failed,
+    ("complete", {lowercased email: {"state", "score"}}) once it is done.
+    For ≤1,000 emails results come in the 'emails' array; for more, the
+    'download_file' CSV is streamed rather than loaded whole."""
+    try:
+        poll_resp = requests.get(
+            "https://api.emailable.com/v1/batch",
+            params={"id": batch_id, "api_key": EMAILABLE_API_KEY},
+            timeout=30,
+        )
+    except Exception as e:
+        print(f"[EMAILABLE-BULK] POLL ERROR {batch_id}: {type(e).__name__}: {e}", flush=True)
+        return ("pending", {})
 
-        if poll_resp.status_code != 200:
-            print(f"[EMAILABLE-BULK] POLL HTTP {poll_resp.status_code} (attempt {poll_num})", flush=True)
-            continue
+    if poll_resp.status_code != 200:
+        print(f"[EMAILABLE-BULK] POLL HTTP {poll_resp.status_code} for {batch_id}", flush=True)
+        return ("pending", {})
 
+    try:
+        poll_data = poll_resp.json()
+    except Exception as e:
+        print(f"[EMAILABLE-BULK] POLL JSON ERROR {batch_id}: {e}", flush=True)
+        return ("pending", {})
+
+    message = poll_data.get("message", "")
+    if "progress" in message.lower() or "processing" in message.lower() or "verifying" in message.lower():
+        total_counts = poll_data.get("total_counts", {})
+        processed = total_counts.get("processed", "?")
+        total = total_counts.get("total", "?")
+        print(f"[EMAILABLE-BULK] {batch_id}: {message} ({processed}/{total})", flush=True)
+        return ("pending", {})
+
+    if "completed" not in message.lower() and "complete" not in message.lower():
+        print(f"[EMAILABLE-BULK] {batch_id}: {message}", flush=True)
+        return ("pending", {})
+
+    result_map = {}
+
+    # Small batch (≤1000): results in 'emails' array
+    if "emails" in poll_data and isinstance(poll_data["emails"], list):
+        for entry in poll_data["emails"]:
+            email_addr = entry.get("email", "").strip().lower()
+            state = entry.get("state", "unknown")
+            if email_addr:
+                result_map[email_addr] = {"state": state, "score": _score(entry.get("score"))}
+        print(f"[EMAILABLE-BULK] Parsed {len(result_map)} results from JSON", flush=True)
+        return ("complete", result_map)
+
+    # Large batch (>1000): stream the CSV, one row at a time
+    download_url = poll_data.get("download_file", "")
+    if download_url:
+        print(f"[EMAILABLE-BULK] Downloading CSV from: {download_url[:80]}...", flush=True)
         try:
-            poll_data = poll_resp.json()
-        except Exception as e:
-            print(f"[EMAILABLE-BULK] POLL JSON ERROR (attempt {poll_num}): {e}", flush=True)
-            continue
-
-        message = poll_data.get("message", "")
-        if "progress" in message.lower() or "processing" in message.lower() or "verifying" in message.lower():
-            total_counts = poll_data.get("total_counts", {})
-            processed = total_counts.get("processed", "?")
-            total = total_counts.get("total", len(unique_emails))
-            print(f"[EMAILABLE-BULK] Poll {poll_num}: {message} ({processed}/{total})", flush=True)
-            continue
-
-        if "completed" not in message.lower() and "complete" not in message.lower():
-            print(f"[EMAILABLE-BULK] Poll {poll_num}: {message}", flush=True)
-            continue
-
-        # Batch complete — extract results
-        print(f"[EMAILABLE-BULK] Batch complete after {poll_num} polls", flush=True)
-
-        result_map = {}
-
-        # Small batch (≤1000): results in 'emails' array
-        if "emails" in poll_data and isinstance(poll_data["emails"], list):
-            for entry in poll_data["emails"]:
-                email_addr = entry.get("email", "").strip().lower()
-                state = entry.get("state", "unknown")
-                if email_addr:
-                    result_map[email_addr] = state
-            print(f"[EMAILABLE-BULK] Parsed {len(result_map)} results from JSON", flush=True)
-            return result_map
-
-        # Large batch (>1000): download CSV
-        download_url = poll_data.get("download_file", "")
-        if download_url:
-            print(f"[EMAILABLE-BULK] Downloading CSV from: {download_url[:80]}...", flush=True)
-            try:
-                dl_resp = requests.get(download_url, timeout=120)
+            with requests.get(download_url, timeout=120, stream=True) as dl_resp:
                 if dl_resp.status_code == 200:
-                    import io
-                    import csv as csv_mod
-                    content = dl_resp.content.decode("utf-8", errors="replace")
-                    reader = csv_mod.DictReader(io.StringIO(content))
-                    for row in reader:
-                        email_addr = row.get("email", "").strip().lower()
-                        state = row.get("state", "unknown")
+                    lines = (line.decode("utf-8", errors="replace") for line in dl_resp.iter_lines() if line)
+                    for row in csv.DictReader(lines):
+                        email_addr = (row.get("email") or "").strip().lower()
+                        state = row.get("state") or "unknown"
                         if email_addr:
-                            result_map[email_addr] = state
+                            result_map[email_addr] = {"state": state, "score": _score(row.get("score"))}
                     print(f"[EMAILABLE-BULK] Parsed {len(result_map)} results from CSV", flush=True)
                 else:
                     print(f"[EMAILABLE-BULK] CSV download HTTP {dl_resp.status_code}", flush=True)
-            except Exception as e:
-                print(f"[EMAILABLE-BULK] CSV download error: {type(e).__name__}: {e}", flush=True)
-            return result_map
-
-        print(f"[EMAILABLE-BULK] Complete but no emails array or download_file in response", flush=True)
-        return result_map
-
-    print(f"[EMAILABLE-BULK] Timed out after {max_polls} polls", flush=True)
-    return {}
-
-
-def _has_valid_url(result: Dict[str, Any]) -> bool:
-    url = result.get("event_url", "").strip()
-    return url.startswith("http://") or url.startswith("https://")
-
+        except Exception as e:
+            print(f"[EMAILABLE-BULK] CSV download error: {type(e).__name__}: {e}", flush=True)
+        return ("complete", result_map)
 
-def _parse_event_date(date_str: str) -> Optional[datetime]:
-    """Parse M/D/YYYY or MM/DD/YYYY event date. Returns datetime or None."""
-    if not date_str or not isinstance(date_str, str):
-        return None
-    m = re.match(r"^(\d{1,2})/(\d{1,2})/(\d{4})$", date_str.strip())
-    if m:
-        try:
-            return datetime(int(m.group(3)), int(m.group(1)), int(m.group(2)), tzinfo=timezone.utc)
-        except ValueError:
-            return None
-    return None
-
-
-def _is_at_least_30_days_out(result: Dict[str, Any]) -> bool:
-    """Return True if event_date is at least 30 days in the future.
-    Returns False if date is missing, unparseable, or too soon."""
-    event_dt = _parse_event_date(result.get("event_date", ""))
-    if not event_dt:
-        return False
-    return event_dt >= datetime.now(timezone.utc) + timedelta(days=30)
-
-
-def classify_lead_tier(result: Dict[str, Any]) -> tuple:
-    """Returns (tier_name, price_cents) based on fields present.
-    3-tier system: decision_maker ($1.75), outreach_ready ($1.25), event_verified ($0.75).
-    Hard gates: must have event_title AND event_url (non-negotiable).
-    Date gate: event must be at least 30 days in the future.
-    Soft requirement: evidence_auction strongly preferred but not a hard kill."""
-    has_title = bool(result.get("event_title", "").strip())
-    has_url = _has_valid_url(result)
-    has_auction_evidence = bool(result.get("evidence_auction", "").strip())
-    _name_raw = result.get("contact_name", "").strip().lower()
-    _placeholder_names = {"no contact found", "not found", "n/a", "unknown", "none", "no name found", "no contact", "no name"}
-    has_name = bool(_name_raw) and _name_raw not in _placeholder_names
-    has_email = _is_valid_email(result.get("contact_email", ""))
-
-    # Hard gates: must have verified event page URL + event title
-    if not has_title or not has_url:
-        return ("not_billable", 0)
-
-    # Date gate: event must be at least 30 days out — no stale leads
-    if not _is_at_least_30_days_out(result):
-        return ("not_billable", 0)
-
-    # Auction evidence gate: require evidence OR auction_type field
-    has_auction_type = bool(result.get("auction_type", "").strip())
-    if not has_auction_evidence and not has_auction_type:
-        return ("not_billable", 0)
-
-    if has_email and has_name:
-        return ("decision_maker", 175)
-    if has_email:
-        return ("outreach_ready", 125)
-    return ("event_verified", 75)
+    print(f"[EMAILABLE-BULK] Complete but no emails array or download_file in response", flush=True)
+    return ("complete", result_map)
 
 
 def _missing_billable_fields(result: Dict[str, Any]) -> List[str]:
@@ -514,6 +537,7 @@ def _error_result(nonprofit: str, error: str, raw: str = "") -> Dict[str, Any]:
 # ─── I/O ──────────────────────────────────────────────────────────────────────
 
 def parse_input(raw: str) -> List[str]:
+    """Split pasted input into canonical domains (see domains.py), duplicates removed."""
     items = []
     for line in raw.replace(",", "\n").split("\n"):
         item = line.strip()
@@ -524,7 +548,7 @@ def parse_input(raw: str) -> List[str]:
         if item.replace(",", "").replace(".", "").replace("-", "").isdigit():
             continue
         items.append(item)
-    return items
+    return unique_domains(items)
 
 
 def write_csv(results: List[Dict[str, Any]], filepath: str) -> None:
@@ -621,7 +645,7 @@ def main():
             print(f"    -> FAILED", file=sys.stderr)
 
         if idx < total:
-            time.sleep(PAUSE_BETWEEN_DOMAINS)
+            time.sleep(pacing.pause)
 
     elapsed = time.time() - start
 
@@ -0,0 +1,127 @@
+"""
+AUCTIONFINDER — Buffered writer for job_results checkpoints
+
+Checkpointing used to cost one INSERT ... ON CONFLICT plus a commit per domain
+(and again per verified result after bulk email verification). Results are
+now buffered per job and written by a background thread as multi-row upserts
+(db.save_results_bulk), one commit per batch.
+
+A batch is flushed once CHECKPOINT_FLUSH_ROWS rows are buffered or the oldest
+buffered row is CHECKPOINT_FLUSH_SECONDS old, so a crash loses at most that
+window (resume re-researches those domains). Jobs flush synchronously on
+stop/complete/crash, and readers of job_results for a running job call
+flush(job_id) first.
+
+Configuration (env):
+    CHECKPOINT_FLUSH_ROWS      rows per batch (default 200)
+    CHECKPOINT_FLUSH_SECONDS   max age of a buffered row (default 2)
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from db import result_row, save_results_bulk
+
+# ─── Configuration ────────────────────────────────────────────────────────────
+
+CHECKPOINT_FLUSH_ROWS = max(1, int(os.environ.get("CHECKPOINT_FLUSH_ROWS", "200")))
+CHECKPOINT_FLUSH_SECONDS = float(os.environ.get("CHECKPOINT_FLUSH_SECONDS", "2"))
+
+
+class CheckpointWriter:
+    """Process-wide buffer of pending job_results rows, keyed by (job_id, domain)."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._buffer: Dict[Tuple[str, str], tuple] = {}  # latest result_row per (job_id, domain)
+        self._oldest = 0.0  # monotonic time the oldest buffered row arrived
+        self._write_lock = threading.Lock()  # one batch in flight at a time
+        self._thread: Optional[threading.Thread] = None
+        self.rows_written = 0
+        self.batches = 0
+        self.errors = 0
+
+    def put(self, job_id: str, domain: str, result: Dict[str, Any]):
+        """Buffer a result row. It's serialized (and its columns extracted) now,
+        so later mutation doesn't leak in."""
+        row = result_row(job_id, domain, result)
+        with self._cond:
+            first = not self._buffer
+            if first:
+                self._oldest = time.monotonic()  # starts the flush timer
+            self._buffer[(job_id, domain)] = row
+            if first or len(self._buffer) >= CHECKPOINT_FLUSH_ROWS:
+                self._cond.notify()
+        self._ensure_thread()
+
+    def flush(self, job_id: str = None) -> bool:
+        """Synchronously write buffered rows — only `job_id`'s if given, else everything.
+        Returns False if the write failed (the rows stay buffered for a retry)."""
+        # Taking the batch under the write lock keeps writes in buffer order,
+        # so an older row can never overwrite a newer one for the same domain
+        with self._write_lock:
+            with self._cond:
+                if job_id is None:
+                    batch, self._buffer = self._buffer, {}
+                else:
+                    batch = {k: v for k, v in self._buffer.items() if k[0] == job_id}
+                    for k in batch:
+                        del self._buffer[k]
+            return self._write(batch)
+
+    def _write(self, batch: Dict[Tuple[str, str], tuple]) -> bool:
+        if not batch:
+            return True
+        try:
+            save_results_bulk(list(batch.values()))
+            self.rows_written += len(batch)
+            self.batches += 1
+            return True
+        except Exception as e:
+            self.errors += 1
+            print(f"[CHECKPOINT ERROR] Bulk write of {len(batch)} row(s) failed: {e}", flush=True)
+            # Put the rows back unless a newer version arrived meanwhile; the next flush retries
+            with self._cond:
+                if not self._buffer:
+                    self._oldest = time.monotonic()
+                for key, row in batch.items():
+                    self._buffer.setdefault(key, row)
+            return False
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while True:
+                    if len(self._buffer) >= CHECKPOINT_FLUSH_ROWS:
+                        break
+                    if self._buffer:
+                        wait = self._oldest + CHECKPOINT_FLUSH_SECONDS - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+            if not self.flush():
+                time.sleep(CHECKPOINT_FLUSH_SECONDS)  # don't spin on a failing database
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._cond:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name="checkpoint-writer", daemon=True)
+                    self._thread.start()
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            buffered = len(self._buffer)
+        return {"buffered": buffered, "rows_written": self.rows_written,
+                "batches": self.batches, "errors": self.errors}
+
+
+# Process-wide singleton
+checkpoint_writer = CheckpointWriter()
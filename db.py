@@ -8,8 +8,9 @@ No more SQLite, no more data loss on deploys.
 import os
 import secrets
 import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Iterator, List
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -18,6 +19,10 @@ import psycopg2
 import psycopg2.extras
 from werkzeug.security import generate_password_hash, check_password_hash
 
+from domains import canonical_domain
+from leads import parse_event_date as _parse_event_date, result_columns
+from negative_cache import negative_cache
+
 DB_CONN_STRING = (
     os.environ.get("IRS_DB_CONNECTION")
     or os.environ.get("DATABASE_URL")
@@ -33,6 +38,16 @@ print(f"[DB] Using PostgreSQL: {_src} -> {DB_CONN_STRING[:30]}...")
 # Thread-local storage for connections
 _local = threading.local()
 
+# Identifies this process's sessions in pg_stat_activity (application_name), so
+# state it owns — wallet holds — can be told apart from another worker's
+PROCESS_ID = f"auctionfinder-{os.getpid()}-{secrets.token_hex(4)}"
+
+
+def _owner_gone(column: str) -> str:
+    """SQL condition: the process recorded in `column` has no open session (crashed or restarted)."""
+    return (f"({column} IS NULL OR NOT EXISTS "
+            f"(SELECT 1 FROM pg_stat_activity a WHERE a.application_name = {column}))")
+
 
 def _get_conn():
     """Return a per-thread PostgreSQL connection. Auto-reconnects on stale/broken connections."""
@@ -50,7 +65,7 @@ def _get_conn():
                 conn.close()
             except Exception:
                 pass
-    _local.conn = psycopg2.connect(DB_CONN_STRING)
+    _local.conn = psycopg2.connect(DB_CONN_STRING, application_name=PROCESS_ID)
     _local.conn.autocommit = False
     return _local.conn
 
@@ -71,6 +86,28 @@ def _fetchall(cur):
     return [dict(zip(cols, row)) for row in rows]
 
 
+def _migrate_once(name: str, migrate: Callable[[Any], None]):
+    """Run a one-off data migration once per database, recorded in schema_migrations.
+    Only the worker holding the migration's advisory lock runs it; workers booting
+    alongside skip it rather than repeat or race it."""
+    with try_advisory_lock(f"migration:{name}") as held:
+        if not held:
+            return
+        conn = _get_conn()
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT 1 FROM schema_migrations WHERE name = %s", (name,))
+            if cur.fetchone() is None:
+                migrate(cur)
+                cur.execute("INSERT INTO schema_migrations (name) VALUES (%s) ON CONFLICT DO NOTHING", (name,))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+
+
 def init_db():
     """Create tables if they don't exist and ensure admin user exists."""
     conn = _get_conn()
@@ -162,7 +199,7 @@ def init_db():
         CREATE TABLE IF NOT EXISTS research_cache (
             id SERIAL PRIMARY KEY,
             cache_key TEXT UNIQUE NOT NULL,
-            result_json TEXT NOT NULL,
+            result_json JSONB NOT NULL,
             status TEXT NOT NULL DEFAULT 'uncertain',
             event_title TEXT DEFAULT '',
             created_at TIMESTAMP DEFAULT NOW(),
@@ -182,7 +219,7 @@ def init_db():
             id SERIAL PRIMARY KEY,
             job_id TEXT NOT NULL,
             domain TEXT NOT NULL,
-            result_json TEXT,
+            result_json JSONB,
             created_at TIMESTAMP DEFAULT NOW(),
             UNIQUE(job_id, domain)
         );
@@ -216,6 +253,31 @@ def init_db():
     except Exception:
         conn.rollback()
 
+    # One-off data migrations below run once per database (_migrate_once)
+    try:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                name TEXT PRIMARY KEY,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            )
+        """)
+        conn.commit()
+    except Exception as e:
+        print(f"[DB] Migration schema_migrations error: {e}", flush=True)
+        conn.rollback()
+
+    # Migration: merge research_cache rows whose keys predate canonical_domain()
+    def _merge_cache_keys(_cur):
+        merged = merge_duplicate_cache_keys()
+        if merged:
+            print(f"[DB] Merged {merged} non-canonical research_cache key(s)", flush=True)
+
+    try:
+        _migrate_once("canonical_cache_keys", _merge_cache_keys)
+    except Exception as e:
+        print(f"[DB] Merge research_cache keys error: {e}", flush=True)
+        conn.rollback()
+
     # Migration: add email_verified column to users
     try:
         cur.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS email_verified INTEGER DEFAULT 0")
@@ -298,6 +360,180 @@ def init_db():
         print(f"[DB] Migration last_login_at/is_banned error: {e}", flush=True)
         conn.rollback()
 
+    # Migration: result_json TEXT -> JSONB, plus extracted columns for SQL-side filters/aggregates
+    # (filled by cache_put / save_single_result / save_results_bulk; old rows by backfill_result_columns)
+    def _result_json_to_jsonb(mcur):
+        mcur.execute("""
+            CREATE OR REPLACE FUNCTION af_try_jsonb(t TEXT) RETURNS JSONB AS $$
+            BEGIN
+                RETURN t::jsonb;
+            EXCEPTION WHEN others THEN
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql IMMUTABLE
+        """)
+        for table, fallback in (("research_cache", "'{}'::jsonb"), ("job_results", "NULL")):
+            mcur.execute(
+                "SELECT data_type FROM information_schema.columns WHERE table_name = %s AND column_name = 'result_json'",
+                (table,),
+            )
+            row = mcur.fetchone()
+            if row and row[0] == "text":
+                print(f"[DB] Converting {table}.result_json to JSONB...", flush=True)
+                mcur.execute(
+                    f"ALTER TABLE {table} ALTER COLUMN result_json TYPE JSONB "
+                    f"USING COALESCE(af_try_jsonb(result_json), {fallback})"
+                )
+
+    try:
+        _migrate_once("result_json_jsonb", _result_json_to_jsonb)
+        for table in ("research_cache", "job_results"):
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS event_date DATE")
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS has_email BOOLEAN")
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS has_event_url BOOLEAN")
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS confidence REAL")
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS tier TEXT")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_research_cache_status_tier ON research_cache(status, tier)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_research_cache_event_date ON research_cache(event_date)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_job_results_job_tier ON job_results(job_id, tier)")
+        conn.commit()
+    except Exception as e:
+        print(f"[DB] Migration result_json JSONB error: {e}", flush=True)
+        conn.rollback()
+
+    # Migration: materialized lead tier — price and the instant the tier stops being valid
+    # (the 30-days-out gate); retier_expired_results downgrades rows past that instant
+    try:
+        for table in ("research_cache", "job_results"):
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS price_cents INTEGER")
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS tier_valid_until TIMESTAMPTZ")
+            cur.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_tier_valid_until ON {table}(tier_valid_until) "
+                f"WHERE tier_valid_until IS NOT NULL"
+            )
+            # Rows backfill_result_columns still has to fill; empty once it has run
+            cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_unfilled ON {table}(id) WHERE price_cents IS NULL")
+        conn.commit()
+    except Exception as e:
+        print(f"[DB] Migration tier_valid_until error: {e}", flush=True)
+        conn.rollback()
+
+    # Migration: event_date also accepts ISO YYYY-MM-DD — queue rows extracted without it for backfill
+    def _requeue_iso_event_dates(mcur):
+        for table in ("research_cache", "job_results"):
+            mcur.execute(
+                f"UPDATE {table} SET price_cents = NULL "
+                f"WHERE event_date IS NULL AND price_cents IS NOT NULL "
+                f"AND result_json->>'event_date' ~ '^\\s*[0-9]{{4}}-[0-9]{{2}}-[0-9]{{2}}'"
+            )
+
+    try:
+        _migrate_once("iso_event_date", _requeue_iso_event_dates)
+    except Exception as e:
+        print(f"[DB] Migration ISO event_date error: {e}", flush=True)
+        conn.rollback()
+
+    # Migration: cross-job email verification cache (state-dependent TTL per row)
+    try:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS email_verifications (
+                email TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                score INTEGER,
+                verified_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                expires_at TIMESTAMPTZ NOT NULL
+            )
+        """)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_email_verifications_expires ON email_verifications(expires_at)")
+        conn.commit()
+    except Exception as e:
+        print(f"[DB] Migration email_verifications error: {e}", flush=True)
+        conn.rollback()
+
+    # Migration: outstanding Emailable bulk batches (polled by verification.batch_tracker)
+    try:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS email_batches (
+                batch_id TEXT PRIMARY KEY,
+                job_id TEXT NOT NULL,
+                emails JSONB NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                completed_at TIMESTAMPTZ
+            )
+        """)
+        cur.execute("ALTER TABLE email_batches ADD COLUMN IF NOT EXISTS owner TEXT")
+        cur.execute("DROP INDEX IF EXISTS idx_email_batches_pending")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_email_batches_open ON email_batches(created_at) "
+                    "WHERE status IN ('pending', 'polling')")
+        conn.commit()
+    except Exception as e:
+        print(f"[DB] Migration email_batches error: {e}", flush=True)
+        conn.rollback()
+
+    # Migration: content-addressed artifact store (replaces result_files BYTEA copies)
+    try:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS artifacts (
+                sha256 TEXT PRIMARY KEY,
+                encoding TEXT NOT NULL,
+                size_bytes BIGINT NOT NULL,
+                stored_bytes BIGINT NOT NULL,
+                backend TEXT NOT NULL,
+                loid OID,
+                created_at TIMESTAMP DEFAULT NOW()
+            )
+        """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS result_artifacts (
+                job_id TEXT NOT NULL,
+                format TEXT NOT NULL,
+                sha256 TEXT NOT NULL REFERENCES artifacts(sha256),
+                created_at TIMESTAMP DEFAULT NOW(),
+                PRIMARY KEY (job_id, format)
+            )
+        """)
+        conn.commit()
+    except Exception as e:
+        print(f"[DB] Migration artifacts error: {e}", flush=True)
+        conn.rollback()
+
+    # Migration: append-only partial export chunks for running jobs
+    try:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS result_file_chunks (
+                job_id TEXT NOT NULL,
+                format TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                content BYTEA NOT NULL,
+                row_count INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT NOW(),
+                PRIMARY KEY (job_id, format, seq)
+            )
+        """)
+        conn.commit()
+    except Exception as e:
+        print(f"[DB] Migration result_file_chunks error: {e}", flush=True)
+        conn.rollback()
+
+    # Migration: wallet holds (funds reserved by running jobs)
+    try:
+        cur.execute("ALTER TABLE wallets ADD COLUMN IF NOT EXISTS held_cents INTEGER NOT NULL DEFAULT 0")
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS wallet_holds (
+                job_id TEXT PRIMARY KEY,
+                user_id INTEGER REFERENCES users(id),
+                amount_cents INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT NOW()
+            )
+        """)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_wallet_holds_user ON wallet_holds(user_id)")
+        cur.execute("ALTER TABLE wallet_holds ADD COLUMN IF NOT EXISTS owner TEXT")
+        conn.commit()
+    except Exception as e:
+        print(f"[DB] Migration wallet_holds error: {e}", flush=True)
+        conn.rollback()
+
     # Remove stale fallback admin account if real admin is configured
     admin_email = os.environ.get("AUCTIONFINDER_ADMIN_EMAIL", "").strip().lower()
     admin_password = os.environ.get("AUCTIONFINDER_PASSWORD", "")
@@ -610,16 +846,29 @@ def get_job_breakdowns(user_id: int, limit: int = 20) -> list:
 
 
 def get_balance(user_id: int) -> int:
-    """Return wallet balance in cents."""
+    """Return spendable wallet balance in cents (excludes funds held by running jobs)."""
     conn = _get_conn()
     cur = conn.cursor()
     cur.execute(
-        "SELECT balance_cents FROM wallets WHERE user_id = %s",
+        "SELECT balance_cents - held_cents AS available FROM wallets WHERE user_id = %s",
         (user_id,),
     )
     row = _fetchone(cur)
     cur.close()
-    return row["balance_cents"] if row else 0
+    return row["available"] if row else 0
+
+
+def get_wallet(user_id: int) -> Dict[str, int]:
+    """Return {"balance_cents", "held_cents"} — total balance and the part held by running jobs."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT balance_cents, held_cents FROM wallets WHERE user_id = %s",
+        (user_id,),
+    )
+    row = _fetchone(cur)
+    cur.close()
+    return row or {"balance_cents": 0, "held_cents": 0}
 
 
 def add_funds(user_id: int, amount_cents: int, description: str = "Stripe top-up",
@@ -688,6 +937,153 @@ def charge_lead_fee(user_id: int, tier: str, price_cents: int, job_id: str, nonp
     return price_cents
 
 
+# ─── Wallet Holds ─────────────────────────────────────────────────────────────
+# A running job reserves its estimated cost (wallets.held_cents, one wallet_holds
+# row per job), charges against the hold, and releases the rest when it ends.
+# Each hold records the PROCESS_ID of the worker running the job.
+
+def hold_funds(user_id: int, job_id: str, max_cents: int, min_cents: int = 1) -> Dict[str, int]:
+    """Atomically move up to max_cents of spendable balance into the job's hold.
+    Nothing is held if less than min_cents is spendable. Returns
+    {"held", "balance_cents", "held_cents"} — held is the amount added by this call."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    try:
+        # One conditional statement: the row lock serializes concurrent jobs of the same user
+        cur.execute(
+            """WITH w AS (
+                   SELECT user_id, LEAST(%s, balance_cents - held_cents) AS amt
+                   FROM wallets WHERE user_id = %s FOR UPDATE
+               )
+               UPDATE wallets SET held_cents = wallets.held_cents + w.amt
+               FROM w WHERE wallets.user_id = w.user_id AND w.amt >= %s
+               RETURNING w.amt AS held, wallets.balance_cents, wallets.held_cents""",
+            (max_cents, user_id, max(1, min_cents)),
+        )
+        row = _fetchone(cur)
+        if row:
+            cur.execute(
+                """INSERT INTO wallet_holds (job_id, user_id, amount_cents, owner) VALUES (%s, %s, %s, %s)
+                   ON CONFLICT (job_id) DO UPDATE
+                   SET amount_cents = wallet_holds.amount_cents + EXCLUDED.amount_cents,
+                       owner = EXCLUDED.owner""",
+                (job_id, user_id, row["held"], PROCESS_ID),
+            )
+        else:
+            cur.execute("SELECT balance_cents, held_cents FROM wallets WHERE user_id = %s", (user_id,))
+            row = _fetchone(cur) or {"balance_cents": 0, "held_cents": 0}
+            row["held"] = 0
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+    return row
+
+
+def apply_charges(user_id: int, job_id: str, items: list) -> Dict[str, int]:
+    """Write a batch of (type, amount_cents, description) line items and settle them
+    against the job's hold, in one transaction. Returns {"balance_cents", "held_cents"}."""
+    total = -sum(amount for _, amount, _ in items)
+    conn = _get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "UPDATE wallet_holds SET amount_cents = amount_cents - %s WHERE job_id = %s",
+            (total, job_id),
+        )
+        cur.execute(
+            "UPDATE wallets SET balance_cents = balance_cents - %s, "
+            "held_cents = GREATEST(0, held_cents - %s) WHERE user_id = %s "
+            "RETURNING balance_cents, held_cents",
+            (total, total, user_id),
+        )
+        row = _fetchone(cur)
+        if items:
+            psycopg2.extras.execute_values(
+                cur,
+                "INSERT INTO transactions (user_id, type, amount_cents, description, job_id) VALUES %s",
+                [(user_id, txn_type, amount, description, job_id) for txn_type, amount, description in items],
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+    return row or {"balance_cents": 0, "held_cents": 0}
+
+
+def release_hold(job_id: str) -> int:
+    """Return whatever is left of a job's hold to the spendable balance. Returns cents released."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute("DELETE FROM wallet_holds WHERE job_id = %s RETURNING user_id, amount_cents", (job_id,))
+        row = _fetchone(cur)
+        if row:
+            cur.execute(
+                "UPDATE wallets SET held_cents = GREATEST(0, held_cents - %s) WHERE user_id = %s",
+                (row["amount_cents"], row["user_id"]),
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+    return row["amount_cents"] if row else 0
+
+
+def release_orphaned_holds() -> int:
+    """Release holds whose owning process is gone (no session of it in
+    pg_stat_activity) — left behind by a restart or crash. Holds of jobs still
+    running in another gunicorn worker are kept. Returns the number released."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute(f"""
+            WITH gone AS (
+                DELETE FROM wallet_holds h
+                WHERE {_owner_gone("h.owner")}
+                RETURNING h.user_id, h.amount_cents
+            ), per_user AS (
+                SELECT user_id, SUM(amount_cents) AS cents, COUNT(*) AS n FROM gone GROUP BY user_id
+            )
+            UPDATE wallets SET held_cents = GREATEST(0, wallets.held_cents - per_user.cents)
+            FROM per_user WHERE wallets.user_id = per_user.user_id
+            RETURNING per_user.n
+        """)
+        released = sum(n for (n,) in cur.fetchall())
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+    if released:
+        print(f"[DB] Released {released} orphaned wallet hold(s)", flush=True)
+    return released
+
+
+def get_wallet_holds(user_id: int) -> list:
+    """Return the user's active holds (one per running job), newest first."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT job_id, amount_cents, created_at FROM wallet_holds "
+        "WHERE user_id = %s ORDER BY created_at DESC",
+        (user_id,),
+    )
+    result = _fetchall(cur)
+    cur.close()
+    for r in result:
+        if r.get("created_at") and not isinstance(r["created_at"], str):
+            r["created_at"] = str(r["created_at"])
+    return result
+
+
 def has_sufficient_balance(user_id: int, estimated_cost_cents: int) -> bool:
     """Check if user has enough balance for the estimated cost."""
     return get_balance(user_id) >= estimated_cost_cents
@@ -839,16 +1235,37 @@ def cleanup_stale_running_jobs():
 
 # ─── Per-Result Checkpoints (job_results) ─────────────────────────────────────
 
+# Columns extracted from result_json (leads.result_columns) on research_cache and job_results
+_RESULT_COLUMNS = ("event_date", "has_email", "has_event_url", "confidence",
+                   "tier", "price_cents", "tier_valid_until")
+_RESULT_COLUMN_PLACEHOLDERS = ", ".join(["%s"] * len(_RESULT_COLUMNS))
+_RESULT_COLUMN_LIST = ", ".join(_RESULT_COLUMNS)
+_RESULT_COLUMN_UPDATES = ", ".join(f"{c} = EXCLUDED.{c}" for c in ("result_json",) + _RESULT_COLUMNS)
+
+
+def _load_json(value) -> Any:
+    """result_json as a dict — JSONB arrives parsed, legacy TEXT needs json.loads."""
+    if isinstance(value, (dict, list)):
+        return value
+    return _json.loads(value)
+
+
+def result_row(job_id: str, domain: str, result: Dict[str, Any]) -> tuple:
+    """(job_id, domain, result_json, *extracted columns) for a job_results upsert."""
+    cols = result_columns(result)
+    return (job_id, domain, _json.dumps(result, ensure_ascii=False)) + tuple(cols[c] for c in _RESULT_COLUMNS)
+
+
 def save_single_result(job_id: str, domain: str, result_dict: Dict[str, Any]):
     """Save one research result row immediately after processing."""
     conn = _get_conn()
     cur = conn.cursor()
     try:
         cur.execute(
-            """INSERT INTO job_results (job_id, domain, result_json)
-               VALUES (%s, %s, %s)
-               ON CONFLICT (job_id, domain) DO UPDATE SET result_json = EXCLUDED.result_json""",
-            (job_id, domain, _json.dumps(result_dict, ensure_ascii=False)),
+            f"""INSERT INTO job_results (job_id, domain, result_json, {_RESULT_COLUMN_LIST})
+               VALUES (%s, %s, %s, {_RESULT_COLUMN_PLACEHOLDERS})
+               ON CONFLICT (job_id, domain) DO UPDATE SET {_RESULT_COLUMN_UPDATES}""",
+            result_row(job_id, domain, result_dict),
         )
         conn.commit()
     except Exception as e:
@@ -858,6 +1275,29 @@ def save_single_result(job_id: str, domain: str, result_dict: Dict[str, Any]):
         cur.close()
 
 
+def save_results_bulk(rows: list):
+    """Upsert many result_row() tuples in one statement and one commit.
+    Rows must be unique per (job_id, domain). Raises on failure so the caller can retry."""
+    if not rows:
+        return
+    conn = _get_conn()
+    cur = conn.cursor()
+    try:
+        psycopg2.extras.execute_values(
+            cur,
+            f"""INSERT INTO job_results (job_id, domain, result_json, {_RESULT_COLUMN_LIST}) VALUES %s
+               ON CONFLICT (job_id, domain) DO UPDATE SET {_RESULT_COLUMN_UPDATES}""",
+            rows,
+            page_size=1000,
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
 def get_completed_domains(job_id: str) -> set:
     """Return set of domains already processed for a job."""
     conn = _get_conn()
@@ -878,12 +1318,174 @@ def get_completed_results(job_id: str) -> list:
     results = []
     for r in rows:
         try:
-            results.append(_json.loads(r["result_json"]))
+            results.append(_load_json(r["result_json"]))
         except (_json.JSONDecodeError, TypeError) as e:
             print(f"[GET_RESULTS WARN] {job_id}/{r['domain']}: {e}", flush=True)
     return results
 
 
+def _iter_json_rows(name: str, query: str, params: tuple = ()) -> Iterator[Dict[str, Any]]:
+    """Stream result_json rows through a server-side cursor, parsed one at a time.
+    For exports — memory stays flat however many rows match."""
+    conn = _get_conn()
+    try:
+        with conn.cursor(name=name) as cur:
+            cur.itersize = 2000
+            cur.execute(query, params)
+            for (raw,) in cur:
+                try:
+                    yield _load_json(raw)
+                except (_json.JSONDecodeError, TypeError):
+                    continue
+    finally:
+        # Also runs if the client disconnects mid-download (generator closed)
+        conn.rollback()
+
+
+def iter_job_results(job_id: str) -> Iterator[Dict[str, Any]]:
+    """Stream a job's result dicts in checkpoint order."""
+    return _iter_json_rows(
+        "job_results_export",
+        "SELECT result_json FROM job_results WHERE job_id = %s ORDER BY id",
+        (job_id,),
+    )
+
+
+def iter_cache_results(found_only: bool = False, tier: str = None, min_event_date=None,
+                       with_email: bool = None) -> Iterator[Dict[str, Any]]:
+    """Stream unexpired research_cache result dicts. Filters run in SQL on the
+    extracted columns: found/3rdpty_found only, current tier, event on/after a
+    date, and contact email present/absent."""
+    query = "SELECT result_json FROM research_cache WHERE expires_at > NOW()"
+    params = []
+    if found_only or tier:
+        query += " AND status IN ('found', '3rdpty_found')"
+    if tier:
+        query += " AND tier = %s"
+        params.append(tier)
+    if min_event_date is not None:
+        query += " AND event_date >= %s"
+        params.append(min_event_date)
+    if with_email is not None:
+        query += " AND has_email = %s"
+        params.append(with_email)
+    return _iter_json_rows("research_cache_export", query, tuple(params))
+
+
+def cache_tier_counts() -> Dict[str, int]:
+    """{tier: count} over unexpired found/3rdpty_found research_cache rows."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT tier, COUNT(*) FROM research_cache
+        WHERE status IN ('found', '3rdpty_found') AND expires_at > NOW()
+        GROUP BY tier
+    """)
+    counts = {t: n for t, n in cur.fetchall()}
+    cur.close()
+    return counts
+
+
+def job_tier_counts(job_id: str) -> Dict[str, int]:
+    """{tier: count} over a job's checkpointed results, plus "found" and "total"."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT tier,
+               COUNT(*),
+               COUNT(*) FILTER (WHERE result_json->>'status' IN ('found', '3rdpty_found'))
+        FROM job_results WHERE job_id = %s AND result_json IS NOT NULL
+        GROUP BY tier
+    """, (job_id,))
+    counts = {"found": 0, "total": 0}
+    for t, n, found in cur.fetchall():
+        counts[t] = n
+        counts["found"] += found
+        counts["total"] += n
+    cur.close()
+    return counts
+
+
+def retier_expired_results() -> int:
+    """Downgrade materialized tiers whose validity window has passed (the event is
+    now less than 30 days out). Cheap: only rows past tier_valid_until are touched,
+    via a partial index. Returns the number of rows downgraded."""
+    total = 0
+    conn = _get_conn()
+    cur = conn.cursor()
+    try:
+        for table in ("research_cache", "job_results"):
+            cur.execute(f"""
+                UPDATE {table} SET tier = 'not_billable', price_cents = 0, tier_valid_until = NULL
+                WHERE tier_valid_until IS NOT NULL AND tier_valid_until < NOW()
+            """)
+            total += cur.rowcount
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"[DB] Re-tier sweep error: {e}", flush=True)
+    finally:
+        cur.close()
+    if total:
+        print(f"[DB] Re-tier sweep: {total} lead(s) downgraded to not_billable", flush=True)
+    return total
+
+
+def backfill_result_columns(batch_size: int = 2000) -> int:
+    """Fill the extracted columns for rows written before they existed (price_cents IS NULL).
+    Runs in id-ordered batches with a commit each (a range scan of the partial
+    unfilled index), so it can run in the background after startup."""
+    total = 0
+    for table in ("research_cache", "job_results"):
+        last_id = 0
+        while True:
+            conn = _get_conn()
+            cur = conn.cursor()
+            try:
+                cur.execute(
+                    f"""SELECT id, result_json FROM {table}
+                        WHERE price_cents IS NULL AND id > %s ORDER BY id LIMIT %s""",
+                    (last_id, batch_size),
+                )
+                rows = cur.fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                values = []
+                for k, raw in rows:
+                    try:
+                        result = _load_json(raw) if raw is not None else {}
+                    except (_json.JSONDecodeError, TypeError):
+                        result = {}
+                    if not isinstance(result, dict):
+                        result = {}
+                    cols = result_columns(result)
+                    values.append((k,) + tuple(cols[c] for c in _RESULT_COLUMNS))
+                psycopg2.extras.execute_values(
+                    cur,
+                    f"""UPDATE {table} AS t SET
+                           event_date = v.event_date::date, has_email = v.has_email,
+                           has_event_url = v.has_event_url, confidence = v.confidence::real,
+                           tier = v.tier, price_cents = v.price_cents::integer,
+                           tier_valid_until = v.tier_valid_until::timestamptz
+                       FROM (VALUES %s) AS v(k, {_RESULT_COLUMN_LIST})
+                       WHERE t.id = v.k""",
+                    values,
+                    page_size=1000,
+                )
+                conn.commit()
+                total += len(rows)
+            except Exception as e:
+                conn.rollback()
+                print(f"[DB] Result column backfill error ({table}): {e}", flush=True)
+                break
+            finally:
+                cur.close()
+    if total:
+        print(f"[DB] Backfilled result columns for {total} row(s)", flush=True)
+    return total
+
+
 def save_job_input_domains(job_id: str, domains: list):
     """Store the full original domain list as JSON on the search_jobs row."""
     conn = _get_conn()
@@ -1007,7 +1609,7 @@ def get_user_api_keys(user_id: int) -> list:
 # ─── Result File Storage (persists across deploys) ───────────────────────────
 
 def save_result_file(job_id: str, fmt: str, content: bytes):
-    """Store a result file (csv/json/xlsx) in the database."""
+    """Store a result file (csv/json/xlsx) in the database. Supersedes any partial chunks."""
     conn = _get_conn()
     cur = conn.cursor()
     cur.execute(
@@ -1016,10 +1618,215 @@ def save_result_file(job_id: str, fmt: str, content: bytes):
            ON CONFLICT (job_id, format) DO UPDATE SET content = EXCLUDED.content""",
         (job_id, fmt, content),
     )
+    cur.execute("DELETE FROM result_file_chunks WHERE job_id = %s AND format = %s", (job_id, fmt))
+    conn.commit()
+    cur.close()
+
+
+def append_result_chunk(job_id: str, fmt: str, seq: int, content: bytes, row_count: int):
+    """Append one chunk of a running job's partial export. Chunks are never rewritten."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        """INSERT INTO result_file_chunks (job_id, format, seq, content, row_count)
+           VALUES (%s, %s, %s, %s, %s)
+           ON CONFLICT (job_id, format, seq) DO NOTHING""",
+        (job_id, fmt, seq, content, row_count),
+    )
     conn.commit()
     cur.close()
 
 
+def get_result_chunks_counted(job_id: str, fmt: str) -> Optional[tuple]:
+    """A partial export assembled from its chunks, in order, with the number of result
+    rows they cover (read together). None if there are none."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT content, row_count FROM result_file_chunks WHERE job_id = %s AND format = %s ORDER BY seq",
+        (job_id, fmt),
+    )
+    rows = _fetchall(cur)
+    cur.close()
+    if not rows:
+        return None
+    return b"".join(bytes(r["content"]) for r in rows), sum(r["row_count"] or 0 for r in rows)
+
+
+# ─── Artifact Index (see artifacts.py) ────────────────────────────────────────
+
+def get_artifact(sha256: str) -> Optional[Dict[str, Any]]:
+    """Return the artifacts row for a content hash, or None."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute("SELECT * FROM artifacts WHERE sha256 = %s", (sha256,))
+    row = _fetchone(cur)
+    cur.close()
+    return row
+
+
+def _insert_artifact_row(cur, sha256: str, encoding: str, size_bytes: int, stored_bytes: int,
+                         backend: str, loid: Optional[int], replace: bool) -> bool:
+    conflict = (
+        """UPDATE SET encoding = EXCLUDED.encoding, size_bytes = EXCLUDED.size_bytes,
+               stored_bytes = EXCLUDED.stored_bytes, backend = EXCLUDED.backend,
+               loid = EXCLUDED.loid, created_at = NOW()
+           WHERE artifacts.loid IS NULL"""
+        if replace else "NOTHING"
+    )
+    cur.execute(
+        f"""INSERT INTO artifacts (sha256, encoding, size_bytes, stored_bytes, backend, loid)
+            VALUES (%s, %s, %s, %s, %s, %s) ON CONFLICT (sha256) DO {conflict}""",
+        (sha256, encoding, size_bytes, stored_bytes, backend, loid),
+    )
+    return cur.rowcount == 1
+
+
+def insert_artifact(sha256: str, encoding: str, size_bytes: int, stored_bytes: int,
+                    backend: str, loid: int = None, replace: bool = False) -> bool:
+    """Record a stored artifact. Returns False if the hash was already recorded (dedupe race).
+    `replace` takes over a row whose blob is gone (a local blob lost on redeploy);
+    a row that owns a large object is never overwritten."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    inserted = _insert_artifact_row(cur, sha256, encoding, size_bytes, stored_bytes, backend, loid, replace)
+    conn.commit()
+    cur.close()
+    return inserted
+
+
+def insert_lo_artifact(path: str, sha256: str, encoding: str, size_bytes: int, stored_bytes: int,
+                       replace: bool = False) -> bool:
+    """Copy a blob into a new large object and record it in the same transaction.
+    If another writer recorded the hash first, the rollback discards the large
+    object with the row, so none is ever left unreferenced. Returns False then."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    try:
+        loid = _lo_write(conn, path)
+        if _insert_artifact_row(cur, sha256, encoding, size_bytes, stored_bytes, "pg", loid, replace):
+            conn.commit()
+            return True
+        conn.rollback()
+        return False
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+def link_result_artifact(job_id: str, fmt: str, sha256: str, durable: bool = True):
+    """Point a job's result file (csv/json/xlsx) at an artifact. A legacy BYTEA copy
+    is only dropped when the artifact's backend survives redeploys (`durable`)."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        """INSERT INTO result_artifacts (job_id, format, sha256) VALUES (%s, %s, %s)
+           ON CONFLICT (job_id, format) DO UPDATE SET sha256 = EXCLUDED.sha256, created_at = NOW()""",
+        (job_id, fmt, sha256),
+    )
+    # The artifact supersedes any partial chunks, and (if durable) a legacy BYTEA copy
+    if durable:
+        cur.execute("DELETE FROM result_files WHERE job_id = %s AND format = %s", (job_id, fmt))
+    cur.execute("DELETE FROM result_file_chunks WHERE job_id = %s AND format = %s", (job_id, fmt))
+    conn.commit()
+    cur.close()
+
+
+def get_result_artifact(job_id: str, fmt: str) -> Optional[Dict[str, Any]]:
+    """Return the artifacts row behind a job's result file, or None."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        """SELECT a.* FROM result_artifacts r JOIN artifacts a ON a.sha256 = r.sha256
+           WHERE r.job_id = %s AND r.format = %s""",
+        (job_id, fmt),
+    )
+    row = _fetchone(cur)
+    cur.close()
+    return row
+
+
+def delete_unreferenced_artifacts() -> List[Dict[str, Any]]:
+    """Drop result_artifacts links of jobs that no longer exist (expired), then the
+    artifacts nothing links to — unlinking their large objects in the same
+    transaction. Artifacts younger than a day are kept: a job may have stored
+    one and not linked it yet. Returns the deleted rows (sha256, backend, loid)
+    so the caller can remove blobs kept outside the database."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            DELETE FROM result_artifacts r
+            WHERE NOT EXISTS (SELECT 1 FROM search_jobs j WHERE j.job_id = r.job_id)
+        """)
+        cur.execute("""
+            DELETE FROM artifacts a
+            WHERE a.created_at < NOW() - INTERVAL '1 day'
+              AND NOT EXISTS (SELECT 1 FROM result_artifacts r WHERE r.sha256 = a.sha256)
+            RETURNING sha256, backend, loid
+        """)
+        rows = _fetchall(cur)
+        for r in rows:
+            if r["loid"] is not None:
+                cur.execute(
+                    "SELECT lo_unlink(%s) WHERE EXISTS (SELECT 1 FROM pg_largeobject_metadata WHERE oid = %s)",
+                    (r["loid"], r["loid"]),
+                )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+    return rows
+
+
+def artifact_stats() -> Dict[str, int]:
+    """Artifact count and raw vs stored bytes, for /admin/system."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        """SELECT COUNT(*) AS artifacts, COALESCE(SUM(size_bytes), 0) AS size_bytes,
+                  COALESCE(SUM(stored_bytes), 0) AS stored_bytes,
+                  (SELECT COUNT(*) FROM result_artifacts) AS links
+           FROM artifacts"""
+    )
+    row = _fetchone(cur)
+    cur.close()
+    return row
+
+
+def _lo_write(conn, path: str, chunk_size: int = 1024 * 1024) -> int:
+    """Copy a file into a new Postgres large object in the open transaction. Returns its OID."""
+    lob = conn.lobject(0, "wb")
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(chunk_size)
+            if not block:
+                break
+            lob.write(block)
+    oid = lob.oid
+    lob.close()
+    return oid
+
+
+def lo_iter(oid: int, chunk_size: int = 256 * 1024) -> Iterator[bytes]:
+    """Stream a Postgres large object in chunks."""
+    conn = _get_conn()
+    try:
+        lob = conn.lobject(oid, "rb")
+        while True:
+            block = lob.read(chunk_size)
+            if not block:
+                break
+            yield block
+        lob.close()
+    finally:
+        conn.rollback()
+
+
 def get_result_file(job_id: str, fmt: str) -> Optional[bytes]:
     """Retrieve a result file from the database. Returns bytes or None."""
     conn = _get_conn()
@@ -1371,9 +2178,11 @@ def purchase_exclusive_lead(user_id: int, job_id: str, nonprofit_name: str,
 
     # Check balance (net_charge could be negative if tier fee > lock price, but that shouldn't happen)
     if net_charge > 0:
-        cur.execute("SELECT balance_cents FROM wallets WHERE user_id = %s", (user_id,))
+        cur.execute("SELECT balance_cents - held_cents AS available FROM wallets WHERE user_id = %s FOR UPDATE",
+                    (user_id,))
         bal = _fetchone(cur)
-        if not bal or bal["balance_cents"] < net_charge:
+        if not bal or bal["available"] < net_charge:
+            conn.rollback()  # drop the row lock
             cur.close()
             return False
 
@@ -1437,27 +2246,135 @@ def get_user_exclusive_leads(user_id: int) -> list:
 # ─── Research Cache ──────────────────────────────────────────────────────────
 
 import json as _json
-import re as _re
+from collections import OrderedDict as _OrderedDict
 
+RESEARCH_LRU_SIZE = int(os.environ.get("RESEARCH_LRU_SIZE", "10000"))
+# Upper bound on how long a result is served from memory, so a cache_put made
+# by another gunicorn worker becomes visible here within this many seconds.
+RESEARCH_LRU_TTL_SECONDS = int(os.environ.get("RESEARCH_LRU_TTL_SECONDS", "300"))
 
-def _cache_key(nonprofit: str) -> str:
-    """Normalize nonprofit name/domain to a stable cache key."""
-    return nonprofit.strip().lower()
 
+def _cache_key(nonprofit: str) -> str:
+    """Normalize nonprofit name/domain to a stable cache key (canonical domain)."""
+    return canonical_domain(nonprofit)
+
+
+class _ResearchLRU:
+    """Bounded, thread-safe in-process LRU in front of research_cache.
+    Entries expire at the row's expires_at (same rules as _compute_expiry) or after
+    RESEARCH_LRU_TTL_SECONDS, whichever comes first. 'uncertain' results are never
+    held in memory."""
+
+    def __init__(self, capacity: int, ttl_seconds: int):
+        self.capacity = capacity
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self._entries: "_OrderedDict[str, tuple]" = _OrderedDict()  # key -> (result, expires)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            result, expires = entry
+            if datetime.now(timezone.utc) >= expires:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(result)  # callers annotate their copy
+
+    def put(self, key: str, result: Dict[str, Any], expires):
+        if self.capacity <= 0 or result.get("status", "uncertain") == "uncertain":
+            self.invalidate(key)
+            return
+        expires = _as_utc(expires)
+        cap = datetime.now(timezone.utc) + self.ttl
+        expires = min(expires, cap) if expires else cap
+        with self._lock:
+            self._entries[key] = (dict(result), expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def purge(self, status: str = None, expired_only: bool = False):
+        """Drop entries with `status`, or only expired ones, or everything."""
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            if status is None and not expired_only:
+                self._entries.clear()
+                return
+            for key in [k for k, (r, exp) in self._entries.items()
+                        if (status is not None and r.get("status") == status)
+                        or (expired_only and now >= exp)]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "capacity": self.capacity,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+_research_lru = _ResearchLRU(RESEARCH_LRU_SIZE, RESEARCH_LRU_TTL_SECONDS)
+
+
+def research_lru_stats() -> Dict[str, int]:
+    """Hit/miss/eviction counters of the in-process research cache tier."""
+    return _research_lru.stats()
+
+
+_CACHE_STATUS_RANK = {"found": 0, "3rdpty_found": 0, "not_found": 1, "error": 2, "uncertain": 3}
+
+
+def merge_duplicate_cache_keys() -> int:
+    """Re-key research_cache rows to canonical_domain(), merging rows that collapse
+    to the same key: the best status wins (found > not_found > error > uncertain),
+    then the newest. Scans every key that can be non-canonical, so init_db runs it
+    once per database. Returns the number of rows re-keyed or merged."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute(r"""
+        SELECT id, cache_key, status, created_at FROM research_cache
+        WHERE cache_key ~ '(://|^www\.|/|\.$|^\s|\s$|\s\s|[A-Z]|[^\x01-\x7f]|:[0-9]+$|[?#@])'
+    """)
+    stale = [r for r in _fetchall(cur) if canonical_domain(r["cache_key"]) != r["cache_key"]]
+    if not stale:
+        cur.close()
+        return 0
 
-def _parse_event_date(date_str: str) -> Optional[datetime]:
-    """Try to parse M/D/YYYY event date. Returns datetime or None."""
-    if not date_str or not isinstance(date_str, str):
-        return None
-    date_str = date_str.strip()
-    # Match M/D/YYYY or MM/DD/YYYY
-    m = _re.match(r"^(\d{1,2})/(\d{1,2})/(\d{4})$", date_str)
-    if m:
-        try:
-            return datetime(int(m.group(3)), int(m.group(1)), int(m.group(2)), tzinfo=timezone.utc)
-        except ValueError:
-            return None
-    return None
+    targets = sorted({canonical_domain(r["cache_key"]) for r in stale})
+    cur.execute(
+        "SELECT id, cache_key, status, created_at FROM research_cache WHERE cache_key = ANY(%s)",
+        (targets,),
+    )
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for r in _fetchall(cur) + stale:
+        groups.setdefault(canonical_domain(r["cache_key"]), []).append(r)
+
+    _research_lru.purge()
+    changed = 0
+    for key, rows in groups.items():
+        rows.sort(key=lambda r: (_CACHE_STATUS_RANK.get(r["status"], 3),
+                                 -(r["created_at"].timestamp() if r["created_at"] else 0)))
+        keep, drop = rows[0], [r["id"] for r in rows[1:]]
+        if drop:
+            cur.execute("DELETE FROM research_cache WHERE id = ANY(%s)", (drop,))
+        if keep["cache_key"] != key:
+            cur.execute("UPDATE research_cache SET cache_key = %s WHERE id = %s", (key, keep["id"]))
+        changed += len(drop) + (keep["cache_key"] != key)
+    conn.commit()
+    cur.close()
+    return changed
 
 
 def _compute_expiry(result: Dict[str, Any]) -> datetime:
@@ -1496,14 +2413,39 @@ def flush_uncertain_cache():
     flushed = cur.rowcount
     conn.commit()
     cur.close()
+    _research_lru.purge(status="uncertain")
     if flushed:
         print(f"[DB] Flushed {flushed} uncertain cache entries", flush=True)
     return flushed
 
 
+def _as_utc(expires) -> Optional[datetime]:
+    """research_cache.expires_at (datetime or 'YYYY-MM-DD HH:MM:SS') as an aware UTC datetime."""
+    if not expires:
+        return None
+    if isinstance(expires, str):
+        try:
+            return datetime.strptime(expires, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+        except ValueError:
+            return None
+    if expires.tzinfo is None:
+        return expires.replace(tzinfo=timezone.utc)
+    return expires
+
+
+def _cache_expired(expires) -> bool:
+    """True if a research_cache.expires_at value is in the past."""
+    expires = _as_utc(expires)
+    return bool(expires) and datetime.now(timezone.utc) > expires
+
+
 def cache_get(nonprofit: str) -> Optional[Dict[str, Any]]:
-    """Look up a cached research result. Returns the result dict or None if missing/expired."""
+    """Look up a cached research result. Returns the result dict or None if missing/expired.
+    Served from the in-process LRU when possible."""
     key = _cache_key(nonprofit)
+    hit = _research_lru.get(key)
+    if hit is not None:
+        return hit
     conn = _get_conn()
     cur = conn.cursor()
     cur.execute(
@@ -1516,28 +2458,156 @@ def cache_get(nonprofit: str) -> Optional[Dict[str, Any]]:
         return None
 
     # Check expiry
-    expires = row["expires_at"]
-    if expires:
-        if isinstance(expires, str):
-            try:
-                expires = datetime.strptime(expires, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
-            except ValueError:
-                expires = None
-        elif expires.tzinfo is None:
-            expires = expires.replace(tzinfo=timezone.utc)
-        if expires and datetime.now(timezone.utc) > expires:
-            # Expired — delete and return None
-            conn2 = _get_conn()
-            cur2 = conn2.cursor()
-            cur2.execute("DELETE FROM research_cache WHERE cache_key = %s", (key,))
-            conn2.commit()
-            cur2.close()
-            return None
+    if _cache_expired(row["expires_at"]):
+        # Expired — delete and return None
+        conn2 = _get_conn()
+        cur2 = conn2.cursor()
+        cur2.execute("DELETE FROM research_cache WHERE cache_key = %s", (key,))
+        conn2.commit()
+        cur2.close()
+        return None
 
     try:
-        return _json.loads(row["result_json"])
+        result = _load_json(row["result_json"])
     except (_json.JSONDecodeError, TypeError):
         return None
+    _research_lru.put(key, result, row["expires_at"])
+    return dict(result)
+
+
+def cache_get_many(nonprofits: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Bulk cache lookup for a whole job in one query.
+    Returns {input nonprofit: result dict} for every unexpired hit; misses are absent.
+    Expired rows found along the way are deleted in one statement."""
+    keys_by_input = {np: _cache_key(np) for np in nonprofits}
+    by_key: Dict[str, Dict[str, Any]] = {}
+    for key in set(keys_by_input.values()):
+        hit = _research_lru.get(key)
+        if hit is not None:
+            by_key[key] = hit
+    keys = [k for k in set(keys_by_input.values()) if k not in by_key]
+    if not keys:
+        return {np: dict(by_key[key]) for np, key in keys_by_input.items() if key in by_key}
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT cache_key, result_json, expires_at FROM research_cache WHERE cache_key = ANY(%s)",
+        (keys,),
+    )
+    rows = _fetchall(cur)
+
+    expired = []
+    for row in rows:
+        if _cache_expired(row["expires_at"]):
+            expired.append(row["cache_key"])
+            continue
+        try:
+            by_key[row["cache_key"]] = _load_json(row["result_json"])
+        except (_json.JSONDecodeError, TypeError):
+            continue
+        _research_lru.put(row["cache_key"], by_key[row["cache_key"]], row["expires_at"])
+    if expired:
+        cur.execute("DELETE FROM research_cache WHERE cache_key = ANY(%s)", (expired,))
+        conn.commit()
+    cur.close()
+
+    # Fresh dict per input so duplicate inputs never share a mutable result
+    return {np: dict(by_key[key]) for np, key in keys_by_input.items() if key in by_key}
+
+
+def count_not_found_cache_keys() -> int:
+    """Number of unexpired not_found cache keys (sizes the negative-cache filter)."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute("SELECT COUNT(*) FROM research_cache WHERE status = 'not_found' AND expires_at > NOW()")
+    count = cur.fetchone()[0]
+    cur.close()
+    conn.commit()
+    return count
+
+
+def iter_not_found_cache_keys() -> Iterator[str]:
+    """Stream unexpired not_found cache keys through a server-side cursor (negative
+    cache rebuild) — memory stays flat however many keys there are."""
+    conn = _get_conn()
+    try:
+        with conn.cursor(name="not_found_keys") as cur:
+            cur.itersize = 2000
+            cur.execute("SELECT cache_key FROM research_cache WHERE status = 'not_found' AND expires_at > NOW()")
+            for (key,) in cur:
+                yield key
+    finally:
+        conn.rollback()
+
+
+def prescreen_not_found(nonprofits: List[str]) -> set:
+    """Inputs that are known, unexpired not_found results.
+    Screened in memory by the negative-cache Bloom filter; only its positives are
+    confirmed against research_cache, in one query. Empty until the filter is built."""
+    candidates: Dict[str, List[str]] = {}
+    for np in nonprofits:
+        key = _cache_key(np)
+        if negative_cache.might_be_not_found(key):
+            candidates.setdefault(key, []).append(np)
+    if not candidates:
+        return set()
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        """SELECT cache_key FROM research_cache
+           WHERE cache_key = ANY(%s) AND status = 'not_found' AND expires_at > NOW()""",
+        (list(candidates),),
+    )
+    confirmed = {row[0] for row in cur.fetchall()}
+    cur.close()
+    return {np for key in confirmed for np in candidates[key]}
+
+
+RESEARCH_LOCK_NAMESPACE = 7301  # first key of pg_advisory_lock(int, int) for research dedupe
+SWEEP_LOCK_NAMESPACE = 7302     # ... and for background sweeps that run in one worker
+
+
+@contextmanager
+def advisory_lock(key: str):
+    """Hold a session-level Postgres advisory lock on `key` (hashed) for cross-worker
+    single-flight. Uses this thread's connection; always unlocked on exit."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute("SELECT pg_advisory_lock(%s, hashtext(%s))", (RESEARCH_LOCK_NAMESPACE, key))
+    conn.commit()
+    try:
+        yield
+    finally:
+        try:
+            cur.execute("SELECT pg_advisory_unlock(%s, hashtext(%s))", (RESEARCH_LOCK_NAMESPACE, key))
+            conn.commit()
+        except Exception as e:
+            # Connection gone — the server released the lock with the session
+            print(f"[DB] advisory unlock failed for {key}: {e}", flush=True)
+        finally:
+            cur.close()
+
+
+@contextmanager
+def try_advisory_lock(name: str):
+    """Try a session-level advisory lock on `name` without waiting; yields whether
+    this worker holds it. Lets one gunicorn worker run a sweep the others skip."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute("SELECT pg_try_advisory_lock(%s, hashtext(%s))", (SWEEP_LOCK_NAMESPACE, name))
+    held = cur.fetchone()[0]
+    conn.commit()
+    try:
+        yield held
+    finally:
+        try:
+            if held:
+                cur.execute("SELECT pg_advisory_unlock(%s, hashtext(%s))", (SWEEP_LOCK_NAMESPACE, name))
+                conn.commit()
+        except Exception as e:
+            print(f"[DB] advisory unlock failed for {name}: {e}", flush=True)
+        finally:
+            cur.close()
 
 
 def cache_put(nonprofit: str, result: Dict[str, Any]):
@@ -1548,21 +2618,26 @@ def cache_put(nonprofit: str, result: Dict[str, Any]):
     status = result.get("status", "uncertain")
     event_title = result.get("event_title", "")
     expires_at = _compute_expiry(result)
+    cols = result_columns(result)
     conn = _get_conn()
     cur = conn.cursor()
     cur.execute(
-        """INSERT INTO research_cache (cache_key, result_json, status, event_title, expires_at)
-           VALUES (%s, %s, %s, %s, %s)
+        f"""INSERT INTO research_cache (cache_key, result_json, status, event_title, expires_at, {_RESULT_COLUMN_LIST})
+           VALUES (%s, %s, %s, %s, %s, {_RESULT_COLUMN_PLACEHOLDERS})
            ON CONFLICT (cache_key) DO UPDATE SET
-               result_json = EXCLUDED.result_json,
+               {_RESULT_COLUMN_UPDATES},
                status = EXCLUDED.status,
                event_title = EXCLUDED.event_title,
                expires_at = EXCLUDED.expires_at,
                created_at = NOW()""",
-        (key, result_json, status, event_title, expires_at),
+        (key, result_json, status, event_title, expires_at) + tuple(cols[c] for c in _RESULT_COLUMNS),
     )
     conn.commit()
     cur.close()
+    # Write-through: the new row replaces whatever this worker had in memory
+    _research_lru.put(key, result, expires_at)
+    if status == "not_found":
+        negative_cache.add(key)
 
 
 # ─── Drip Campaign ───────────────────────────────────────────────────────────
@@ -1930,7 +3005,7 @@ def get_user_paid_domains(user_id: int) -> set:
         desc = r.get("description", "")
         # Format: "Lead fee (tier): domain_name"
         if ": " in desc:
-            domain = desc.split(": ", 1)[1].strip().lower()
+            domain = canonical_domain(desc.split(": ", 1)[1])
             if domain:
                 domains.add(domain)
     return domains
@@ -1953,7 +3028,7 @@ def admin_get_all_cache_results() -> list:
             if r.get(k) and not isinstance(r[k], str):
                 r[k] = str(r[k])
         try:
-            r["result_json"] = _json.loads(r["result_json"])
+            r["result_json"] = _load_json(r["result_json"])
         except (_json.JSONDecodeError, TypeError) as e:
             print(f"[ADMIN CACHE] Bad JSON for {r['cache_key']}: {e}", flush=True)
             r["result_json"] = {}
@@ -1968,6 +3043,7 @@ def cleanup_expired_cache() -> int:
     deleted = cur.rowcount
     conn.commit()
     cur.close()
+    _research_lru.purge(expired_only=True)
     if deleted > 0:
         # VACUUM needs autocommit
         old_autocommit = conn.autocommit
@@ -1986,6 +3062,148 @@ def cleanup_old_job_results() -> int:
     return 0
 
 
+# ─── Email Verification Cache ─────────────────────────────────────────────────
+
+def get_email_verifications(emails: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Unexpired cached verdicts for lowercased emails: {email: {"state", "score", "verified_at"}}."""
+    if not emails:
+        return {}
+    conn = _get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            """SELECT email, state, score, verified_at FROM email_verifications
+               WHERE email = ANY(%s) AND expires_at > NOW()""",
+            (list(emails),),
+        )
+        rows = _fetchall(cur)
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"[EMAIL CACHE] Lookup failed: {e}", flush=True)
+        return {}
+    finally:
+        cur.close()
+    return {r["email"]: {"state": r["state"], "score": r["score"], "verified_at": r["verified_at"]} for r in rows}
+
+
+def save_email_verifications(rows: list):
+    """Upsert (email, state, score, ttl_seconds) verdicts in one statement."""
+    if not rows:
+        return
+    conn = _get_conn()
+    cur = conn.cursor()
+    try:
+        psycopg2.extras.execute_values(
+            cur,
+            """INSERT INTO email_verifications (email, state, score, verified_at, expires_at)
+               SELECT v.email, v.state, v.score::integer, NOW(), NOW() + make_interval(secs => v.ttl::double precision)
+               FROM (VALUES %s) AS v(email, state, score, ttl)
+               ON CONFLICT (email) DO UPDATE SET
+                   state = EXCLUDED.state, score = EXCLUDED.score,
+                   verified_at = EXCLUDED.verified_at, expires_at = EXCLUDED.expires_at""",
+            rows,
+            page_size=1000,
+        )
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"[EMAIL CACHE] Save of {len(rows)} verdict(s) failed: {e}", flush=True)
+    finally:
+        cur.close()
+
+
+def save_email_batch(batch_id: str, job_id: str, emails: List[str]):
+    """Record a submitted Emailable batch, polled by this process, so another can
+    take it over if this one restarts."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            """INSERT INTO email_batches (batch_id, job_id, emails, status, owner) VALUES (%s, %s, %s, 'polling', %s)
+               ON CONFLICT (batch_id) DO NOTHING""",
+            (batch_id, job_id, _json.dumps(emails), PROCESS_ID),
+        )
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"[EMAIL BATCH] Save of {batch_id} failed: {e}", flush=True)
+    finally:
+        cur.close()
+
+
+def finish_email_batch(batch_id: str, status: str):
+    """Mark a batch 'complete' (results applied) or 'expired' (given up on)."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "UPDATE email_batches SET status = %s, completed_at = NOW() WHERE batch_id = %s",
+            (status, batch_id),
+        )
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"[EMAIL BATCH] Update of {batch_id} failed: {e}", flush=True)
+    finally:
+        cur.close()
+
+
+def claim_orphaned_email_batches() -> List[Dict[str, Any]]:
+    """Take over open batches whose polling process is gone, oldest first. Atomic
+    (SKIP LOCKED), so two workers booting together never claim the same batch,
+    and batches a live worker is still polling are left alone."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute(f"""
+            UPDATE email_batches SET status = 'polling', owner = %s
+            WHERE batch_id IN (
+                SELECT batch_id FROM email_batches
+                WHERE status IN ('pending', 'polling') AND {_owner_gone("owner")}
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING batch_id, job_id, emails, created_at
+        """, (PROCESS_ID,))
+        rows = sorted(_fetchall(cur), key=lambda r: r["created_at"])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+    for r in rows:
+        r["emails"] = _load_json(r["emails"])
+    return rows
+
+
+def get_job_results_by_email(job_id: str, emails: List[str]) -> List[tuple]:
+    """(domain, result dict) for a job's results whose contact_email is one of `emails` (lowercased)."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        """SELECT domain, result_json FROM job_results
+           WHERE job_id = %s AND lower(result_json->>'contact_email') = ANY(%s)""",
+        (job_id, list(emails)),
+    )
+    rows = cur.fetchall()
+    cur.close()
+    return [(domain, _load_json(raw)) for domain, raw in rows]
+
+
+def cleanup_email_verifications() -> int:
+    """Delete expired email verification verdicts, and batch records applied over a week ago."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute("DELETE FROM email_verifications WHERE expires_at <= NOW()")
+    deleted = cur.rowcount
+    cur.execute("DELETE FROM email_batches WHERE status IN ('complete', 'expired') AND completed_at < NOW() - INTERVAL '7 days'")
+    conn.commit()
+    cur.close()
+    print(f"[DB CLEANUP] Deleted {deleted} expired email verifications", flush=True)
+    return deleted
+
+
 def admin_get_drip_stats() -> list:
     """Drip campaign send counts by drip_key."""
     conn = _get_conn()
@@ -0,0 +1,143 @@
+"""
+AUCTIONFINDER — Canonical domain normalization
+
+One definition of "the same nonprofit domain", shared by job input parsing,
+research_cache keys, paid-lead dedup and the confirmed-auctions seed script:
+
+    >>> canonical_domain("https://www.RedCross.org/donate?x=1")
+    'redcross.org'
+    >>> canonical_domain("Zooboise. Org")
+    'zooboise.org'
+    >>> canonical_domain("bücher.de")
+    'xn--bcher-kva.de'
+    >>> canonical_domain("American Red Cross")
+    'american red cross'
+    >>> canonical_domain("St. Jude")
+    'st. jude'
+    >>> canonical_domain("Habitat for Humanity Int. Inc")
+    'habitat for humanity int. inc'
+
+Inputs that aren't domains (plain organization names) are only lowercased and
+whitespace-collapsed. Spaces inside a domain ("Zooboise. Org") are only removed
+when they sit next to a dot and the last label is a known TLD, so abbreviated
+names don't turn into domains. Check with `python -m doctest domains.py`. With DOMAIN_COLLAPSE_ETLD1=1, subdomains also collapse to
+their registrable domain (eTLD+1): "chapter.redcross.org" -> "redcross.org".
+The public-suffix data comes from `tldextract` when installed, otherwise from a
+built-in list of common multi-label suffixes.
+"""
+
+import os
+import re
+from typing import Iterable, List
+
+from dotenv import load_dotenv
+load_dotenv()
+
+try:
+    import tldextract
+    _tld_extract = tldextract.TLDExtract(suffix_list_urls=())  # bundled snapshot, no network
+except ImportError:
+    _tld_extract = None
+
+# ─── Configuration ────────────────────────────────────────────────────────────
+
+DOMAIN_COLLAPSE_ETLD1 = os.environ.get("DOMAIN_COLLAPSE_ETLD1", "0").strip() == "1"
+
+# Multi-label public suffixes used when tldextract isn't available
+_MULTI_LABEL_SUFFIXES = {
+    "co.uk", "org.uk", "ac.uk", "gov.uk", "me.uk", "ltd.uk", "plc.uk", "net.uk",
+    "com.au", "org.au", "net.au", "edu.au", "gov.au", "asn.au",
+    "co.nz", "org.nz", "net.nz", "ac.nz", "govt.nz",
+    "co.za", "org.za", "ca.us", "ny.us", "tx.us",
+    "co.jp", "or.jp", "ne.jp", "ac.jp", "com.br", "org.br", "com.mx", "org.mx",
+    "co.in", "org.in", "com.sg", "org.sg", "co.il", "org.il",
+}
+
+# Top-level domains recognised in spaced-out input when tldextract isn't available
+_COMMON_TLDS = {
+    "com", "org", "net", "edu", "gov", "mil", "int", "info", "biz", "us", "io", "co",
+    "church", "charity", "foundation", "ngo", "ong", "museum", "school", "community",
+    "uk", "au", "nz", "za", "jp", "br", "mx", "in", "sg", "il", "ca", "de", "fr", "ie",
+} | {suffix.rsplit(".", 1)[-1] for suffix in _MULTI_LABEL_SUFFIXES}
+
+_SCHEME_RE = re.compile(r"^[a-z][a-z0-9+.\-]*://")
+_SPACED_DOT_RE = re.compile(r"\s*\.\s*")
+_DOMAIN_RE = re.compile(r"^(?=.{1,253}$)([a-z0-9](?:[a-z0-9\-]{0,61}[a-z0-9])?\.)+[a-z0-9\-]{2,63}$")
+
+
+def _to_ascii(host: str) -> str:
+    """IDNA-encode a hostname (unicode labels -> punycode); unchanged if encoding fails."""
+    if host.isascii():
+        return host
+    try:
+        return host.encode("idna").decode("ascii")
+    except UnicodeError:
+        return host
+
+
+def _registrable_domain(host: str) -> str:
+    """eTLD+1 of a hostname ("a.b.example.co.uk" -> "example.co.uk")."""
+    if _tld_extract is not None:
+        ext = _tld_extract(host)
+        if ext.domain and ext.suffix:
+            return f"{ext.domain}.{ext.suffix}"
+        return host
+    labels = host.split(".")
+    if len(labels) <= 2:
+        return host
+    if ".".join(labels[-2:]) in _MULTI_LABEL_SUFFIXES:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def _known_tld(host: str) -> bool:
+    if _tld_extract is not None:
+        return bool(_tld_extract(host).suffix)
+    return host.rsplit(".", 1)[-1] in _COMMON_TLDS
+
+
+def _join_spaced_domain(host: str) -> str:
+    """"zooboise. org" -> "zooboise.org"; "" when the spaces separate words (a name)."""
+    if " " not in host:
+        return host
+    joined = _SPACED_DOT_RE.sub(".", host)
+    if " " in joined or not _known_tld(_to_ascii(joined.strip("."))):
+        return ""
+    return joined
+
+
+def canonical_domain(raw: str, collapse_etld1: bool = None) -> str:
+    """Canonical form of a domain/URL, or a normalized name for non-domain input."""
+    if collapse_etld1 is None:
+        collapse_etld1 = DOMAIN_COLLAPSE_ETLD1
+    text = (raw or "").strip().lower()
+    if not text:
+        return ""
+
+    host = _SCHEME_RE.sub("", text)
+    host = re.split(r"[/?#]", host, maxsplit=1)[0]
+    host = host.rsplit("@", 1)[-1]          # user:pass@host
+    host = re.sub(r":\d+$", "", host)        # :port
+    host = _join_spaced_domain(host).strip(".")  # "Zooboise. Org", trailing dot
+    if host.startswith("www."):
+        host = host[4:]
+    host = _to_ascii(host)
+
+    if not _DOMAIN_RE.match(host):
+        # Organization name, not a domain
+        return " ".join(text.split())
+    if collapse_etld1:
+        host = _registrable_domain(host)
+    return host
+
+
+def unique_domains(items: Iterable[str]) -> List[str]:
+    """Canonicalize and de-duplicate, keeping first-seen order."""
+    seen = set()
+    out = []
+    for item in items:
+        key = canonical_domain(item)
+        if key and key not in seen:
+            seen.add(key)
+            out.append(key)
+    return out
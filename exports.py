@@ -0,0 +1,156 @@
+"""
+AUCTIONFINDER — Streaming export layer
+
+Exports used to be built whole in StringIO/BytesIO (XLSX via a regular
+openpyxl Workbook) before the response started, so a full research_cache
+export spiked worker memory and ran into the gunicorn timeout. Everything here
+consumes a row iterator (normally a server-side cursor, see
+db.iter_job_results / db.iter_cache_results) and yields bytes as it goes:
+
+    csv_stream / ndjson_stream / json_stream   chunked text bodies
+    xlsx_stream                                openpyxl write-only mode, spooled to a temp file
+    zip_stream                                 deflated members written to an unseekable sink
+
+XLSX is the exception: openpyxl only assembles the package at save(), so the
+first byte goes out after the last row has been written. Memory stays flat
+(write-only rows, a spooled temp file), but time to first byte grows with the
+export — large exports are better requested as csv/ndjson.
+
+streaming_response() wraps any of them in a Flask Response with a download filename.
+"""
+
+import csv
+import io
+import json
+import tempfile
+import zipfile
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Tuple
+
+import openpyxl
+from flask import Response
+
+CHUNK_ROWS = 500             # rows per yielded text chunk
+CHUNK_BYTES = 256 * 1024     # read size when streaming temp files
+XLSX_SPOOL_BYTES = 8 * 1024 * 1024  # xlsx bodies up to this size never touch disk
+
+MIME_TYPES = {
+    "csv": "text/csv",
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "zip": "application/zip",
+}
+
+
+def csv_stream(rows: Iterable[Dict[str, Any]], columns: List[str]) -> Iterator[bytes]:
+    """CSV (all fields quoted, like the stored result files), header first."""
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=columns, extrasaction="ignore", quoting=csv.QUOTE_ALL)
+    writer.writeheader()
+    n = 0
+    for r in rows:
+        writer.writerow({col: r.get(col, "") for col in columns})
+        n += 1
+        if n % CHUNK_ROWS == 0:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+def ndjson_stream(rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """One JSON object per line."""
+    lines = []
+    for r in rows:
+        lines.append(json.dumps(r, ensure_ascii=False))
+        if len(lines) >= CHUNK_ROWS:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def json_stream(rows: Iterable[Dict[str, Any]], wrap_key: str = None) -> Iterator[bytes]:
+    """A JSON array, or {wrap_key: [...]} — same document shape as the buffered exports."""
+    yield (f'{{"{wrap_key}": [' if wrap_key else "[").encode("utf-8")
+    first = True
+    parts = []
+    for r in rows:
+        parts.append(("\n  " if first else ",\n  ") + json.dumps(r, ensure_ascii=False))
+        first = False
+        if len(parts) >= CHUNK_ROWS:
+            yield "".join(parts).encode("utf-8")
+            parts = []
+    parts.append("\n]}" if wrap_key else "\n]")
+    yield "".join(parts).encode("utf-8")
+
+
+def xlsx_stream(rows: Iterable[Dict[str, Any]], columns: List[str],
+                title: str = "Auction Results") -> Iterator[bytes]:
+    """XLSX built with openpyxl's write-only mode (rows aren't kept in memory),
+    saved to a spooled temp file and then streamed. Not incremental: nothing is
+    yielded until every row has been consumed and the workbook saved."""
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(title)
+    ws.append(columns)
+    for r in rows:
+        ws.append([r.get(col, "") for col in columns])
+    with tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_BYTES, suffix=".xlsx") as f:
+        wb.save(f)
+        f.seek(0)
+        yield from file_stream(f)
+
+
+def file_stream(f: BinaryIO) -> Iterator[bytes]:
+    """An open binary file, from its current position, in CHUNK_BYTES blocks."""
+    while True:
+        block = f.read(CHUNK_BYTES)
+        if not block:
+            break
+        yield block
+
+
+class _Sink(io.RawIOBase):
+    """Write-only, unseekable buffer that zipfile writes into; drained after every write."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        out, self._chunks = b"".join(self._chunks), []
+        return out
+
+
+def zip_stream(members: Iterable[Tuple[str, Callable[[], Iterable[bytes]]]]) -> Iterator[bytes]:
+    """Deflated ZIP of (name, body_factory) members, produced as it is written.
+    Each factory is called only when its member starts, so members can run their
+    own query. zipfile falls back to data descriptors on the unseekable sink."""
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, factory in members:
+            with zf.open(name, "w", force_zip64=True) as member:
+                for block in factory():
+                    member.write(block)
+                    out = sink.drain()
+                    if out:
+                        yield out
+            out = sink.drain()
+            if out:
+                yield out
+    yield sink.drain()
+
+
+def streaming_response(body: Iterable[bytes], fmt: str, filename: str) -> Response:
+    """Chunked download response for a streaming body."""
+    resp = Response(body, mimetype=MIME_TYPES.get(fmt, "application/octet-stream"))
+    resp.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
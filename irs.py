@@ -0,0 +1,490 @@
+"""
+AUCTIONFINDER — IRS nonprofit database: connection, schema helpers, enrichment
+
+Lead enrichment used to run up to two ILIKE queries per result against
+tax_year_2019_search over a fresh connection — neither could use an index.
+The IRS tables now carry two generated, indexed match keys:
+
+    website_domain = af_website_domain(website)
+        the organization's Website reduced to a bare domain by the same rules as
+        domains.canonical_domain (scheme, path, userinfo, port, www.; minus IDNA),
+        so it joins exactly to a result's query_domain. website_domain_sql() is
+        shared with seed_confirmed_auctions.py;
+    name_norm = af_org_name_norm(organizationname)
+        lowercased, '&' -> 'and', punctuation dropped, a leading "the" and
+        trailing legal suffixes such as Inc/LLC/Foundation removed; btree for
+        exact matches, trigram for the fuzzy fallback. normalize_org_name() is
+        the Python mirror.
+
+enrich_from_irs() joins results by domain first (one `= ANY` query for the
+job), and only results without a domain match fall back to names: one
+set-based query (unnest + LATERAL) for an exact name_norm match, then the most
+similar name above IRS_NAME_MIN_SIMILARITY. Both lookups are memoized in
+process, misses included.
+
+The database page (/api/irs/search) pages confirmed_auction_nonprofits by
+keyset on (totalrevenue, ein) — an opaque cursor carries the last row's key,
+so every page is an index range scan instead of OFFSET/LIMIT 10000 — and full
+exports stream through a named server-side cursor. The name/city/event/mission
+LIKE filters are backed by trigram indexes.
+
+Configuration (env):
+    IRS_DB_CONNECTION         IRS database (default DATABASE_URL / DATABASE_PRIVATE_URL)
+    IRS_MEMO_SIZE             domains / names remembered in process, hits and misses (default 50000 each)
+    IRS_NAME_MIN_SIMILARITY   trigram similarity for the fuzzy fallback (default 0.6)
+"""
+
+import base64
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import psycopg2
+from dotenv import load_dotenv
+load_dotenv()
+
+from domains import canonical_domain
+
+# ─── Configuration ────────────────────────────────────────────────────────────
+
+DB_CONN_STRING = (
+    os.environ.get("IRS_DB_CONNECTION")
+    or os.environ.get("DATABASE_URL")
+    or os.environ.get("DATABASE_PRIVATE_URL")
+    or "postgresql://localhost/irs"
+)
+_src = "IRS_DB_CONNECTION" if os.environ.get("IRS_DB_CONNECTION") else \
+       "DATABASE_URL" if os.environ.get("DATABASE_URL") else \
+       "DATABASE_PRIVATE_URL" if os.environ.get("DATABASE_PRIVATE_URL") else "FALLBACK"
+print(f"[IRS DB] Using: {_src} -> {DB_CONN_STRING[:30]}...")
+
+IRS_MEMO_SIZE = int(os.environ.get("IRS_MEMO_SIZE", "50000"))
+IRS_NAME_MIN_SIMILARITY = float(os.environ.get("IRS_NAME_MIN_SIMILARITY", "0.6"))
+
+IRS_TABLES = ("tax_year_2019_search", "confirmed_auction_nonprofits")
+SEARCH_TABLE = "confirmed_auction_nonprofits"
+
+
+def get_irs_db():
+    """Get an IRS PostgreSQL database connection."""
+    return psycopg2.connect(DB_CONN_STRING)
+
+
+# ─── Name Normalization ───────────────────────────────────────────────────────
+
+_LEGAL_SUFFIXES = "inc|incorporated|corp|corporation|co|llc|ltd|foundation|fdn"
+_SUFFIX_RE = re.compile(rf"( ({_LEGAL_SUFFIXES}))+ $")
+
+
+def normalize_org_name(name: str) -> Optional[str]:
+    """'The Red Cross, Inc.' -> 'red cross'. Must match af_org_name_norm() below."""
+    s = re.sub(r"[^a-z0-9]+", " ", (name or "").lower().replace("&", " and "))
+    s = " " + s.strip() + " "
+    s = re.sub(r"^ the ", " ", s)
+    s = _SUFFIX_RE.sub(" ", s)
+    return s.strip() or None
+
+
+_NORMALIZE_SQL = rf"""
+CREATE OR REPLACE FUNCTION af_org_name_norm(n TEXT) RETURNS TEXT AS $$
+    SELECT NULLIF(TRIM(
+        REGEXP_REPLACE(
+            REGEXP_REPLACE(
+                ' ' || TRIM(REGEXP_REPLACE(REPLACE(LOWER(COALESCE(n, '')), '&', ' and '), '[^a-z0-9]+', ' ', 'g')) || ' ',
+                '^ the ', ' '),
+            '( ({_LEGAL_SUFFIXES}))+ $', ' ')
+    ), '')
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE
+"""
+
+def website_domain_sql(column: str) -> str:
+    """SQL expression reducing a Website column to a bare domain — canonical_domain's
+    scheme, path/query, userinfo, port, trailing-dot and www. rules, minus IDNA."""
+    return rf"""NULLIF(REGEXP_REPLACE(TRIM(BOTH '.' FROM
+        REGEXP_REPLACE(
+            REGEXP_REPLACE(
+                REGEXP_REPLACE(
+                    REGEXP_REPLACE(REPLACE(LOWER(TRIM({column})), ' ', ''), '^[a-z][a-z0-9+.-]*://', ''),
+                    '[/?#].*$', ''),
+                '^.*@', ''),
+            ':[0-9]+$', '')),
+        '^www\.', ''), '')"""
+
+
+_WEBSITE_DOMAIN_SQL = f"""
+CREATE OR REPLACE FUNCTION af_website_domain(w TEXT) RETURNS TEXT AS $$
+    SELECT {website_domain_sql("w")}
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE
+"""
+
+# A URL the current af_website_domain reduces to "foo.org"; older definitions kept
+# userinfo and port, and the STORED website_domain values they computed are stale
+_WEBSITE_DOMAIN_PROBE = ("http://user@www.foo.org:8080/donate", "foo.org")
+
+
+def _website_domain_outdated(cur) -> bool:
+    cur.execute("SELECT to_regprocedure('af_website_domain(text)') IS NOT NULL")
+    if not cur.fetchone()[0]:
+        return False
+    cur.execute("SELECT af_website_domain(%s)", (_WEBSITE_DOMAIN_PROBE[0],))
+    return cur.fetchone()[0] != _WEBSITE_DOMAIN_PROBE[1]
+
+
+def ensure_irs_schema():
+    """Add website_domain and name_norm (generated) with btree and trigram indexes
+    to the IRS tables. Idempotent; the first run rewrites each table once."""
+    try:
+        conn = get_irs_db()
+    except Exception as e:
+        print(f"[IRS DB] Schema check skipped: {e}", flush=True)
+        return
+    cur = conn.cursor()
+    try:
+        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        conn.commit()
+    except Exception as e:
+        print(f"[IRS DB] pg_trgm unavailable (fuzzy name matching disabled): {e}", flush=True)
+        conn.rollback()
+    try:
+        outdated = _website_domain_outdated(cur)
+        cur.execute(_NORMALIZE_SQL)
+        cur.execute(_WEBSITE_DOMAIN_SQL)
+        if outdated:
+            # Generated columns aren't recomputed when their function changes: drop
+            # website_domain (and its index) so the loop below re-adds it
+            for table in IRS_TABLES:
+                cur.execute("SELECT to_regclass(%s)", (table,))
+                if cur.fetchone()[0] is not None:
+                    print(f"[IRS DB] Rebuilding {table}.website_domain", flush=True)
+                    cur.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS website_domain")
+        conn.commit()
+    except Exception as e:
+        print(f"[IRS DB] Match-key function error: {e}", flush=True)
+        conn.rollback()
+    for table in IRS_TABLES:
+        try:
+            cur.execute("SELECT to_regclass(%s)", (table,))
+            if cur.fetchone()[0] is None:
+                continue
+            cur.execute(
+                f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS name_norm TEXT "
+                f"GENERATED ALWAYS AS (af_org_name_norm(organizationname)) STORED"
+            )
+            cur.execute(
+                f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS website_domain TEXT "
+                f"GENERATED ALWAYS AS (af_website_domain(website)) STORED"
+            )
+            cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_name_norm ON {table} (name_norm)")
+            cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_website_domain ON {table} (website_domain)")
+            conn.commit()
+        except Exception as e:
+            print(f"[IRS DB] Match-key migration error ({table}): {e}", flush=True)
+            conn.rollback()
+            continue
+        try:
+            cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_name_norm_trgm ON {table} USING gin (name_norm gin_trgm_ops)")
+            conn.commit()
+        except Exception as e:
+            print(f"[IRS DB] name_norm trigram index error ({table}): {e}", flush=True)
+            conn.rollback()
+    _ensure_search_indexes(cur)
+    cur.close()
+    conn.close()
+
+
+# ─── Enrichment ───────────────────────────────────────────────────────────────
+
+class _LookupMemo:
+    """Bounded, thread-safe LRU of match key -> IRS record (None = known miss)."""
+
+    MISSING = object()
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._entries: "OrderedDict[str, Optional[Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        """The remembered record (or None for a remembered miss); MISSING if unknown."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return self.MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def put(self, key: str, record: Optional[Dict[str, Any]]):
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._entries[key] = record
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "capacity": self.capacity,
+                    "hits": self.hits, "misses": self.misses}
+
+
+# Process-wide singletons
+domain_memo = _LookupMemo(IRS_MEMO_SIZE)
+name_memo = _LookupMemo(IRS_MEMO_SIZE)
+
+# EIN, address, phone and headline financials — what a lead is matched/enriched with
+_RECORD_COLUMNS = (
+    "ein", "organizationname", "physicaladdress", "physicalcity", "physicalstate",
+    "physicalzip", "businessofficerphone", "totalrevenue", "grossreceipts", "totalassets",
+)
+_RECORD_SELECT = ", ".join(f"t.{c}" for c in _RECORD_COLUMNS)
+
+
+def _records(cur) -> Dict[str, Dict[str, Any]]:
+    return {key: dict(zip(_RECORD_COLUMNS, row)) for key, *row in cur.fetchall()}
+
+
+def lookup_domains(cur, domains: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Exact website_domain join for many canonical domains in one query.
+    Several filings can share a website; the largest organization wins."""
+    cur.execute(f"""
+        SELECT DISTINCT ON (t.website_domain) t.website_domain, {_RECORD_SELECT}
+        FROM tax_year_2019_search t
+        WHERE t.website_domain = ANY(%s)
+        ORDER BY t.website_domain, t.totalrevenue DESC NULLS LAST
+    """, (domains,))
+    return _records(cur)
+
+
+def lookup_names(cur, names: List[str]) -> Dict[str, Dict[str, Any]]:
+    """One round trip per strategy for many normalized names: exact name_norm, then trigram."""
+    cur.execute(f"""
+        SELECT v.n, {_RECORD_SELECT}
+        FROM unnest(%s::text[]) AS v(n)
+        CROSS JOIN LATERAL (
+            SELECT * FROM tax_year_2019_search t
+            WHERE t.name_norm = v.n
+            ORDER BY t.totalrevenue DESC NULLS LAST
+            LIMIT 1
+        ) t
+    """, (names,))
+    found = _records(cur)
+    rest = [n for n in names if n not in found]
+    if rest:
+        try:
+            cur.execute(f"""
+                SELECT v.n, {_RECORD_SELECT}
+                FROM unnest(%s::text[]) AS v(n)
+                CROSS JOIN LATERAL (
+                    SELECT * FROM tax_year_2019_search t
+                    WHERE t.name_norm %% v.n AND similarity(t.name_norm, v.n) >= %s
+                    ORDER BY similarity(t.name_norm, v.n) DESC, t.totalrevenue DESC NULLS LAST
+                    LIMIT 1
+                ) t
+            """, (rest, IRS_NAME_MIN_SIMILARITY))
+            found.update(_records(cur))
+        except psycopg2.Error as e:
+            cur.connection.rollback()
+            print(f"[IRS ENRICH] Fuzzy fallback unavailable: {e}", flush=True)
+    return found
+
+
+def _resolve(keys: List[str], memo: _LookupMemo, lookup: Callable[[List[str]], Dict[str, Dict[str, Any]]]) -> tuple:
+    """Records for `keys` from the memo, looking up only the unknown ones. Returns (records, looked_up)."""
+    records: Dict[str, Optional[Dict[str, Any]]] = {}
+    unknown = []
+    for key in keys:
+        record = memo.get(key)
+        if record is _LookupMemo.MISSING:
+            unknown.append(key)
+        else:
+            records[key] = record
+    if unknown:
+        found = lookup(unknown)
+        for key in unknown:
+            records[key] = found.get(key)
+            memo.put(key, records[key])
+    return records, len(unknown)
+
+
+def _apply_record(r: Dict[str, Any], record: Dict[str, Any]):
+    addr, city, state, zipcode = (record["physicaladdress"], record["physicalcity"],
+                                  record["physicalstate"], record["physicalzip"])
+    if not r.get("organization_address") and addr:
+        parts = [p for p in [addr, city, f"{state} {zipcode}" if state else zipcode] if p]
+        r["organization_address"] = ", ".join(parts)
+    if not r.get("organization_phone_maps") and record["businessofficerphone"]:
+        r["organization_phone_maps"] = record["businessofficerphone"]
+    if not r.get("nonprofit_name") and record["organizationname"]:
+        r["nonprofit_name"] = record["organizationname"]
+
+
+def enrich_from_irs(results: List[Dict[str, Any]]) -> None:
+    """Fill missing address/phone (and name) on lead results from the IRS nonprofit database."""
+    needs = [r for r in results if not r.get("organization_address") or not r.get("organization_phone_maps")]
+    if not needs:
+        return
+
+    conn = None
+
+    def _cursor():
+        nonlocal conn
+        if conn is None:
+            conn = get_irs_db()
+        return conn.cursor()
+
+    try:
+        # 1. Exact join on the result's own domain
+        by_domain: Dict[str, List[Dict[str, Any]]] = {}
+        for r in needs:
+            domain = canonical_domain(r.get("query_domain", ""))
+            if domain:
+                by_domain.setdefault(domain, []).append(r)
+        records, domains_looked_up = _resolve(list(by_domain), domain_memo, lambda ks: lookup_domains(_cursor(), ks))
+        matched = set()
+        for domain, rs in by_domain.items():
+            if records.get(domain):
+                for r in rs:
+                    _apply_record(r, records[domain])
+                    matched.add(id(r))
+
+        # 2. Name fallback for results the domain didn't resolve
+        by_name: Dict[str, List[Dict[str, Any]]] = {}
+        for r in needs:
+            if id(r) not in matched and r.get("nonprofit_name"):
+                norm = normalize_org_name(r["nonprofit_name"])
+                if norm:
+                    by_name.setdefault(norm, []).append(r)
+        records, names_looked_up = _resolve(list(by_name), name_memo, lambda ks: lookup_names(_cursor(), ks))
+        by_name_matched = 0
+        for norm, rs in by_name.items():
+            if records.get(norm):
+                by_name_matched += len(rs)
+                for r in rs:
+                    _apply_record(r, records[norm])
+        print(f"[IRS ENRICH] {len(matched)}/{len(needs)} by domain, {by_name_matched} by name "
+              f"({domains_looked_up + names_looked_up} key(s) looked up, rest from memo)", flush=True)
+    except Exception as e:
+        print(f"[IRS ENRICH] Warning: {e}")
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+# ─── Search ───────────────────────────────────────────────────────────────────
+
+# Columns the database page and its exports return, in order
+SEARCH_COLUMNS = [
+    "EIN", "OrganizationName", "Website", "PhysicalAddress", "PhysicalCity",
+    "PhysicalState", "PhysicalZIP", "BusinessOfficerPhone", "PrincipalOfficerName",
+    "TotalRevenue", "GrossReceipts", "NetIncome", "TotalAssets", "ContributionsReceived",
+    "ProgramServiceRevenue", "FundraisingGrossIncome", "FundraisingDirectExpenses",
+    "Event1Name", "Event1GrossReceipts", "Event1GrossRevenue", "Event1NetIncome",
+    "Event2Name", "Event2GrossReceipts", "Event2GrossRevenue",
+    "Event1Keyword", "Event2Keyword", "PrimaryEventType", "ProspectTier",
+    "Region5", "MissionDescriptionShort",
+]
+_SEARCH_SELECT = ", ".join(f'{c.lower()} AS "{c}"' for c in SEARCH_COLUMNS)
+
+# Keyset: revenue descending, EIN as tie-breaker. NULLs are folded to sentinels so
+# the key is total and matches the expression index below (-(2**63 - 1) still
+# parses as a bigint literal; -2**63 would not).
+_NO_REVENUE = -(2 ** 63 - 1)
+_KEY_REVENUE = f"COALESCE(totalrevenue, {_NO_REVENUE})"
+_KEY_EIN = "COALESCE(ein, '')"
+_KEYSET_ORDER = f"{_KEY_REVENUE} DESC, {_KEY_EIN} DESC"
+
+# Columns filtered with LIKE (prefix or infix) on the database page
+_SEARCH_TRGM_COLUMNS = ("organizationname", "physicalcity", "event1name", "event2name", "missiondescriptionshort")
+
+
+def _ensure_search_indexes(cur):
+    conn = cur.connection
+    try:
+        cur.execute("SELECT to_regclass(%s)", (SEARCH_TABLE,))
+        if cur.fetchone()[0] is None:
+            return
+        cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{SEARCH_TABLE}_keyset ON {SEARCH_TABLE} (({_KEY_REVENUE}), ({_KEY_EIN}))")
+        conn.commit()
+    except Exception as e:
+        print(f"[IRS DB] Search keyset index error: {e}", flush=True)
+        conn.rollback()
+        return
+    for col in _SEARCH_TRGM_COLUMNS:
+        try:
+            cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{SEARCH_TABLE}_{col}_trgm ON {SEARCH_TABLE} USING gin ({col} gin_trgm_ops)")
+            conn.commit()
+        except Exception as e:
+            print(f"[IRS DB] {col} trigram index error: {e}", flush=True)
+            conn.rollback()
+
+
+def encode_search_cursor(row: Dict[str, Any]) -> str:
+    """Opaque token for the position after `row` (a search result dict)."""
+    revenue = row.get("TotalRevenue")
+    key = [_NO_REVENUE if revenue is None else revenue, row.get("EIN") or ""]
+    return base64.urlsafe_b64encode(json.dumps(key).encode("utf-8")).decode("ascii")
+
+
+def decode_search_cursor(token: str) -> Tuple[int, str]:
+    """(revenue, ein) from encode_search_cursor's token. Raises ValueError on anything else."""
+    try:
+        revenue, ein = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    except Exception:
+        raise ValueError("invalid cursor")
+    if not isinstance(revenue, int) or not isinstance(ein, str):
+        raise ValueError("invalid cursor")
+    return (revenue, ein)
+
+
+def search_page(where: str, params: tuple, limit: int,
+                after: Optional[Tuple[int, str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page of SEARCH_TABLE rows matching `where`, revenue descending, starting
+    after the keyset `after`. Returns (rows, next_cursor); next_cursor is None on the last page."""
+    if after is not None:
+        where = f"({where}) AND ({_KEY_REVENUE}, {_KEY_EIN}) < (%s, %s)"
+        params = tuple(params) + tuple(after)
+    conn = get_irs_db()
+    try:
+        cur = conn.cursor()
+        # One extra row tells whether another page exists
+        cur.execute(f"""
+            SELECT {_SEARCH_SELECT}
+            FROM {SEARCH_TABLE}
+            WHERE {where}
+            ORDER BY {_KEYSET_ORDER}
+            LIMIT %s
+        """, tuple(params) + (limit + 1,))
+        rows = [dict(zip(SEARCH_COLUMNS, row)) for row in cur.fetchall()]
+    finally:
+        conn.close()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_search_cursor(rows[-1])
+    return rows, None
+
+
+def iter_search(where: str, params: tuple) -> Iterator[Dict[str, Any]]:
+    """Every SEARCH_TABLE row matching `where`, streamed through a server-side
+    cursor in page order. For exports — memory stays flat however many rows match."""
+    conn = get_irs_db()
+    try:
+        with conn.cursor(name="irs_search_export") as cur:
+            cur.itersize = 2000
+            cur.execute(f"""
+                SELECT {_SEARCH_SELECT}
+                FROM {SEARCH_TABLE}
+                WHERE {where}
+                ORDER BY {_KEYSET_ORDER}
+            """, tuple(params))
+            for row in cur:
+                yield dict(zip(SEARCH_COLUMNS, row))
+    finally:
+        # Also runs if the client disconnects mid-download (generator closed)
+        conn.close()
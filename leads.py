@@ -0,0 +1,151 @@
+"""
+AUCTIONFINDER — Lead classification
+
+Pure functions shared by bot.py (research), db.py (columns extracted at write
+time) and the admin pages. No network or database access, so anything can
+import it.
+
+A lead's tier only changes over time through the 30-days-out gate, so it is
+materialized once with the instant that gate stops holding (tier_valid_until =
+event date - 30 days). Until then the stored tier is exact; afterwards the
+lead is not billable. In memory the classification rides on the result dict
+(_tier, _tier_price, _tier_valid_until); in the database it lives in the
+tier / price_cents / tier_valid_until columns, which db.retier_expired_results
+downgrades once their window has passed.
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+
+def is_valid_email(email: str) -> bool:
+    if not email or not isinstance(email, str):
+        return False
+    return bool(re.match(r"^[^@\s]+@[^@\s]+\.[^@\s]+$", email.strip()))
+
+
+def has_valid_url(result: Dict[str, Any]) -> bool:
+    url = result.get("event_url", "").strip()
+    return url.startswith("http://") or url.startswith("https://")
+
+
+def parse_event_date(date_str: str) -> Optional[datetime]:
+    """Parse M/D/YYYY or MM/DD/YYYY event date. Returns datetime or None."""
+    if not date_str or not isinstance(date_str, str):
+        return None
+    m = re.match(r"^(\d{1,2})/(\d{1,2})/(\d{4})$", date_str.strip())
+    if m:
+        try:
+            return datetime(int(m.group(3)), int(m.group(1)), int(m.group(2)), tzinfo=timezone.utc)
+        except ValueError:
+            return None
+    return None
+
+
+def parse_any_event_date(date_str: str) -> Optional[datetime]:
+    """parse_event_date, falling back to an ISO YYYY-MM-DD prefix. For the stored
+    event_date column (export filters), which accepted both; tiering stays M/D/YYYY-only."""
+    event_dt = parse_event_date(date_str)
+    if event_dt or not date_str or not isinstance(date_str, str):
+        return event_dt
+    try:
+        return datetime.strptime(date_str.strip()[:10], "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def is_at_least_30_days_out(result: Dict[str, Any]) -> bool:
+    """Return True if event_date is at least 30 days in the future.
+    Returns False if date is missing, unparseable, or too soon."""
+    event_dt = parse_event_date(result.get("event_date", ""))
+    if not event_dt:
+        return False
+    return event_dt >= datetime.now(timezone.utc) + timedelta(days=30)
+
+
+def classify_lead_tier(result: Dict[str, Any]) -> tuple:
+    """Returns (tier_name, price_cents) based on fields present.
+    3-tier system: decision_maker ($1.75), outreach_ready ($1.25), event_verified ($0.75).
+    Hard gates: must have event_title AND event_url (non-negotiable).
+    Date gate: event must be at least 30 days in the future.
+    Soft requirement: evidence_auction strongly preferred but not a hard kill."""
+    has_title = bool(result.get("event_title", "").strip())
+    has_url = has_valid_url(result)
+    has_auction_evidence = bool(result.get("evidence_auction", "").strip())
+    _name_raw = result.get("contact_name", "").strip().lower()
+    _placeholder_names = {"no contact found", "not found", "n/a", "unknown", "none", "no name found", "no contact", "no name"}
+    has_name = bool(_name_raw) and _name_raw not in _placeholder_names
+    has_email = is_valid_email(result.get("contact_email", ""))
+
+    # Hard gates: must have verified event page URL + event title
+    if not has_title or not has_url:
+        return ("not_billable", 0)
+
+    # Date gate: event must be at least 30 days out — no stale leads
+    if not is_at_least_30_days_out(result):
+        return ("not_billable", 0)
+
+    # Auction evidence gate: require evidence OR auction_type field
+    has_auction_type = bool(result.get("auction_type", "").strip())
+    if not has_auction_evidence and not has_auction_type:
+        return ("not_billable", 0)
+
+    if has_email and has_name:
+        return ("decision_maker", 175)
+    if has_email:
+        return ("outreach_ready", 125)
+    return ("event_verified", 75)
+
+
+def classify_lead(result: Dict[str, Any]) -> Tuple[str, int, Optional[datetime]]:
+    """(tier, price_cents, valid_until). Results that weren't found are never billable.
+    valid_until is the last instant the 30-days-out gate holds; None for
+    not_billable, which the passage of time can't change."""
+    if result.get("status", "uncertain") in ("not_found", "uncertain", "error"):
+        return ("not_billable", 0, None)
+    tier, price = classify_lead_tier(result)
+    if tier == "not_billable":
+        return (tier, 0, None)
+    return (tier, price, parse_event_date(result.get("event_date", "")) - timedelta(days=30))
+
+
+def materialize_tier(result: Dict[str, Any]) -> tuple:
+    """Classify `result` now and store the answer on it. Call again whenever the
+    fields the tier depends on change (status, contact email/name). Returns (tier, price_cents)."""
+    tier, price, valid_until = classify_lead(result)
+    result["_tier"] = tier
+    result["_tier_price"] = price
+    result["_tier_valid_until"] = valid_until.isoformat() if valid_until else ""
+    return (tier, price)
+
+
+def lead_tier(result: Dict[str, Any]) -> tuple:
+    """(tier, price_cents) from the materialized classification, classifying only
+    if there is none yet. A tier whose validity window has passed is downgraded."""
+    if "_tier" not in result:
+        return materialize_tier(result)
+    valid_until = result.get("_tier_valid_until")
+    if valid_until and datetime.fromisoformat(valid_until) < datetime.now(timezone.utc):
+        result["_tier"], result["_tier_price"], result["_tier_valid_until"] = "not_billable", 0, ""
+    return (result["_tier"], result["_tier_price"])
+
+
+def result_columns(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Indexed columns stored next to a result's JSON (research_cache / job_results),
+    so admin aggregates and export filters can run in SQL."""
+    event_dt = parse_any_event_date(result.get("event_date", ""))
+    try:
+        confidence = float(result.get("confidence_score") or 0.0)
+    except (TypeError, ValueError):
+        confidence = 0.0
+    tier, price, valid_until = classify_lead(result)
+    return {
+        "event_date": event_dt.date() if event_dt else None,
+        "has_email": is_valid_email(result.get("contact_email", "")),
+        "has_event_url": has_valid_url(result),
+        "confidence": max(0.0, min(confidence, 1.0)),
+        "tier": tier,
+        "price_cents": price,
+        "tier_valid_until": valid_until,
+    }
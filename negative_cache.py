@@ -0,0 +1,188 @@
+"""
+AUCTIONFINDER — Bloom-filter negative cache of known not_found domains
+
+A compact in-memory Bloom filter over every unexpired `not_found` research_cache
+key, rebuilt periodically from Postgres and saved to disk so a restart doesn't
+need a full scan. A 50k-domain list is screened in memory; only the positives
+(probably dead) are confirmed against Postgres in one bulk query, so false
+positives never drop a live domain.
+
+New not_found results are added as they are cached. Keys can't be removed from
+a Bloom filter, so a domain that later turns up found is only fixed by the next
+rebuild — which is why every positive is confirmed before it's acted on.
+
+Configuration (env):
+    NEGATIVE_CACHE_PATH               file the filter is saved to (default results/negative_cache.bloom)
+    NEGATIVE_CACHE_FP_RATE            target false-positive rate (default 0.01)
+    NEGATIVE_CACHE_REBUILD_SECONDS    rebuild interval (default 3600)
+"""
+
+import hashlib
+import math
+import os
+import struct
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from dotenv import load_dotenv
+load_dotenv()
+
+# ─── Configuration ────────────────────────────────────────────────────────────
+
+NEGATIVE_CACHE_PATH = os.environ.get(
+    "NEGATIVE_CACHE_PATH",
+    os.path.join(os.environ.get("RESULTS_DIR", "results"), "negative_cache.bloom"),
+)
+NEGATIVE_CACHE_FP_RATE = float(os.environ.get("NEGATIVE_CACHE_FP_RATE", "0.01"))
+NEGATIVE_CACHE_REBUILD_SECONDS = int(os.environ.get("NEGATIVE_CACHE_REBUILD_SECONDS", "3600"))
+
+_MAGIC = b"AFBLOOM1"
+_HEADER = struct.Struct("<8sQIQd")  # magic, m bits, k hashes, count, built_at
+
+
+class BloomFilter:
+    """Plain Bloom filter with Kirsch–Mitzenmacher double hashing over blake2b."""
+
+    def __init__(self, capacity: int, fp_rate: float = NEGATIVE_CACHE_FP_RATE):
+        capacity = max(1000, capacity)
+        self.m = max(8, int(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.k = max(1, round(self.m / capacity * math.log(2)))
+        self.bits = bytearray((self.m + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.m for i in range(self.k)]
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class NegativeCache:
+    """Thread-safe holder of the current filter, with disk persistence and periodic rebuild."""
+
+    def __init__(self, path: str = NEGATIVE_CACHE_PATH):
+        self.path = path
+        self._bloom: Optional[BloomFilter] = None
+        self._lock = threading.Lock()
+        self.built_at = 0.0
+        self.checks = 0
+        self.positives = 0
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._bloom is not None
+
+    def might_be_not_found(self, key: str) -> bool:
+        """False means definitely not a known not_found key; True must be confirmed."""
+        bloom = self._bloom
+        if bloom is None:
+            return False
+        self.checks += 1
+        hit = key in bloom
+        if hit:
+            self.positives += 1
+        return hit
+
+    def add(self, key: str):
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(key)
+
+    # ── Build / persist ──
+
+    def rebuild(self, keys: Iterable[str], expected: int = 0):
+        """Build a fresh filter from `keys` and swap it in atomically. With the
+        `expected` key count known up front, `keys` is consumed as a stream."""
+        if not expected:
+            keys = list(keys)
+            expected = len(keys)
+        bloom = BloomFilter(int(expected * 1.25))
+        for key in keys:
+            bloom.add(key)
+        with self._lock:
+            self._bloom = bloom
+            self.built_at = time.time()
+        print(f"[NEG-CACHE] Rebuilt: {bloom.count:,} not_found keys, "
+              f"{len(bloom.bits) / 1024:.0f} KB, k={bloom.k}", flush=True)
+        self.save()
+
+    def save(self):
+        bloom = self._bloom
+        if bloom is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, bloom.m, bloom.k, bloom.count, self.built_at))
+                f.write(bloom.bits)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[NEG-CACHE WARN] Save failed: {e}", flush=True)
+
+    def load(self) -> bool:
+        """Load the saved filter if present and valid. Returns True on success."""
+        try:
+            with open(self.path, "rb") as f:
+                magic, m, k, count, built_at = _HEADER.unpack(f.read(_HEADER.size))
+                bits = bytearray(f.read())
+        except (OSError, struct.error):
+            return False
+        if magic != _MAGIC or len(bits) != (m + 7) // 8:
+            return False
+        bloom = BloomFilter.__new__(BloomFilter)
+        bloom.m, bloom.k, bloom.count, bloom.bits = m, k, count, bits
+        with self._lock:
+            self._bloom = bloom
+            self.built_at = built_at
+        print(f"[NEG-CACHE] Loaded {count:,} not_found keys from {self.path}", flush=True)
+        return True
+
+    def start(self, key_source: Callable[[], Iterable[str]],
+              interval: int = NEGATIVE_CACHE_REBUILD_SECONDS,
+              count_source: Optional[Callable[[], int]] = None):
+        """Load from disk, then rebuild from `key_source` whenever the filter is older than `interval`.
+        `count_source` sizes the filter first, so the keys are never held in memory at once."""
+        if self._thread is not None:
+            return
+        self.load()
+
+        def _loop():
+            while True:
+                wait = self.built_at + interval - time.time()
+                if wait > 0:
+                    time.sleep(min(wait, 300))
+                    continue
+                try:
+                    self.rebuild(key_source(), expected=count_source() if count_source else 0)
+                except Exception as e:
+                    print(f"[NEG-CACHE WARN] Rebuild failed: {e}", flush=True)
+                    time.sleep(300)
+
+        self._thread = threading.Thread(target=_loop, name="negative-cache", daemon=True)
+        self._thread.start()
+
+    def stats(self) -> Dict:
+        bloom = self._bloom
+        return {
+            "ready": bloom is not None,
+            "keys": bloom.count if bloom else 0,
+            "size_kb": round(len(bloom.bits) / 1024, 1) if bloom else 0,
+            "age_s": int(time.time() - self.built_at) if bloom else None,
+            "checks": self.checks,
+            "positives": self.positives,
+        }
+
+
+# Process-wide singleton
+negative_cache = NegativeCache()
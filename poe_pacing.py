@@ -0,0 +1,136 @@
+"""
+AUCTIONFINDER — Adaptive (AIMD) Poe concurrency and pacing controller
+
+Replaces the fixed PAUSE_BETWEEN_DOMAINS / RETRY_DELAY_SECONDS with values that
+follow Poe's actual health. Every finished call is reported with its latency
+and outcome:
+
+  - success           -> window grows by 1/window (≈ +1 per window of calls),
+                         pause and retry delay shrink by a fixed step
+  - error / empty     -> window halves, pause and retry delay double
+  - slow (> target)   -> window is cut by 25% (congestion, not a failure)
+
+Decreases are applied at most once per DECREASE_HOLDOFF_SECONDS so a burst of
+failures from calls that were already in flight doesn't collapse the window to 1.
+
+The window also gates calls: at most int(window) Poe calls run at once.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+load_dotenv()
+
+# ─── Configuration ────────────────────────────────────────────────────────────
+
+POE_AIMD_INITIAL_WINDOW = float(os.environ.get("POE_AIMD_INITIAL_WINDOW", "4"))
+POE_AIMD_MIN_WINDOW = float(os.environ.get("POE_AIMD_MIN_WINDOW", "1"))
+POE_AIMD_MAX_WINDOW = float(os.environ.get("POE_AIMD_MAX_WINDOW", "64"))
+POE_LATENCY_TARGET_SECONDS = float(os.environ.get("POE_LATENCY_TARGET_SECONDS", "120"))
+
+PAUSE_MIN_SECONDS = 0.0
+PAUSE_MAX_SECONDS = 30.0
+PAUSE_STEP_SECONDS = 0.25
+RETRY_DELAY_MIN_SECONDS = 2.0
+RETRY_DELAY_MAX_SECONDS = 120.0
+RETRY_DELAY_STEP_SECONDS = 1.0
+DECREASE_HOLDOFF_SECONDS = 5.0
+
+
+class AIMDController:
+    """Thread-safe additive-increase / multiplicative-decrease controller."""
+
+    def __init__(self, initial_pause: float = 2.0, initial_retry_delay: float = 15.0,
+                 initial_window: float = POE_AIMD_INITIAL_WINDOW,
+                 min_window: float = POE_AIMD_MIN_WINDOW, max_window: float = POE_AIMD_MAX_WINDOW,
+                 latency_target: float = POE_LATENCY_TARGET_SECONDS):
+        self.min_window = min_window
+        self.max_window = max(min_window, max_window)
+        self.window = min(self.max_window, max(min_window, initial_window))
+        self.pause = initial_pause
+        self.retry_delay = initial_retry_delay
+        self.latency_target = latency_target
+        self.latency_ewma: Optional[float] = None
+        self.in_flight = 0
+        self.successes = 0
+        self.failures = 0
+        self.decreases = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    # ── Gating ──
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the int(window) concurrent Poe call slots."""
+        with self._cond:
+            while self.in_flight >= max(1, int(self.window)):
+                self._cond.wait(1.0)
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.in_flight -= 1
+                self._cond.notify_all()
+
+    # ── Feedback ──
+
+    def record(self, latency: float, ok: bool, errors: Optional[List[str]] = None):
+        """Report a finished call. `ok` is False for exceptions and empty responses."""
+        with self._cond:
+            if ok:
+                self.successes += 1
+                self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+            else:
+                self.failures += 1
+
+            if not ok or errors:
+                self._decrease(0.5, f"{len(errors or [])} error(s)" if errors else "empty response")
+            elif latency > self.latency_target:
+                self._decrease(0.75, f"slow call {latency:.0f}s")
+            else:
+                self.window = min(self.max_window, self.window + 1.0 / self.window)
+                self.pause = max(PAUSE_MIN_SECONDS, self.pause - PAUSE_STEP_SECONDS)
+                self.retry_delay = max(RETRY_DELAY_MIN_SECONDS, self.retry_delay - RETRY_DELAY_STEP_SECONDS)
+            self._cond.notify_all()
+
+    def _decrease(self, factor: float, reason: str):
+        """Multiplicative cut (caller holds the lock), at most once per holdoff period."""
+        now = time.monotonic()
+        if now - self._last_decrease < DECREASE_HOLDOFF_SECONDS:
+            return
+        self._last_decrease = now
+        self.decreases += 1
+        self.window = max(self.min_window, self.window * factor)
+        self.pause = min(PAUSE_MAX_SECONDS, max(self.pause, PAUSE_STEP_SECONDS) * 2)
+        self.retry_delay = min(RETRY_DELAY_MAX_SECONDS, self.retry_delay * 2)
+        print(f"[POE-AIMD] Backing off ({reason}): window={self.window:.1f} "
+              f"pause={self.pause:.1f}s retry={self.retry_delay:.0f}s", flush=True)
+
+    # ── Estimates ──
+
+    def seconds_per_domain(self, workers: int, default_latency: float = 45.0) -> float:
+        """Expected wall-clock seconds per domain for a job with `workers` workers,
+        given current call latency, pause and window."""
+        with self._cond:
+            latency = self.latency_ewma if self.latency_ewma is not None else default_latency
+            concurrency = max(1.0, min(float(workers), self.window))
+            return (latency + self.pause) / concurrency
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                "window": round(self.window, 2),
+                "in_flight": self.in_flight,
+                "pause_s": round(self.pause, 2),
+                "retry_delay_s": round(self.retry_delay, 1),
+                "latency_s": round(self.latency_ewma, 1) if self.latency_ewma is not None else None,
+                "successes": self.successes,
+                "failures": self.failures,
+                "decreases": self.decreases,
+            }
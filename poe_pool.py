@@ -0,0 +1,219 @@
+"""
+AUCTIONFINDER — Poe credential pool
+
+Registers every configured Poe API key and hands each call the least-loaded
+healthy key, under a per-key token bucket. Adding a Poe account is a config
+change (POE_API_KEY_<N>), not a code change, and no single user or job can
+saturate one shared key. Each key also carries a circuit breaker
+(poe_resilience.CircuitBreaker); keys whose breaker is open get no calls.
+
+Configuration (env):
+    POE_API_KEY, POE_API_KEY_2 ... POE_API_KEY_<N>   keys, scanned until the first gap after _2
+    POE_POOL_BOT_<N>           optional bot override for key N (default POE_BOT_NAME)
+    POE_POOL_RATE_PER_MIN      token refill per key per minute (default 60)
+    POE_POOL_BURST             bucket capacity per key (default 10)
+    POE_POOL_MAX_INFLIGHT      concurrent calls per key (default 20)
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from poe_resilience import CircuitBreaker
+
+# ─── Configuration ────────────────────────────────────────────────────────────
+
+POE_POOL_RATE_PER_MIN = float(os.environ.get("POE_POOL_RATE_PER_MIN", "60"))
+POE_POOL_BURST = int(os.environ.get("POE_POOL_BURST", "10"))
+POE_POOL_MAX_INFLIGHT = int(os.environ.get("POE_POOL_MAX_INFLIGHT", "20"))
+
+HEALTH_WINDOW = 20              # outcomes remembered per key
+UNHEALTHY_ERROR_RATE = 0.5      # error share (with >= 5 samples) that marks a key unhealthy
+RATE_LIMIT_COOLDOWN_SECONDS = 30
+
+
+def _is_rate_limit_error(error: str) -> bool:
+    e = (error or "").lower()
+    return "429" in e or "rate limit" in e or "too many requests" in e
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens/sec refill up to `capacity`. Not thread-safe on its own."""
+
+    def __init__(self, rate_per_sec: float, capacity: int):
+        self.rate = rate_per_sec
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self._last = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def try_take(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def seconds_until_token(self) -> float:
+        self._refill()
+        if self.tokens >= 1 or self.rate <= 0:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class PoeCredential:
+    """One Poe API key + bot with its live load and health counters."""
+
+    def __init__(self, name: str, api_key: str, bot_name: str,
+                 rate_per_min: float, burst: int, max_in_flight: int):
+        self.name = name
+        self.api_key = api_key
+        self.bot_name = bot_name
+        self.bucket = TokenBucket(rate_per_min / 60.0, burst)
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.latency_ewma: Optional[float] = None
+        self.outcomes = deque(maxlen=HEALTH_WINDOW)  # (ok, rate_limited)
+        self.cooldown_until = 0.0
+        self.breaker = CircuitBreaker(name)
+        self.total_calls = 0
+        self.total_errors = 0
+        self.total_rate_limited = 0
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for ok, _ in self.outcomes if not ok) / len(self.outcomes)
+
+    @property
+    def rate_limit_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for _, rl in self.outcomes if rl) / len(self.outcomes)
+
+    def is_healthy(self, now: float) -> bool:
+        if now < self.cooldown_until:
+            return False
+        return not (len(self.outcomes) >= 5 and self.error_rate >= UNHEALTHY_ERROR_RATE)
+
+    def load_score(self) -> tuple:
+        """Lower is better: in-flight share first, then recent latency."""
+        return (self.in_flight / max(1, self.max_in_flight), self.latency_ewma or 0.0)
+
+
+class CredentialPool:
+    """Thread-safe registry of Poe credentials with least-loaded routing."""
+
+    def __init__(self):
+        self._creds: List[PoeCredential] = []
+        self._cond = threading.Condition()
+
+    @property
+    def size(self) -> int:
+        return len(self._creds)
+
+    def register(self, name: str, api_key: str, bot_name: str,
+                 rate_per_min: float = POE_POOL_RATE_PER_MIN, burst: int = POE_POOL_BURST,
+                 max_in_flight: int = POE_POOL_MAX_INFLIGHT) -> PoeCredential:
+        cred = PoeCredential(name, api_key, bot_name, rate_per_min, burst, max_in_flight)
+        with self._cond:
+            self._creds.append(cred)
+        return cred
+
+    def acquire(self, timeout: Optional[float] = None) -> Optional[PoeCredential]:
+        """Block until a key has a free slot and a token; return the least-loaded healthy one.
+        Keys with an open circuit breaker are skipped (a half-open key admits one probe).
+        Falls back to unhealthy keys only when every routable key is unhealthy. Returns None on timeout."""
+        if not self._creds:
+            return None
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._cond:
+            while True:
+                now_wall = time.time()
+                routable = [c for c in self._creds if c.breaker.allow()]
+                candidates = [c for c in routable if c.in_flight < c.max_in_flight]
+                # A half-open key gets its probe even if its error window still reads unhealthy
+                healthy = [c for c in candidates if c.is_healthy(now_wall) or c.breaker.state == CircuitBreaker.HALF_OPEN]
+                if healthy or not any(c.is_healthy(now_wall) for c in routable):
+                    probes_first = lambda c: (c.breaker.state != CircuitBreaker.HALF_OPEN, c.load_score())
+                    for cred in sorted(healthy or candidates, key=probes_first):
+                        if cred.bucket.try_take():
+                            cred.breaker.on_acquire()
+                            cred.in_flight += 1
+                            cred.total_calls += 1
+                            return cred
+                waits = [c.bucket.seconds_until_token() for c in (healthy or candidates)]
+                waits += [c.breaker.seconds_until_probe() for c in self._creds if c not in routable]
+                wait_for = min([w for w in waits if w > 0] or [0.5])
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    wait_for = min(wait_for, remaining)
+                self._cond.wait(min(wait_for, 1.0))
+
+    def release(self, cred: PoeCredential, latency: float, ok: bool, errors: Optional[list] = None):
+        """Record the outcome of a call made with `cred` and free its slot."""
+        rate_limited = any(_is_rate_limit_error(e) for e in (errors or []))
+        with self._cond:
+            cred.in_flight = max(0, cred.in_flight - 1)
+            if ok and cred.breaker.state != CircuitBreaker.CLOSED:
+                cred.outcomes.clear()  # successful probe — judge the key on fresh outcomes
+            cred.breaker.record(ok)
+            cred.outcomes.append((ok, rate_limited))
+            if ok:
+                cred.latency_ewma = latency if cred.latency_ewma is None else 0.8 * cred.latency_ewma + 0.2 * latency
+            else:
+                cred.total_errors += 1
+            if rate_limited:
+                cred.total_rate_limited += 1
+                cred.cooldown_until = time.time() + RATE_LIMIT_COOLDOWN_SECONDS
+                print(f"[POE-POOL] {cred.name} rate limited — cooling down {RATE_LIMIT_COOLDOWN_SECONDS}s", flush=True)
+            self._cond.notify_all()
+
+    def stats(self) -> List[Dict]:
+        now = time.time()
+        with self._cond:
+            return [{
+                "name": c.name,
+                "bot": c.bot_name,
+                "key_prefix": c.api_key[:6] + "...",
+                "in_flight": c.in_flight,
+                "max_in_flight": c.max_in_flight,
+                "latency_s": round(c.latency_ewma, 1) if c.latency_ewma is not None else None,
+                "error_rate": round(c.error_rate, 2),
+                "rate_limit_rate": round(c.rate_limit_rate, 2),
+                "healthy": c.is_healthy(now),
+                "breaker": c.breaker.state,
+                "calls": c.total_calls,
+                "errors": c.total_errors,
+            } for c in self._creds]
+
+
+def load_pool_from_env(default_bot: str) -> CredentialPool:
+    """Build the pool from POE_API_KEY, POE_API_KEY_2, POE_API_KEY_3, ... (duplicate keys skipped)."""
+    pool = CredentialPool()
+    seen = set()
+    n = 1
+    while True:
+        env_name = "POE_API_KEY" if n == 1 else f"POE_API_KEY_{n}"
+        key = os.environ.get(env_name, "").strip()
+        if not key and n >= 2:
+            break
+        if key and key not in seen:
+            seen.add(key)
+            bot = os.environ.get(f"POE_POOL_BOT_{n}", "").strip() or default_bot
+            pool.register(env_name, key, bot)
+        n += 1
+    print(f"[POE-POOL] Registered {pool.size} Poe credential(s)", flush=True)
+    return pool
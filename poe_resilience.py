@@ -0,0 +1,113 @@
+"""
+AUCTIONFINDER — Poe call resilience: deadlines, backoff, circuit breakers
+
+  - POE_CALL_DEADLINE_SECONDS bounds a whole call_poe_bot_sync() call (all attempts
+    and backoff sleeps included); a stream still running at the deadline is cancelled.
+  - backoff_delay() gives jittered exponential retry delays ("full jitter").
+  - CircuitBreaker is kept per pooled Poe key: it opens after
+    BREAKER_FAILURE_THRESHOLD consecutive failed calls, and after the open period
+    half-opens to let a single probe call through. A successful probe closes it;
+    a failed one re-opens it for twice as long (capped).
+
+Configuration (env):
+    POE_CALL_DEADLINE_SECONDS   overall deadline per call (default 300)
+    POE_MAX_RETRIES             attempts per call (default 4)
+    POE_BREAKER_FAILURES        consecutive failures that open a key's breaker (default 5)
+    POE_BREAKER_OPEN_SECONDS    first open period (default 60)
+"""
+
+import os
+import random
+import threading
+import time
+
+from dotenv import load_dotenv
+load_dotenv()
+
+# ─── Configuration ────────────────────────────────────────────────────────────
+
+POE_CALL_DEADLINE_SECONDS = float(os.environ.get("POE_CALL_DEADLINE_SECONDS", "300"))
+POE_MAX_RETRIES = max(1, int(os.environ.get("POE_MAX_RETRIES", "4")))
+BREAKER_FAILURE_THRESHOLD = max(1, int(os.environ.get("POE_BREAKER_FAILURES", "5")))
+BREAKER_OPEN_SECONDS = float(os.environ.get("POE_BREAKER_OPEN_SECONDS", "60"))
+BREAKER_MAX_OPEN_SECONDS = 600.0
+BACKOFF_CAP_SECONDS = 120.0
+
+
+def backoff_delay(attempt: int, base: float, cap: float = BACKOFF_CAP_SECONDS) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2^(attempt-1)))."""
+    return random.uniform(0, min(cap, base * (2 ** max(0, attempt - 1))))
+
+
+def retry_sleep(attempt: int, base: float, deadline_at: float) -> float:
+    """Backoff before the next attempt, or -1 if it would run past `deadline_at` (time.monotonic)."""
+    delay = backoff_delay(attempt, base)
+    if time.monotonic() + delay >= deadline_at:
+        return -1
+    return delay
+
+
+class CircuitBreaker:
+    """closed -> open (after N consecutive failures) -> half_open (one probe) -> closed/open."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 open_seconds: float = BREAKER_OPEN_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_open_seconds = open_seconds
+        self.open_seconds = open_seconds
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.times_opened = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """True if a call may be routed through this key right now (does not reserve the probe)."""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+                self.state = self.HALF_OPEN
+                self.probe_in_flight = False
+                print(f"[BREAKER] {self.name} half-open — probing", flush=True)
+            if self.state == self.CLOSED:
+                return True
+            return self.state == self.HALF_OPEN and not self.probe_in_flight
+
+    def on_acquire(self):
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.probe_in_flight = True
+
+    def seconds_until_probe(self) -> float:
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.open_seconds - (time.monotonic() - self.opened_at))
+
+    def record(self, ok: bool):
+        with self._lock:
+            if ok:
+                if self.state != self.CLOSED:
+                    print(f"[BREAKER] {self.name} closed — probe succeeded", flush=True)
+                self.state = self.CLOSED
+                self.consecutive_failures = 0
+                self.open_seconds = self.base_open_seconds
+                self.probe_in_flight = False
+                return
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN:
+                self.open_seconds = min(BREAKER_MAX_OPEN_SECONDS, self.open_seconds * 2)
+                self._open()
+            elif self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.probe_in_flight = False
+        self.times_opened += 1
+        print(f"[BREAKER] {self.name} OPEN after {self.consecutive_failures} consecutive failure(s) "
+              f"— skipping for {self.open_seconds:.0f}s", flush=True)
@@ -0,0 +1,160 @@
+"""
+AUCTIONFINDER — Shared asyncio Poe transport
+
+fp.get_bot_response_sync spins up a private event loop and blocks an OS thread
+for the whole streamed response. This module runs ONE background event loop per
+process and multiplexes every in-flight Poe stream on it, sharing a single
+pooled httpx client. Job threads submit a domain and get back a
+concurrent.futures.Future, so hundreds of concurrent calls cost one loop thread
+instead of one thread per call.
+
+Each call is bounded by an overall deadline (poe_resilience.POE_CALL_DEADLINE_SECONDS);
+a stream still open at the deadline is cancelled and the call returns "".
+Retries use jittered exponential backoff.
+
+Usage (from any thread):
+    fut = transport.submit("redcross.org", bot_name, api_key)
+    text = fut.result()
+"""
+
+import asyncio
+import os
+import sys
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Optional
+
+import httpx
+import fastapi_poe as fp
+
+from poe_resilience import POE_CALL_DEADLINE_SECONDS, backoff_delay
+
+# ─── Configuration ────────────────────────────────────────────────────────────
+
+POE_ASYNC_TRANSPORT = os.environ.get("POE_ASYNC_TRANSPORT", "1").strip() == "1"
+POE_MAX_STREAMS = int(os.environ.get("POE_MAX_STREAMS", "200"))
+
+
+class PoeTransport:
+    """Background event loop that owns every Poe stream in the process."""
+
+    def __init__(self, max_streams: int = POE_MAX_STREAMS):
+        self.max_streams = max_streams
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._session: Optional[httpx.AsyncClient] = None
+        self.in_flight = 0
+        self.completed = 0
+
+    # ── Loop lifecycle ──
+
+    def _run_loop(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._semaphore = asyncio.Semaphore(self.max_streams)
+        self._session = httpx.AsyncClient(
+            timeout=httpx.Timeout(600.0, connect=15.0),
+            limits=httpx.Limits(max_connections=self.max_streams,
+                                max_keepalive_connections=min(self.max_streams, 50)),
+        )
+        self._loop = loop
+        self._ready.set()
+        loop.run_forever()
+
+    def _ensure_started(self):
+        if self._ready.is_set():
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run_loop, name="poe-transport", daemon=True)
+                self._thread.start()
+                print(f"[POE-TRANSPORT] Event loop started (max {self.max_streams} concurrent streams)", flush=True)
+        self._ready.wait()
+
+    # ── Calls ──
+
+    async def _stream(self, domain: str, bot_name: str, api_key: str,
+                      max_retries: int, retry_delay: float, errors: Optional[list]) -> str:
+        message = fp.ProtocolMessage(role="user", content=domain)
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                for attempt in range(1, max_retries + 1):
+                    try:
+                        full_response = ""
+                        async for partial in fp.get_bot_response(
+                            messages=[message],
+                            bot_name=bot_name,
+                            api_key=api_key,
+                            session=self._session,
+                        ):
+                            full_response += partial.text
+                        return full_response
+                    except Exception as e:
+                        if errors is not None:
+                            errors.append(str(e))
+                        print(f"    Attempt {attempt}/{max_retries} failed ({bot_name}): {str(e)[:120]}", file=sys.stderr)
+                        if attempt < max_retries:
+                            delay = backoff_delay(attempt, retry_delay)
+                            print(f"    Retrying in {delay:.1f}s...", file=sys.stderr)
+                            await asyncio.sleep(delay)
+                        else:
+                            print(f"    All {max_retries} attempts failed.", file=sys.stderr)
+                return ""
+            finally:
+                self.in_flight -= 1
+                self.completed += 1
+
+    async def _call_with_deadline(self, domain: str, bot_name: str, api_key: str,
+                                  max_retries: int, retry_delay: float, errors: Optional[list],
+                                  deadline: float) -> str:
+        try:
+            return await asyncio.wait_for(
+                self._stream(domain, bot_name, api_key, max_retries, retry_delay, errors), deadline)
+        except asyncio.TimeoutError:
+            msg = f"Deadline exceeded after {deadline:.0f}s — stream cancelled"
+            if errors is not None:
+                errors.append(msg)
+            print(f"    {domain}: {msg} ({bot_name})", file=sys.stderr)
+            return ""
+
+    def submit(self, domain: str, bot_name: str, api_key: str,
+               max_retries: int = 2, retry_delay: float = 15, errors: Optional[list] = None,
+               deadline: float = POE_CALL_DEADLINE_SECONDS) -> Future:
+        """Schedule a Poe call on the shared loop. Returns a Future resolving to the response text
+        ("" on failure or when `deadline` seconds pass). Attempt errors are appended to
+        `errors` (if given) for credential health tracking."""
+        self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(
+            self._call_with_deadline(domain, bot_name, api_key, max_retries, retry_delay, errors, deadline),
+            self._loop,
+        )
+
+    def call(self, domain: str, bot_name: str, api_key: str,
+             max_retries: int = 2, retry_delay: float = 15, errors: Optional[list] = None,
+             deadline: float = POE_CALL_DEADLINE_SECONDS) -> str:
+        """Blocking convenience wrapper around submit() for job threads."""
+        future = self.submit(domain, bot_name, api_key, max_retries, retry_delay, errors, deadline)
+        try:
+            # The loop enforces the deadline; the margin only guards against a wedged loop
+            return future.result(timeout=deadline + 30)
+        except FutureTimeoutError:
+            future.cancel()
+            if errors is not None:
+                errors.append("Transport did not answer before the deadline")
+            return ""
+
+    def stats(self) -> dict:
+        return {
+            "running": self._ready.is_set(),
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "max_streams": self.max_streams,
+        }
+
+
+# Process-wide singleton shared by all jobs
+transport = PoeTransport()
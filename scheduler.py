@@ -0,0 +1,170 @@
+"""
+AUCTIONFINDER — Global fair-share research scheduler
+
+Owns a fixed research capacity (concurrent domain slots across ALL jobs in the
+process) and hands slots to running jobs by weighted fair share:
+
+  - Priority lanes: "interactive" (small web jobs) is always served before
+    "batch" (API / large jobs), so a 20-domain web search finishes fast while
+    5k-domain batches soak up whatever capacity is left.
+  - Within a lane, the waiting job with the lowest in_use/weight gets the next slot.
+  - Per-user cap: one user's jobs never hold more than PER_USER_MAX_SLOTS slots.
+
+Every job is started through scheduler.start_job(); its domain workers wrap each
+Poe research call in `with scheduler.slot(job_id):`.
+
+Configuration (env):
+    RESEARCH_CAPACITY         total concurrent domain slots (default 8)
+    PER_USER_MAX_SLOTS        max slots held by one user's jobs (default 4)
+    INTERACTIVE_MAX_DOMAINS   web jobs up to this size run in the interactive lane (default 200)
+"""
+
+import itertools
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+load_dotenv()
+
+# ─── Configuration ────────────────────────────────────────────────────────────
+
+RESEARCH_CAPACITY = max(1, int(os.environ.get("RESEARCH_CAPACITY", "8")))
+PER_USER_MAX_SLOTS = max(1, int(os.environ.get("PER_USER_MAX_SLOTS", "4")))
+INTERACTIVE_MAX_DOMAINS = int(os.environ.get("INTERACTIVE_MAX_DOMAINS", "200"))
+
+LANE_INTERACTIVE = "interactive"
+LANE_BATCH = "batch"
+LANES = (LANE_INTERACTIVE, LANE_BATCH)  # strict priority order
+
+
+def lane_for(domain_count: int, interactive: bool) -> str:
+    """Web searches up to INTERACTIVE_MAX_DOMAINS go in the interactive lane; everything else is batch."""
+    if interactive and domain_count <= INTERACTIVE_MAX_DOMAINS:
+        return LANE_INTERACTIVE
+    return LANE_BATCH
+
+
+class ResearchScheduler:
+    """Thread-safe slot allocator shared by every research job in the process."""
+
+    def __init__(self, capacity: int = RESEARCH_CAPACITY, per_user_slots: int = PER_USER_MAX_SLOTS):
+        self.capacity = capacity
+        self.per_user_slots = per_user_slots
+        self.in_use = 0
+        self._cond = threading.Condition()
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._seq = itertools.count()
+
+    @property
+    def job_workers(self) -> int:
+        """Most worker threads a job can keep busy — its full fair share. Jobs use
+        min(JOB_WORKERS, job_workers): parallelism within a job stays opt-in."""
+        return min(self.capacity, self.per_user_slots)
+
+    # ── Job registration ──
+
+    def register(self, job_id: str, user_id: Optional[int], lane: str = LANE_BATCH, weight: float = 1.0):
+        with self._cond:
+            self._jobs[job_id] = {
+                "user_id": user_id, "lane": lane if lane in LANES else LANE_BATCH,
+                "weight": max(0.1, weight), "in_use": 0, "waiting": 0,
+                "granted": 0, "seq": next(self._seq),
+            }
+
+    def unregister(self, job_id: str):
+        with self._cond:
+            job = self._jobs.pop(job_id, None)
+            if job and job["in_use"]:
+                self.in_use -= job["in_use"]
+            self._cond.notify_all()
+
+    def start_job(self, job_id: str, user_id: Optional[int], lane: str,
+                  target: Callable, args: tuple = (), kwargs: Optional[dict] = None,
+                  weight: float = 1.0) -> threading.Thread:
+        """Register a job and run its driver thread; the job is unregistered when target returns."""
+        self.register(job_id, user_id, lane, weight)
+        print(f"[SCHEDULER] {job_id}: lane={lane} weight={weight} user={user_id}", flush=True)
+
+        def _driver():
+            try:
+                target(*args, **(kwargs or {}))
+            finally:
+                self.unregister(job_id)
+
+        thread = threading.Thread(target=_driver, name=f"job-{job_id}", daemon=True)
+        thread.start()
+        return thread
+
+    # ── Slot allocation ──
+
+    def _user_in_use(self, user_id) -> int:
+        return sum(j["in_use"] for j in self._jobs.values() if j["user_id"] == user_id)
+
+    def _next_grant(self) -> Optional[str]:
+        """Pick the job that should receive the next free slot (caller holds the lock)."""
+        for lane in LANES:
+            eligible = [
+                (jid, j) for jid, j in self._jobs.items()
+                if j["lane"] == lane and j["waiting"] > 0
+                and (j["user_id"] is None or self._user_in_use(j["user_id"]) < self.per_user_slots)
+            ]
+            if eligible:
+                jid, _ = min(eligible, key=lambda item: (item[1]["in_use"] / item[1]["weight"], item[1]["seq"]))
+                return jid
+        return None
+
+    def acquire(self, job_id: str, cancelled: Optional[Callable[[], bool]] = None) -> bool:
+        """Block until job_id is granted a slot. Returns False if `cancelled()` turns true first.
+        Jobs that were never registered pass straight through (no accounting)."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return True
+            job["waiting"] += 1
+            try:
+                while True:
+                    if cancelled and cancelled():
+                        return False
+                    if self.in_use < self.capacity and self._next_grant() == job_id:
+                        job["in_use"] += 1
+                        job["granted"] += 1
+                        self.in_use += 1
+                        return True
+                    self._cond.wait(0.5)
+            finally:
+                job["waiting"] -= 1
+                self._cond.notify_all()
+
+    def release(self, job_id: str):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is not None and job["in_use"] > 0:
+                job["in_use"] -= 1
+                self.in_use -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, job_id: str, cancelled: Optional[Callable[[], bool]] = None):
+        """`with scheduler.slot(job_id, cancelled) as granted:` — granted is False if cancelled while queued."""
+        granted = self.acquire(job_id, cancelled)
+        try:
+            yield granted
+        finally:
+            if granted:
+                self.release(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "capacity": self.capacity,
+                "in_use": self.in_use,
+                "per_user_slots": self.per_user_slots,
+                "jobs": {jid: {k: j[k] for k in ("user_id", "lane", "weight", "in_use", "waiting", "granted")}
+                         for jid, j in self._jobs.items()},
+            }
+
+
+# Process-wide singleton shared by all jobs
+scheduler = ResearchScheduler()
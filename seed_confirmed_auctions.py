@@ -12,12 +12,15 @@ Usage:
 
 import csv
 import os
-import re
 import sys
 
 import psycopg2
 from dotenv import load_dotenv
 
+from domains import canonical_domain
+from irs import website_domain_sql
+from migrate_irs import COLUMNS
+
 load_dotenv()
 
 SEED_CSV = "seed_db_26.csv"
@@ -26,14 +29,9 @@ SEED_CSV = "seed_db_26.csv"
 def normalize_domain(raw: str) -> str:
     """Normalize a URL/domain to bare domain for matching.
     e.g. 'http://www.100blackmen.com/' -> '100blackmen.com'
+    Same rules as research_cache keys (domains.canonical_domain).
     """
-    d = raw.strip().lower()
-    d = re.sub(r'^https?://', '', d)
-    d = re.sub(r'^www\.', '', d)
-    d = d.rstrip('/')
-    # Remove spaces (e.g. "Zooboise. Org" -> "zooboise.org")
-    d = d.replace(' ', '')
-    return d
+    return canonical_domain(raw)
 
 
 def main():
@@ -131,18 +129,16 @@ def main():
     """)
     conn.commit()
 
-    # 5. Match: normalize IRS Website and join against seed domains
+    # 5. Match: normalize IRS Website (irs.website_domain_sql, canonical_domain's rules) and join.
+    # Columns are listed explicitly: tax_year_2019_search also carries generated
+    # match keys (irs.ensure_irs_schema) that t.* would misalign.
     print("Matching IRS records against seed domains...")
-    cur.execute("""
-        INSERT INTO confirmed_auction_nonprofits
-        SELECT t.*
+    cur.execute(f"""
+        INSERT INTO confirmed_auction_nonprofits ({", ".join(COLUMNS)})
+        SELECT {", ".join("t." + c for c in COLUMNS)}
         FROM tax_year_2019_search t
         JOIN seed_domains s
-          ON s.domain = REPLACE(TRIM(TRAILING '/' FROM
-                         REGEXP_REPLACE(
-                           REGEXP_REPLACE(LOWER(TRIM(t.Website)), '^https?://', ''),
-                           '^www\\.', ''
-                         )), ' ', '')
+          ON s.domain = {website_domain_sql("t.Website")}
         WHERE t.Website IS NOT NULL AND t.Website != ''
     """)
     matched = cur.rowcount
@@ -0,0 +1,83 @@
+"""
+AUCTIONFINDER — Single-flight deduplication of in-flight work
+
+When several threads ask for the same key at the same time, only the first
+(the leader) runs the function; the rest wait for it and receive a copy of its
+result. Used to make concurrent jobs researching the same domain share one Poe
+call — each job still bills and checkpoints its own copy.
+
+Across gunicorn workers, set SINGLEFLIGHT_PG_LOCKS=1: the leader then also takes
+a Postgres advisory lock on the key (db.advisory_lock), so a leader in another
+worker waits and finds the result in research_cache instead of calling Poe again.
+"""
+
+import copy
+import os
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+from dotenv import load_dotenv
+load_dotenv()
+
+# ─── Configuration ────────────────────────────────────────────────────────────
+
+SINGLEFLIGHT_PG_LOCKS = os.environ.get("SINGLEFLIGHT_PG_LOCKS", "0").strip() == "1"
+
+
+class _Flight:
+    __slots__ = ("done", "value", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """In-process registry of outstanding calls, keyed by a normalized key."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run fn() once per key among concurrent callers.
+        Returns (value, shared) — shared is True for callers that attached to another call.
+        Every caller gets a deep copy, so results may be mutated freely."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                leader = True
+                self.leaders += 1
+            else:
+                flight.waiters += 1
+                leader = False
+                self.shared += 1
+
+        if not leader:
+            print(f"[SINGLE-FLIGHT] {self.name}: {key} already in flight — attaching", flush=True)
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.value), True
+
+        try:
+            flight.value = fn()
+            # The stored value stays pristine for waiters; every caller gets its own copy
+            return copy.deepcopy(flight.value), False
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"in_flight": len(self._flights), "leaders": self.leaders, "shared": self.shared}
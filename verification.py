@@ -0,0 +1,420 @@
+"""
+AUCTIONFINDER — Streaming email verification stage
+
+Billable contact emails used to be collected only after the last domain was
+researched, then verified in one Emailable bulk batch (polled every 15s for up
+to 30 minutes) while the job still showed as running. EmailVerificationStage
+runs alongside research instead:
+
+  - add(result) picks up a billable result's email as soon as it is published;
+  - emails go out in rolling chunks (VERIFY_BATCH_SIZE emails, or whatever has
+    waited VERIFY_BATCH_SECONDS) on background threads;
+  - poll() applies finished chunks on the job thread — undeliverable contacts
+    are purged, the tier re-materialized and the row re-checkpointed through
+    checkpoint_writer (buffered, bulk upserts);
+  - finish() sends the remainder — a handful of emails through the real-time
+    endpoint in parallel rather than a fresh bulk batch — and waits for every
+    verdict, so only verified emails reach the job's files and billing summary.
+
+So by the time the last Poe call returns, most emails are already verified.
+
+Bulk batches aren't polled by the job: BatchTracker (batch_tracker) creates
+and polls every outstanding Emailable batch in the process from one
+background thread, with per-batch backoff. Every batch ends — complete, or
+expired after VERIFY_BATCH_MAX_AGE (its emails then count as unknown and are
+purged) — so a job never waits longer than that. Batch ids are recorded in
+email_batches with the owning process (db.PROCESS_ID); if that process dies,
+another worker claims the batch at startup and applies its verdicts to
+job_results directly.
+
+Only misses reach Emailable. Syntactically invalid and placeholder addresses
+are rejected locally (local_verdict), and verdicts are shared across jobs via
+the email_verifications table, with a TTL by state: deliverable/undeliverable
+rarely change, risky/unknown are worth re-checking soon. Failed checks
+(no key, network errors, timeouts) are never cached.
+
+Configuration (env):
+    VERIFY_BATCH_SIZE      emails per bulk batch (default 100)
+    VERIFY_BATCH_SECONDS   max wait before a partial batch is sent (default 60)
+    VERIFY_MAX_BATCHES     batches/real-time checks in flight per job (default 4)
+    VERIFY_REALTIME_MAX    leftover verified per email instead of in bulk (default 25)
+    VERIFY_TTL_LONG_DAYS   cache TTL for deliverable/undeliverable (default 60)
+    VERIFY_TTL_SHORT_HOURS cache TTL for risky/unknown (default 24)
+    VERIFY_POLL_INITIAL    first poll after a batch is created, seconds (default 5)
+    VERIFY_POLL_MAX        longest gap between polls of one batch, seconds (default 60)
+    VERIFY_BATCH_MAX_AGE   give up on a batch after this many seconds (default 1800)
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from bot import emailable_batch_status, emailable_create_batch, verify_email_emailable
+from checkpoints import checkpoint_writer
+from db import (
+    get_email_verifications, save_email_verifications,
+    save_email_batch, finish_email_batch, claim_orphaned_email_batches,
+    get_job_results_by_email, result_row, save_results_bulk,
+)
+from leads import is_valid_email, lead_tier, materialize_tier
+
+# ─── Configuration ────────────────────────────────────────────────────────────
+
+VERIFY_BATCH_SIZE = max(1, int(os.environ.get("VERIFY_BATCH_SIZE", "100")))
+VERIFY_BATCH_SECONDS = float(os.environ.get("VERIFY_BATCH_SECONDS", "60"))
+VERIFY_MAX_BATCHES = max(1, int(os.environ.get("VERIFY_MAX_BATCHES", "4")))
+VERIFY_REALTIME_MAX = int(os.environ.get("VERIFY_REALTIME_MAX", "25"))
+VERIFY_TTL_LONG_DAYS = float(os.environ.get("VERIFY_TTL_LONG_DAYS", "60"))
+VERIFY_TTL_SHORT_HOURS = float(os.environ.get("VERIFY_TTL_SHORT_HOURS", "24"))
+VERIFY_POLL_INITIAL = float(os.environ.get("VERIFY_POLL_INITIAL", "5"))
+VERIFY_POLL_MAX = float(os.environ.get("VERIFY_POLL_MAX", "60"))
+VERIFY_BATCH_MAX_AGE = float(os.environ.get("VERIFY_BATCH_MAX_AGE", "1800"))
+
+_PROGRESS_SECONDS = 30  # progress update interval while a finished job waits on verdicts
+
+_PLACEHOLDER_LOCALS = {
+    "noreply", "no-reply", "donotreply", "do-not-reply", "example", "test",
+    "email", "name", "yourname", "your.name", "firstname.lastname", "user",
+}
+_PLACEHOLDER_DOMAINS = {
+    "example.com", "example.org", "example.net", "test.com", "domain.com",
+    "email.com", "yourdomain.com", "yourorg.org", "nonprofit.org",
+}
+
+
+def local_verdict(email: str) -> Optional[str]:
+    """"undeliverable" for addresses that can be rejected without asking Emailable
+    (bad syntax, placeholders the model filled in), else None."""
+    if not is_valid_email(email):
+        return "undeliverable"
+    local, _, domain = email.strip().lower().rpartition("@")
+    tld = domain.rsplit(".", 1)[-1]
+    if local in _PLACEHOLDER_LOCALS or domain in _PLACEHOLDER_DOMAINS:
+        return "undeliverable"
+    if len(tld) < 2 or not tld.isalpha() or ".." in domain or domain.startswith("."):
+        return "undeliverable"
+    return None
+
+
+def _ttl_seconds(state: str) -> float:
+    if state in ("deliverable", "undeliverable"):
+        return VERIFY_TTL_LONG_DAYS * 86400
+    return VERIFY_TTL_SHORT_HOURS * 3600
+
+
+def _remember(verdicts: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+    """Cache Emailable verdicts; returns {email: state}."""
+    save_email_verifications([
+        (email, v["state"], v.get("score"), _ttl_seconds(v["state"])) for email, v in verdicts.items()
+    ])
+    return {email: v["state"] for email, v in verdicts.items()}
+
+
+def verify_email(email: str) -> str:
+    """One email through the local pre-filter, the shared cache, then the real-time endpoint."""
+    email = email.strip().lower()
+    state = local_verdict(email)
+    if state:
+        return state
+    cached = get_email_verifications([email])
+    if email in cached:
+        return cached[email]["state"]
+    verdict = verify_email_emailable(email)
+    if verdict is None:
+        return "unknown"
+    return _remember({email: verdict})[email]
+
+
+def apply_verdict(result: Dict[str, Any], state: str) -> bool:
+    """Record a verdict on a result; anything but deliverable purges the contact
+    and re-classifies the lead. Returns True if the contact was purged."""
+    result["email_status"] = state
+    if state == "deliverable":
+        return False
+    email = result.get("contact_email", "")
+    result["contact_email"] = ""
+    result["contact_name"] = ""
+    result["email_status"] = ""
+    materialize_tier(result)  # no email/name any more — re-classify
+    print(f"[VERIFY] Purged {email} ({state}) from {result.get('query_domain', '')}", flush=True)
+    return True
+
+
+def _apply_to_job_results(job_id: str, emails: List[str], states: Dict[str, str]):
+    """Verdicts for a batch whose job died with its process — written straight to job_results."""
+    checkpoint_writer.flush(job_id)  # the job's own latest rows first
+    rows = []
+    for domain, result in get_job_results_by_email(job_id, emails):
+        apply_verdict(result, states.get(result.get("contact_email", "").strip().lower(), "unknown"))
+        rows.append(result_row(job_id, domain, result))
+    save_results_bulk(rows)
+    print(f"[VERIFY] {job_id}: applied late verdicts to {len(rows)} stored result(s)", flush=True)
+
+
+# ─── Batch Tracker ────────────────────────────────────────────────────────────
+
+class _Batch:
+    """One Emailable bulk batch: created by the tracker, polled until complete."""
+
+    def __init__(self, job_id: str, emails: List[str], callback: Optional[Callable[[Dict[str, str]], None]],
+                 batch_id: str = None, age: float = 0.0):
+        self.job_id = job_id
+        self.emails = emails
+        self.callback = callback  # None -> adopted after a restart, apply to job_results
+        self.batch_id = batch_id
+        self.created = time.monotonic() - age
+        self.delay = VERIFY_POLL_INITIAL
+        self.due = time.monotonic() if batch_id is None else time.monotonic() + self.delay
+        self.done = False
+
+
+class BatchTracker:
+    """Creates and polls every outstanding Emailable batch in the process from one thread."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._batches: List[_Batch] = []
+        self._thread: Optional[threading.Thread] = None
+        self.completed = 0
+        self.expired = 0
+        self.adopted = 0
+
+    def submit(self, job_id: str, emails: List[str], callback: Callable[[Dict[str, str]], None]) -> _Batch:
+        """Queue emails for a bulk batch; callback({email: state}) runs on the tracker thread."""
+        batch = _Batch(job_id, emails, callback)
+        with self._cond:
+            self._batches.append(batch)
+            self._cond.notify()
+        self._ensure_thread()
+        return batch
+
+    def resume(self):
+        """Claim batches whose polling process is gone; their verdicts go to job_results.
+        Batches another live worker is polling for its job are left to it."""
+        try:
+            rows = claim_orphaned_email_batches()
+        except Exception as e:
+            print(f"[VERIFY] Could not load pending email batches: {e}", flush=True)
+            return
+        if not rows:
+            return
+        with self._cond:
+            for row in rows:
+                created = row["created_at"]
+                age = (time.time() - created.timestamp()) if created else 0.0
+                self._batches.append(_Batch(row["job_id"], row["emails"], None, row["batch_id"], age))
+            self.adopted += len(rows)
+            self._cond.notify()
+        self._ensure_thread()
+        print(f"[VERIFY] Resumed polling {len(rows)} Emailable batch(es)", flush=True)
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                due = [b for b in self._batches if b.due <= now]
+                if not due:
+                    self._cond.wait(min((b.due for b in self._batches), default=now + 3600) - now)
+                    continue
+            for batch in due:
+                try:
+                    self._step(batch)
+                except Exception as e:
+                    print(f"[VERIFY] Batch {batch.batch_id or '(new)'} step failed: {type(e).__name__}: {e}", flush=True)
+                    if time.monotonic() - batch.created > VERIFY_BATCH_MAX_AGE:
+                        # Jobs wait on every batch — a failing one must still end
+                        self.expired += 1
+                        self._finish(batch, {}, "expired" if batch.batch_id else None)
+                    else:
+                        batch.due = time.monotonic() + VERIFY_POLL_MAX
+
+    def _step(self, batch: _Batch):
+        if batch.batch_id is None:
+            batch.batch_id = emailable_create_batch(batch.emails)
+            if not batch.batch_id:
+                self._finish(batch, {}, None)
+                return
+            save_email_batch(batch.batch_id, batch.job_id, batch.emails)
+            batch.due = time.monotonic() + batch.delay
+            return
+        status, verdicts = emailable_batch_status(batch.batch_id)
+        if status == "complete":
+            self.completed += 1
+            self._finish(batch, _remember(verdicts), "complete")
+        elif time.monotonic() - batch.created > VERIFY_BATCH_MAX_AGE:
+            print(f"[VERIFY] Batch {batch.batch_id} timed out after {int(VERIFY_BATCH_MAX_AGE)}s", flush=True)
+            self.expired += 1
+            self._finish(batch, {}, "expired")
+        else:
+            batch.delay = min(batch.delay * 1.5, VERIFY_POLL_MAX)
+            batch.due = time.monotonic() + batch.delay
+
+    def _finish(self, batch: _Batch, states: Dict[str, str], status: Optional[str]):
+        with self._cond:
+            self._batches.remove(batch)
+            batch.done = True
+            callback = batch.callback
+        if callback is not None:
+            callback(states)
+        else:
+            _apply_to_job_results(batch.job_id, batch.emails, states)
+        if status:
+            finish_email_batch(batch.batch_id, status)
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._cond:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name="email-batch-tracker", daemon=True)
+                    self._thread.start()
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            outstanding = len(self._batches)
+        return {"outstanding": outstanding, "completed": self.completed,
+                "expired": self.expired, "adopted": self.adopted}
+
+
+# Process-wide singleton
+batch_tracker = BatchTracker()
+
+
+# ─── Per-job Stage ────────────────────────────────────────────────────────────
+
+
+class EmailVerificationStage:
+    """Verification of one job's billable emails, overlapping its research.
+    add/poll/finish are called from the job thread only; bulk batches go to
+    batch_tracker, real-time checks to the stage's own small pool, and their
+    verdicts come back through a queue applied on the job thread."""
+
+    def __init__(self, job_id: str, progress_q=None):
+        self.job_id = job_id
+        self._progress_q = progress_q
+        self._pool = ThreadPoolExecutor(max_workers=VERIFY_MAX_BATCHES, thread_name_prefix=f"{job_id}-verify")
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}   # email -> results, not yet submitted
+        self._pending_since = 0.0
+        self._inflight: Dict[str, List[Dict[str, Any]]] = {}  # email -> results, submitted
+        self._done: "queue.Queue[Tuple[List[str], Dict[str, str]]]" = queue.Queue()
+        self._outstanding = 0                                 # submissions whose verdicts haven't come back
+        self._states: Dict[str, str] = {}                     # email -> state, this job
+        self.submitted = 0      # sent to Emailable
+        self.cache_hits = 0
+        self.prefiltered = 0
+        self.verified = 0
+        self.purged = 0
+
+    def add(self, result: Dict[str, Any]):
+        """Queue a published result's contact email if the lead is billable."""
+        tier, _ = lead_tier(result)
+        if tier == "not_billable":
+            return
+        email = result.get("contact_email", "").strip()
+        if not email or "@" not in email:
+            return
+        key = email.lower()
+        if key not in self._states and local_verdict(key):
+            self.prefiltered += 1
+            self._states[key] = "undeliverable"
+        if key in self._states:
+            self._apply(key, self._states[key], [result])
+        elif key in self._inflight:
+            self._inflight[key].append(result)
+        else:
+            if not self._pending:
+                self._pending_since = time.monotonic()
+            self._pending.setdefault(key, []).append(result)
+            if len(self._pending) >= VERIFY_BATCH_SIZE:
+                self._submit()
+
+    def poll(self):
+        """Apply verdicts that have arrived, and send a partial batch that has waited long enough."""
+        if self._pending and time.monotonic() - self._pending_since >= VERIFY_BATCH_SECONDS:
+            self._submit()
+        self._collect(0)
+
+    def finish(self) -> Tuple[int, int]:
+        """Verify whatever is left and wait for every verdict — bulk batches end
+        within VERIFY_BATCH_MAX_AGE, so this is bounded. Returns (verified, purged)."""
+        if self._pending:
+            self._submit(final=True)
+        while self._outstanding:
+            outstanding = len(self._inflight)
+            print(f"[VERIFY] {self.job_id}: waiting on {outstanding} email(s) after research", flush=True)
+            self._progress({
+                "type": "processing", "index": 0, "total": 0,
+                "nonprofit": f"Verifying {outstanding} remaining emails via Emailable...",
+            })
+            self._collect(_PROGRESS_SECONDS)
+        self._pool.shutdown(wait=False)
+        if self._states:
+            print(f"[VERIFY] {self.job_id}: {len(self._states)} email(s) — {self.submitted} sent to Emailable, "
+                  f"{self.cache_hits} cached, {self.prefiltered} rejected locally; "
+                  f"{self.verified} deliverable, {self.purged} purged", flush=True)
+            self._progress({
+                "type": "processing", "index": 0, "total": 0,
+                "nonprofit": f"Email verification complete: {self.verified} verified, {self.purged} purged",
+            })
+        return self.verified, self.purged
+
+    def _submit(self, final: bool = False):
+        batch, self._pending = self._pending, {}
+        # Verdicts other jobs already paid for
+        for email, cached in get_email_verifications(list(batch)).items():
+            self.cache_hits += 1
+            self._states[email] = cached["state"]
+            self._apply(email, cached["state"], batch.pop(email))
+        if not batch:
+            return
+        emails = list(batch)
+        self._inflight.update(batch)
+        self.submitted += len(emails)
+        if final and len(emails) <= VERIFY_REALTIME_MAX:
+            # A few stragglers: the real-time endpoint answers in seconds, a bulk batch in polls
+            for email in emails:
+                future = self._pool.submit(verify_email, email)
+                future.add_done_callback(
+                    lambda f, email=email: self._done.put(([email], {email: f.result()} if not f.exception() else {}))
+                )
+                self._outstanding += 1
+        else:
+            print(f"[VERIFY] {self.job_id}: submitting batch of {len(emails)} email(s)", flush=True)
+            batch_tracker.submit(
+                self.job_id, emails, lambda states, emails=emails: self._done.put((emails, states)),
+            )
+            self._outstanding += 1
+
+    def _collect(self, timeout: float):
+        """Apply arrived verdicts; with a timeout, keep waiting until all are in or it runs out."""
+        deadline = time.monotonic() + timeout
+        while self._outstanding:
+            remaining = deadline - time.monotonic()
+            try:
+                emails, states = self._done.get(timeout=remaining) if remaining > 0 else self._done.get_nowait()
+            except queue.Empty:
+                return
+            self._outstanding -= 1
+            for email in emails:
+                state = states.get(email, "unknown")
+                self._states[email] = state
+                self._apply(email, state, self._inflight.pop(email, []))
+
+    def _apply(self, email: str, state: str, results: List[Dict[str, Any]]):
+        for r in results:
+            if apply_verdict(r, state):
+                self.purged += 1
+            else:
+                self.verified += 1
+            # Re-save updated result (buffered; collapses with the earlier row)
+            if self.job_id:
+                checkpoint_writer.put(self.job_id, r.get("query_domain", ""), r)
+
+    def _progress(self, event: Dict[str, Any]):
+        if self._progress_q is not None:
+            self._progress_q.put(event)